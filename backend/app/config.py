@@ -6,8 +6,101 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    # Hashes running or queued for the pool at once; further logins get a fast 503
+    PASSWORD_HASH_MAX_PENDING: int = 32
     APP_ENV: str = "production"
     ALLOWED_ORIGINS: str
+    # Direct Postgres connection string (optional; used by the postgres repository and invalidation bus)
+    DATABASE_URL: str | None = None
+    # Where queries go: supabase (PostgREST over HTTPS) or postgres (pooled connections to DATABASE_URL)
+    DATABASE_BACKEND: str = "supabase"
+    DB_POOL_SIZE: int = 10
+    DB_POOL_MAX_OVERFLOW: int = 10
+    DB_MAX_CONNECTIONS: int = 20
+    DB_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    DB_TIMEOUT_SECONDS: float = 10.0
+    EVENT_CACHE_SIZE: int = 1024
+    EVENT_CACHE_TTL_SECONDS: float = 30.0
+    USER_CACHE_SIZE: int = 4096
+    TOKEN_CACHE_SIZE: int = 4096
+    USER_CACHE_TTL_SECONDS: float = 30.0
+    # Build the current user from the signed token claims instead of the users table
+    # (claims issued before the user's last change, users.updated_at, are never trusted);
+    # with more than one worker this needs an INVALIDATION_BUS to spread changes
+    TRUST_TOKEN_CLAIMS: bool = False
+    EXPORT_CHUNK_SIZE: int = 1000
+    EXPORT_GZIP_LEVEL: int = 6
+    EXPORT_ZSTD_LEVEL: int = 3
+    IMPORT_BATCH_SIZE: int = 500
+    EVENTS_HTTP_MAX_AGE_SECONDS: int = 5
+    METRICS_ENABLED: bool = True
+    # Admin profiling (app.services.profiling): sampling and the slow-request log start
+    # at these values and are switched at runtime from /api/admin/profiling (0 = off)
+    PROFILING_ENABLED: bool = True
+    PROFILING_SAMPLE_PERCENT: float = 0.0
+    PROFILING_SLOW_REQUEST_MS: float = 0.0
+    PROFILING_SAMPLE_INTERVAL_MS: float = 5.0
+    PROFILING_MAX_STACK_DEPTH: int = 128
+    PROFILING_KEEP_SLOWEST: int = 20
+    PROFILING_SLOW_LOG_SIZE: int = 200
+    # Response compression (app.middleware.compression): codings in preference order, br needs the brotli package
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_ENCODINGS: list[str] = ["zstd", "br", "gzip"]
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    COMPRESSION_BROTLI_LEVEL: int = 4
+    COMPRESSION_GZIP_LEVEL: int = 5
+    # Serve event listings (not search) from an in-memory copy of the active catalogue
+    EVENT_SNAPSHOT_ENABLED: bool = True
+    EVENT_SNAPSHOT_MAX_STALENESS_SECONDS: float = 30.0
+    EVENT_SNAPSHOT_MAX_EVENTS: int = 5000
+    # Keep per-worker caches coherent across uvicorn workers: none, unix, postgres or realtime
+    INVALIDATION_BUS: str = "none"
+    INVALIDATION_CHANNEL: str = "eventsphere_invalidation"
+    INVALIDATION_SOCKET_DIR: str = "/tmp/eventsphere-invalidation"
+    # uvicorn worker processes (uvicorn reads the same variable as its --workers default);
+    # startup refuses per-process features that are unsafe with more than one
+    WEB_CONCURRENCY: int = 1
+    EVENT_STREAM_MAX_IDS: int = 50
+    EVENT_STREAM_HEARTBEAT_SECONDS: float = 15.0
+    # Most ids accepted by the batch reads (/api/events/batch, /api/registrations/status)
+    BATCH_MAX_IDS: int = 100
+    # Admission control / load shedding (app.middleware.admission)
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_MAX_IN_FLIGHT: int = 100
+    # Writes may hold at most this share of the in-flight slots; the rest is kept for reads
+    ADMISSION_WRITE_SHARE: float = 0.5
+    ADMISSION_MAX_WAITING: int = 200
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 2.0
+    ADMISSION_RETRY_AFTER_SECONDS: float = 1.0
+    # "METHOD /path" -> max concurrent requests (rejected with 503 beyond it)
+    ADMISSION_ROUTE_LIMITS: dict[str, int] = {
+        "POST /api/auth/login": 20,
+        "POST /api/auth/register": 10,
+        "POST /api/registrations/public": 50,
+        "POST /api/registrations": 50,
+    }
+    # "METHOD /path" -> "<requests>/<seconds>:<ip|email>" token bucket (rejected with 429 beyond it)
+    ADMISSION_RATE_LIMITS: dict[str, str] = {
+        "POST /api/auth/login": "10/60:email",
+        "POST /api/auth/register": "5/60:ip",
+        "POST /api/registrations/public": "20/60:ip",
+    }
+    ADMISSION_RATE_LIMIT_KEYS: int = 100_000
+    # Header carrying the real client address (set by nginx); empty to use the socket peer
+    ADMISSION_CLIENT_IP_HEADER: str = "x-real-ip"
+    # Never queued or shed: probes, and requests held open on purpose (streams, ticket long-polls),
+    # which would otherwise sit on in-flight slots. {name} matches any one path segment
+    ADMISSION_EXEMPT_PATHS: list[str] = ["/health", "/metrics", "/api/events/stream", "/api/registrations/tickets/{ticket_id}"]
+    # Accept registrations into an in-process queue (202 + ticket) drained in batches;
+    # tickets are held by the worker that issued them, so this needs WEB_CONCURRENCY=1
+    REGISTRATION_QUEUE_ENABLED: bool = False
+    REGISTRATION_QUEUE_MAX_SIZE: int = 10000
+    REGISTRATION_QUEUE_BATCH_SIZE: int = 200
+    REGISTRATION_TICKET_TTL_SECONDS: float = 600.0
+    REGISTRATION_TICKET_MAX_WAIT_SECONDS: float = 30.0
     
     @property
     def cors_origins(self) -> list[str]:
@@ -1,4 +1,28 @@
-from supabase import create_client, Client
+import httpx
+from supabase import AsyncClient, AsyncClientOptions
 from app.config import settings
+from app.metrics import InstrumentedTransport
 
-supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+# A single pooled HTTP client shared by every PostgREST call in this worker, so
+# concurrent requests overlap their I/O instead of blocking the event loop.
+# The transport is instrumented to count and time every call (see app.metrics).
+http_client = httpx.AsyncClient(
+    transport=InstrumentedTransport(httpx.AsyncHTTPTransport(
+        limits=httpx.Limits(
+            max_connections=settings.DB_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.DB_MAX_KEEPALIVE_CONNECTIONS,
+        ),
+        http2=True,
+    )),
+    timeout=settings.DB_TIMEOUT_SECONDS,
+    follow_redirects=True,
+)
+
+supabase: AsyncClient = AsyncClient(
+    settings.SUPABASE_URL,
+    settings.SUPABASE_KEY,
+    options=AsyncClientOptions(httpx_client=http_client),
+)
+
+async def close_database() -> None:
+    await http_client.aclose()
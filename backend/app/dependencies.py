@@ -1,6 +1,8 @@
+import uuid
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from app.services.auth_service import decode_token, get_user_by_email
+from app.config import settings
+from app.services.auth_service import decode_token, get_cached_user, user_from_claims
 from app.schemas.user import UserOut
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
@@ -16,9 +18,12 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> UserOut:
     if email is None:
         raise credentials_exception
         
-    user_data = get_user_by_email(email)
-    
+    # Fast path: no DB round trip when the signed claims are trusted and current
+    user_data = user_from_claims(payload) if settings.TRUST_TOKEN_CLAIMS else None
     if user_data is None:
+        user_data = await get_cached_user(email)
+    
+    if user_data is None or not user_data.get("is_active", True):
         raise credentials_exception
     return UserOut(**user_data)
 
@@ -29,3 +34,16 @@ async def get_admin_user(current_user: UserOut = Depends(get_current_user)) -> U
             detail="Requires administrator privileges"
         )
     return current_user
+
+def parse_event_ids(ids: str, max_ids: int) -> list[str]:
+    """Comma-separated event UUIDs -> distinct normalized ids, in order; 422 if malformed or too many."""
+    try:
+        event_ids = list(dict.fromkeys(str(uuid.UUID(part.strip())) for part in ids.split(",") if part.strip()))
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="ids must be comma-separated event UUIDs")
+    if not event_ids or len(event_ids) > max_ids:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Pass between 1 and {max_ids} event ids",
+        )
+    return event_ids
@@ -2,16 +2,56 @@ import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from app.config import settings
+from app.database import close_database
+from app.metrics import render_metrics
+from app.repositories import repository
+from app.middleware import AdmissionControlMiddleware, CompressionMiddleware, MetricsMiddleware, ProfilingMiddleware
+from app.services.registration_queue import registration_queue
+from app.services.event_service import refresh_event_snapshot
+from app.services.auth_service import load_user_changes
+from app.services.invalidation import invalidation_bus
 from app.routers import auth_router, events_router, registrations_router, admin_router
 
 logger = logging.getLogger(__name__)
 
+def check_worker_settings() -> None:
+    """Refuse settings that are only safe while a single worker serves every request."""
+    if settings.WEB_CONCURRENCY <= 1:
+        return
+    if settings.TRUST_TOKEN_CLAIMS and settings.INVALIDATION_BUS == "none":
+        # Other workers would keep trusting claims of users changed elsewhere
+        raise RuntimeError("TRUST_TOKEN_CLAIMS with more than one worker needs an INVALIDATION_BUS")
+    if settings.REGISTRATION_QUEUE_ENABLED:
+        # Tickets live in the worker that issued them; a poll landing on another one would 404
+        raise RuntimeError("REGISTRATION_QUEUE_ENABLED supports a single worker only")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    check_worker_settings()
     print("EventSphere API started")
+    # Subscribe before loading so no change published during the load is missed
+    await invalidation_bus.start(settings.INVALIDATION_BUS)
+    if settings.EVENT_SNAPSHOT_ENABLED:
+        try:
+            await refresh_event_snapshot()
+        except Exception as e:
+            # Listings fall back to the database and the next read retries the load
+            logger.error(f"Initial event snapshot load failed: {type(e).__name__}: {e}")
+    if settings.TRUST_TOKEN_CLAIMS:
+        try:
+            await load_user_changes()
+        except Exception as e:
+            # Claims stay untrusted, so every request reads the user from the database
+            logger.error(f"Loading user changes failed: {type(e).__name__}: {e}")
+    if settings.REGISTRATION_QUEUE_ENABLED:
+        registration_queue.start()
     yield
+    await registration_queue.stop()
+    await invalidation_bus.stop()
+    await repository.close()
+    await close_database()
 
 app = FastAPI(
     title="EventSphere API",
@@ -22,14 +62,32 @@ app = FastAPI(
     openapi_url="/api/openapi.json",
 )
 
+# Innermost, so it sees exactly what the routes return and metrics include its cost
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Inside CORS so rejections still carry CORS headers (and preflights never count),
+# inside metrics so shed requests are still recorded
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(AdmissionControlMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Inside metrics so it shares the per-request DB call accounting; a pass-through
+# until sampling or the slow-request log is switched on
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 app.include_router(auth_router)
 app.include_router(events_router)
 app.include_router(registrations_router)
@@ -39,6 +97,11 @@ app.include_router(admin_router)
 async def health_check():
     return {"status": "ok", "env": settings.APP_ENV}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint (not routed through nginx, which only proxies /api/)."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     logger.error(f"Unhandled exception: {exc}", exc_info=True)
@@ -0,0 +1,198 @@
+import math
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Tuple
+import httpx
+
+# Minimal Prometheus instrumentation: counters and histograms rendered in the
+# text exposition format, plus per-request accounting of database round trips:
+# Supabase (PostgREST) calls via an instrumented httpx transport, and direct
+# Postgres queries reported by the postgres repository.
+
+LabelValues = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name, self.documentation, self.labelnames = name, documentation, labelnames
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+class Histogram:
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name, self.documentation, self.labelnames = name, documentation, labelnames
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: Dict[LabelValues, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            series = self._series.setdefault(labels, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+class Collector:
+    """A metric whose samples are read from a callback at scrape time (e.g. cache counters kept elsewhere)."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...], collect: Callable[[], Iterable[Tuple[LabelValues, float]]], kind: str = "gauge"):
+        self.name, self.documentation, self.labelnames, self.collect, self.kind = name, documentation, labelnames, collect, kind
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in self.collect():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+_registry: list = []
+
+def register(metric):
+    _registry.append(metric)
+    return metric
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+# --- Metric definitions ---
+
+REQUESTS = register(Counter("http_requests_total", "HTTP requests handled", ("method", "route", "status")))
+REQUEST_LATENCY = register(Histogram("http_request_duration_seconds", "HTTP request latency", ("method", "route")))
+REQUEST_DB_CALLS = register(Histogram(
+    "http_request_db_calls", "Database round trips (PostgREST calls or SQL queries) made while serving one request", ("method", "route"),
+    buckets=(0, 1, 2, 3, 4, 5, 10, 20, 50),
+))
+REQUEST_DB_SECONDS = register(Histogram("http_request_db_seconds", "Time one request spent waiting on the database", ("method", "route")))
+DB_CALLS = register(Counter("supabase_calls_total", "Supabase (PostgREST) calls", ("method", "target", "status")))
+DB_CALL_LATENCY = register(Histogram("supabase_call_duration_seconds", "Supabase (PostgREST) call latency", ("method", "target")))
+SQL_QUERIES = register(Counter("postgres_queries_total", "Direct Postgres queries (DATABASE_BACKEND=postgres)", ("target", "status")))
+SQL_QUERY_LATENCY = register(Histogram("postgres_query_duration_seconds", "Direct Postgres query latency", ("target",)))
+
+# --- Per-request database accounting ---
+
+@dataclass
+class DBCall:
+    method: str
+    target: str
+    status: int
+    seconds: float
+
+@dataclass
+class RequestStats:
+    calls: List[DBCall] = field(default_factory=list)
+
+    @property
+    def db_seconds(self) -> float:
+        return sum(call.seconds for call in self.calls)
+
+# Set by the metrics middleware for the duration of each HTTP request
+request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+def _target(url: httpx.URL) -> str:
+    """Table or rpc/<function> a PostgREST URL addresses (bounded label cardinality)."""
+    path = url.path
+    marker = "/rest/v1/"
+    if marker in path:
+        return path.split(marker, 1)[1].strip("/") or "/"
+    return path
+
+def _record_request_call(call: DBCall) -> None:
+    stats = request_stats.get()
+    if stats is not None:
+        stats.calls.append(call)
+
+def record_db_call(method: str, target: str, status: int, elapsed: float) -> None:
+    """One PostgREST round trip."""
+    DB_CALLS.inc(method, target, str(status))
+    DB_CALL_LATENCY.observe(elapsed, method, target)
+    _record_request_call(DBCall(method, target, status, elapsed))
+
+def record_sql_query(target: str, status: int, elapsed: float) -> None:
+    """One transaction on the direct Postgres pool; counted per request like a PostgREST call."""
+    SQL_QUERIES.inc(target, str(status))
+    SQL_QUERY_LATENCY.observe(elapsed, target)
+    _record_request_call(DBCall("SQL", target, status, elapsed))
+
+class _TimedStream(httpx.AsyncByteStream):
+    """Response body wrapper that records the call once the body has been read and closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_close: Callable[[], None]):
+        self._stream, self._on_close = stream, on_close
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._on_close()
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Wraps the pooled transport so every supabase.table(...)/rpc(...).execute() is timed and counted."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        target = _target(request.url)
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception:
+            record_db_call(request.method, target, 599, time.perf_counter() - start)
+            raise
+        status = response.status_code
+        response.stream = _TimedStream(
+            response.stream,
+            lambda: record_db_call(request.method, target, status, time.perf_counter() - start),
+        )
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
@@ -0,0 +1,6 @@
+from app.middleware.admission import AdmissionControlMiddleware
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+
+__all__ = ["AdmissionControlMiddleware", "CompressionMiddleware", "MetricsMiddleware", "ProfilingMiddleware"]
@@ -0,0 +1,242 @@
+import asyncio
+import json
+import math
+import re
+import time
+from collections import deque
+from typing import Dict, Tuple
+from urllib.parse import parse_qs
+from cachetools import TTLCache
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+from app.metrics import Counter, register
+
+ADMISSION_REJECTIONS = register(Counter(
+    "admission_rejections_total", "Requests shed by admission control", ("route", "reason"),
+))
+
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+# Largest body read up front to find the email a rate limit is keyed on
+MAX_KEY_BODY_BYTES = 64 * 1024
+
+def _route_key(method: str, path: str) -> str:
+    return f"{method} {path.rstrip('/') or '/'}"
+
+def exempt_pattern(path: str) -> re.Pattern:
+    """"/api/registrations/tickets/{ticket_id}" -> a pattern matching any one segment in place of {ticket_id}."""
+    segments = (path.rstrip("/") or "/").split("/")
+    return re.compile("/".join("[^/]+" if s.startswith("{") and s.endswith("}") else re.escape(s) for s in segments))
+
+def parse_rate(spec: str) -> Tuple[float, float, str]:
+    """"10/60:email" -> (10 requests, per 60 seconds, keyed on email); the key is ip or email."""
+    rate, _, key = spec.partition(":")
+    count, _, seconds = rate.partition("/")
+    return float(count), float(seconds or 1), key or "ip"
+
+class Rejected(Exception):
+    def __init__(self, status_code: int, detail: str, retry_after: float, reason: str):
+        self.status_code, self.detail, self.retry_after, self.reason = status_code, detail, retry_after, reason
+
+class TokenBuckets:
+    """One bucket per key; an idle bucket expires once it would have refilled anyway."""
+
+    def __init__(self, capacity: float, period: float, max_keys: int):
+        self.capacity, self.rate = capacity, capacity / period
+        self._buckets: TTLCache = TTLCache(maxsize=max_keys, ttl=period)
+
+    def take(self, key: str) -> float:
+        """0 if a token was taken, else seconds until one is available."""
+        now = time.monotonic()
+        tokens, last = self._buckets.get(key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - last) * self.rate)
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            return 0.0
+        self._buckets[key] = (tokens, now)
+        return (1 - tokens) / self.rate
+
+class PriorityLimiter:
+    """
+    Caps requests in flight. Writes may only fill write_share of the slots, so
+    reads always have headroom; when every slot is taken, waiting reads are
+    admitted before waiting writes. Waiting is bounded in count and time.
+    """
+
+    def __init__(self, limit: int, write_share: float, max_waiting: int, timeout: float):
+        self.limit = limit
+        self.write_limit = max(1, int(limit * write_share))
+        self.max_waiting, self.timeout = max_waiting, timeout
+        self.in_flight = 0
+        self._waiting: Dict[str, deque] = {"read": deque(), "write": deque()}
+
+    def _can_run(self, kind: str) -> bool:
+        return self.in_flight < (self.limit if kind == "read" else self.write_limit)
+
+    async def acquire(self, kind: str) -> None:
+        if self._can_run(kind) and not self._waiting["read"] and (kind == "read" or not self._waiting["write"]):
+            self.in_flight += 1
+            return
+        queue = self._waiting[kind]
+        if len(queue) >= self.max_waiting:
+            raise Rejected(503, "Server is busy, try again shortly", settings.ADMISSION_RETRY_AFTER_SECONDS, f"{kind}_queue_full")
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.timeout)
+        except asyncio.TimeoutError:
+            if waiter.done():
+                # Granted just as the wait ran out: keep the slot
+                return
+            queue.remove(waiter)
+            raise Rejected(503, "Server is busy, try again shortly", settings.ADMISSION_RETRY_AFTER_SECONDS, f"{kind}_queue_timeout")
+        except asyncio.CancelledError:
+            if waiter.done():
+                self.release()
+            else:
+                queue.remove(waiter)
+            raise
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        for kind in ("read", "write"):
+            queue = self._waiting[kind]
+            while queue and self._can_run(kind):
+                # The slot passes straight to the waiter
+                self.in_flight += 1
+                queue.popleft().set_result(None)
+
+class AdmissionControlMiddleware:
+    """
+    Load shedding in front of the routers:
+    - token-bucket rate limits per route, keyed on client IP or the email in the body (429)
+    - a concurrency cap per route (503, no queueing)
+    - a global in-flight cap that favours reads over writes (503 once its short queue is full)
+    Rejections are immediate JSON responses with Retry-After.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.exempt = [exempt_pattern(path) for path in settings.ADMISSION_EXEMPT_PATHS]
+        self.route_limits = {_route_key(*key.split(" ", 1)): limit for key, limit in settings.ADMISSION_ROUTE_LIMITS.items()}
+        self.route_in_flight: Dict[str, int] = {key: 0 for key in self.route_limits}
+        self.rate_limits: Dict[str, Tuple[TokenBuckets, str]] = {}
+        for key, spec in settings.ADMISSION_RATE_LIMITS.items():
+            count, period, key_on = parse_rate(spec)
+            self.rate_limits[_route_key(*key.split(" ", 1))] = (TokenBuckets(count, period, settings.ADMISSION_RATE_LIMIT_KEYS), key_on)
+        self.limiter = PriorityLimiter(
+            settings.ADMISSION_MAX_IN_FLIGHT,
+            settings.ADMISSION_WRITE_SHARE,
+            settings.ADMISSION_MAX_WAITING,
+            settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self._is_exempt(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        key = _route_key(scope["method"], scope["path"])
+        kind = "read" if scope["method"] in READ_METHODS else "write"
+        route_limited = key in self.route_limits
+        try:
+            if key in self.rate_limits:
+                receive = await self._check_rate(scope, receive, key)
+            if route_limited:
+                if self.route_in_flight[key] >= self.route_limits[key]:
+                    raise Rejected(503, "Too many concurrent requests for this endpoint", settings.ADMISSION_RETRY_AFTER_SECONDS, "route_concurrency")
+                self.route_in_flight[key] += 1
+            try:
+                await self.limiter.acquire(kind)
+            except BaseException:
+                if route_limited:
+                    self.route_in_flight[key] -= 1
+                raise
+        except Rejected as rejected:
+            ADMISSION_REJECTIONS.inc(key if key in self.route_limits or key in self.rate_limits else kind, rejected.reason)
+            await self._reject(send, rejected)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release()
+            if route_limited:
+                self.route_in_flight[key] -= 1
+
+    def _is_exempt(self, path: str) -> bool:
+        path = path.rstrip("/") or "/"
+        return any(pattern.fullmatch(path) for pattern in self.exempt)
+
+    def _client_ip(self, scope: Scope) -> str:
+        header = settings.ADMISSION_CLIENT_IP_HEADER.lower().encode()
+        if header:
+            for name, value in scope.get("headers", []):
+                if name == header:
+                    return value.decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    async def _check_rate(self, scope: Scope, receive: Receive, key: str) -> Receive:
+        """Take a token for this request; returns the receive to hand on (replaying any body read here)."""
+        buckets, key_on = self.rate_limits[key]
+        subject = None
+        if key_on == "email":
+            body, receive = await _buffer_body(receive)
+            subject = _email_from_body(scope, body)
+        # Requests without an email fall back to the caller's IP
+        subject = f"email:{subject.lower()}" if subject else f"ip:{self._client_ip(scope)}"
+        wait = buckets.take(subject)
+        if wait:
+            raise Rejected(429, "Too many requests, slow down", wait, "rate_limited")
+        return receive
+
+    async def _reject(self, send: Send, rejected: Rejected) -> None:
+        body = json.dumps({"detail": rejected.detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": rejected.status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(rejected.retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+async def _buffer_body(receive: Receive) -> Tuple[bytes, Receive]:
+    chunks, size, more = [], 0, True
+    while more and size <= MAX_KEY_BODY_BYTES:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        size += len(chunks[-1])
+        more = message.get("more_body", False)
+    body = b"".join(chunks)
+    replayed = False
+
+    async def replay() -> Message:
+        nonlocal replayed
+        if not replayed:
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": more}
+        return await receive()
+
+    return body, replay
+
+def _email_from_body(scope: Scope, body: bytes) -> str | None:
+    content_type = ""
+    for name, value in scope.get("headers", []):
+        if name == b"content-type":
+            content_type = value.decode("latin-1").lower()
+    try:
+        if "application/x-www-form-urlencoded" in content_type:
+            form = parse_qs(body.decode())
+            values = form.get("username") or form.get("email")
+            return values[0] if values else None
+        if "json" in content_type:
+            data = json.loads(body)
+            return data.get("email") if isinstance(data, dict) and isinstance(data.get("email"), str) else None
+    except (ValueError, UnicodeDecodeError):
+        return None
+    return None
@@ -0,0 +1,148 @@
+import gzip
+from typing import Dict
+import zstandard
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+from app.metrics import Counter, register
+
+try:
+    import brotli
+except ImportError:  # optional: br is offered only when the package is installed
+    brotli = None
+
+COMPRESSED_RESPONSES = register(Counter(
+    "http_compressed_responses_total", "Responses compressed by content coding", ("encoding",),
+))
+COMPRESSION_BYTES = register(Counter(
+    "http_compression_bytes_total", "Response body bytes before and after compression", ("encoding", "stage"),
+))
+
+# Only text-like bodies shrink; images, archives and already-compressed exports do not
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml", "application/problem+json")
+# Held open and flushed message by message; buffering them would break the stream
+STREAMING_TYPES = ("text/event-stream",)
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """'zstd, gzip;q=0.8, *;q=0' -> {"zstd": 1.0, "gzip": 0.8, "*": 0.0}"""
+    accepted: Dict[str, float] = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+def _weaken_etag(headers: MutableHeaders) -> None:
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
+
+class CompressionMiddleware:
+    """
+    Compresses complete, text-like responses of at least COMPRESSION_MIN_SIZE
+    bytes with the best coding the client accepts, in COMPRESSION_ENCODINGS
+    order (zstd, br, gzip by default; br only with the brotli package).
+
+    A response is only compressed when its whole body arrives in one message,
+    so streamed responses (registration exports, SSE) pass through untouched,
+    as do bodies that already carry a Content-Encoding. Compressible responses
+    get a weak ETag whenever a coding was negotiated, since the bytes may differ
+    from the identity representation and a 304 cannot tell whether they did.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.encodings = [e for e in settings.COMPRESSION_ENCODINGS if e in ("zstd", "gzip") or (e == "br" and brotli)]
+        self._zstd = zstandard.ZstdCompressor(level=settings.COMPRESSION_ZSTD_LEVEL)
+
+    def choose(self, accept_encoding: str) -> str | None:
+        accepted = parse_accept_encoding(accept_encoding)
+        wildcard = accepted.get("*", 0.0)
+        best, best_q = None, 0.0
+        for encoding in self.encodings:
+            q = accepted.get(encoding, wildcard)
+            # Ties go to the server's preference order
+            if q > best_q:
+                best, best_q = encoding, q
+        return best
+
+    def compress(self, encoding: str, body: bytes) -> bytes:
+        if encoding == "zstd":
+            return self._zstd.compress(body)
+        if encoding == "br":
+            return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_LEVEL)
+        return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        # None: the client accepts no coding we offer; the response still varies on the header
+        encoding = self.choose(Headers(scope=scope).get("accept-encoding", ""))
+
+        start: Message | None = None
+        # Set once the response is known not to be compressed: forward as-is from then on
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                if message["status"] == 304:
+                    # Revalidates the 200 the client holds: same validator, same Vary
+                    headers = MutableHeaders(raw=message["headers"])
+                    headers.add_vary_header("Accept-Encoding")
+                    if encoding is not None:
+                        _weaken_etag(headers)
+                    passthrough = True
+                    await send(message)
+                    return
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "").lower()
+                compressible = content_type.startswith(COMPRESSIBLE_TYPES) and not content_type.startswith(STREAMING_TYPES)
+                if "content-encoding" in headers or not compressible:
+                    passthrough = True
+                    await send(message)
+                else:
+                    # Varies by Accept-Encoding whether or not this one ends up compressed, error bodies included
+                    headers = MutableHeaders(raw=message["headers"])
+                    headers.add_vary_header("Accept-Encoding")
+                    if encoding is not None:
+                        # Weak even if the body turns out too small to compress: the 304 can't tell
+                        _weaken_etag(headers)
+                if encoding is None and not passthrough:
+                    passthrough = True
+                    await send(message)
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            passthrough = True
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < settings.COMPRESSION_MIN_SIZE or start["status"] == 204:
+                await send(start)
+                await send(message)
+                return
+
+            compressed = self.compress(encoding, body)
+            COMPRESSED_RESPONSES.inc(encoding)
+            COMPRESSION_BYTES.inc(encoding, "in", amount=len(body))
+            COMPRESSION_BYTES.inc(encoding, "out", amount=len(compressed))
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed, "more_body": False})
+
+        await self.app(scope, receive, send_wrapper)
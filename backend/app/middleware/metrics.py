@@ -0,0 +1,48 @@
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.metrics import (
+    REQUESTS, REQUEST_LATENCY, REQUEST_DB_CALLS, REQUEST_DB_SECONDS,
+    RequestStats, request_stats,
+)
+
+def route_label(scope: Scope) -> str:
+    """The matched route template (e.g. /api/events/{event_id}), never the raw path."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "<unmatched>"
+
+class MetricsMiddleware:
+    """
+    Records per-route latency, status and the database round trips (count and
+    time) made while serving each request. Pure ASGI so streaming responses
+    are measured until their last byte.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+            
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            method, route = scope["method"], route_label(scope)
+            REQUESTS.inc(method, route, str(status_code))
+            REQUEST_LATENCY.observe(elapsed, method, route)
+            REQUEST_DB_CALLS.observe(len(stats.calls), method, route)
+            REQUEST_DB_SECONDS.observe(stats.db_seconds, method, route)
+            request_stats.reset(token)
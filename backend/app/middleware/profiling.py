@@ -0,0 +1,50 @@
+import sys
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.metrics import RequestStats, request_stats
+from app.middleware.metrics import route_label
+from app.services.profiling import request_profiler
+
+class ProfilingMiddleware:
+    """
+    Feeds the admin profiler (app.services.profiling): samples a share of
+    requests and times every request for the slow-request log. While both are
+    switched off it passes requests straight through.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not request_profiler.active:
+            await self.app(scope, receive, send)
+            return
+
+        method, path = scope["method"], scope["path"]
+        query = scope.get("query_string", b"").decode("latin-1")
+        # The metrics middleware normally records the DB calls; count them here when it is off
+        stats, token = request_stats.get(), None
+        if stats is None:
+            stats = RequestStats()
+            token = request_stats.set(stats)
+        # Samples whose stack passes through this coroutine's frame belong to this request
+        frame = sys._getframe()
+        profile = request_profiler.watch(frame, method, path, query) if request_profiler.should_sample() else None
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            if profile is not None:
+                request_profiler.unwatch(frame)
+            request_profiler.finish(profile, method, route_label(scope), path, query, status_code, elapsed, stats)
+            if token is not None:
+                request_stats.reset(token)
@@ -0,0 +1,17 @@
+from app.config import settings
+from app.repositories.base import Repository
+
+def _make_repository(backend: str) -> Repository:
+    if backend == "postgres":
+        if not settings.DATABASE_URL:
+            raise RuntimeError("DATABASE_BACKEND=postgres needs DATABASE_URL")
+        from app.repositories.postgres_repository import PostgresRepository
+        return PostgresRepository(settings.DATABASE_URL)
+    if backend == "supabase":
+        from app.repositories.supabase_repository import SupabaseRepository
+        return SupabaseRepository()
+    raise RuntimeError(f"Unknown DATABASE_BACKEND: {backend}")
+
+repository = _make_repository(settings.DATABASE_BACKEND)
+
+__all__ = ["Repository", "repository"]
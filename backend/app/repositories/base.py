@@ -0,0 +1,126 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, List, Literal, Tuple
+
+Row = Dict[str, Any]
+
+class Repository(ABC):
+    """
+    Every query the services make, behind one interface with a Supabase
+    (PostgREST) and a direct Postgres implementation. Rows are plain
+    JSON-shaped dicts (string ids, ISO timestamps) whichever backend served them.
+    Events come back flattened: creator_name and registration_count are fields.
+    """
+
+    name = "base"
+
+    async def close(self) -> None:
+        pass
+
+    # --- Events ---
+
+    @abstractmethod
+    async def list_events(
+        self, offset: int, limit: int, after: List[str] | None = None, count: str | None = None
+    ) -> Tuple[List[Row], int | None]:
+        """Active events in (event_date, id) order: past the `after` key if given, else from `offset`. Total only when `count` is set."""
+
+    @abstractmethod
+    async def search_events(self, query: str, offset: int, limit: int, count: str | None = None) -> Tuple[List[Row], int | None]:
+        """Ranked search over active events (search_events in schema.sql), best match first."""
+
+    @abstractmethod
+    async def get_event(self, event_id: str) -> Row | None:
+        ...
+
+    @abstractmethod
+    async def get_events(self, event_ids: List[str]) -> List[Row]:
+        ...
+
+    @abstractmethod
+    async def insert_event(self, data: Row) -> Row:
+        """Insert and return the bare events row (no creator_name/registration_count)."""
+
+    @abstractmethod
+    async def update_event(self, event_id: str, changes: Row) -> Row | None:
+        """Update and return the bare events row; None when there is no such event."""
+
+    @abstractmethod
+    async def count_registrations(self, event_id: str) -> int:
+        ...
+
+    # --- Registrations ---
+
+    @abstractmethod
+    async def register_for_event(self, user_id: str, event_id: str) -> Row:
+        """The register_for_event result: {"status", "registration", "registration_count"}."""
+
+    @abstractmethod
+    async def register_users_bulk(self, event_id: str, user_ids: List[str]) -> List[Row]:
+        """One {"user_id", "status", "registration_id"} row per distinct user (register_users_bulk)."""
+
+    @abstractmethod
+    async def list_user_registrations(self, user_id: str) -> List[Row]:
+        """A user's registrations, newest first, with event_title and event_date."""
+
+    @abstractmethod
+    async def get_user_registration_ids(self, user_id: str, event_ids: List[str]) -> Dict[str, str]:
+        """event_id -> registration id for those of `event_ids` the user is registered for."""
+
+    @abstractmethod
+    async def get_registration(self, registration_id: str) -> Row | None:
+        ...
+
+    @abstractmethod
+    async def delete_registration(self, registration_id: str) -> None:
+        ...
+
+    @abstractmethod
+    async def list_event_registrations(self, event_id: str, after: List[str] | None = None, limit: int | None = None) -> List[Row]:
+        """{"registration_id", "user_full_name", "user_email", "registered_at"} in (registered_at, id) order."""
+
+    # --- Users ---
+
+    @abstractmethod
+    async def get_user_by_email(self, email: str) -> Row | None:
+        ...
+
+    @abstractmethod
+    async def get_user(self, user_id: str) -> Row | None:
+        ...
+
+    @abstractmethod
+    async def insert_user(self, data: Row) -> Row:
+        ...
+
+    @abstractmethod
+    async def update_user(self, user_id: str, changes: Row) -> Row | None:
+        ...
+
+    @abstractmethod
+    async def insert_missing_users(self, users: List[Row]) -> Dict[str, str]:
+        """Insert the users whose email is not taken (existing rows are left alone); email -> id for all of them."""
+
+    @abstractmethod
+    async def list_users(self, offset: int, limit: int, after: List[str] | None = None) -> List[Row]:
+        """Newest first on (created_at, id): past the `after` key if given, else from `offset`."""
+
+    @abstractmethod
+    async def list_users_changed_since(self, since: datetime) -> List[Row]:
+        """id and updated_at of every user whose row changed after `since`."""
+
+    # --- Analytics (rollups in schema.sql) ---
+
+    @abstractmethod
+    async def analytics_summary(self) -> Row:
+        ...
+
+    @abstractmethod
+    async def registration_trend(
+        self, bucket: Literal["hour", "day"], start: str, end: str, event_id: str | None, tz: str
+    ) -> List[Row]:
+        ...
+
+    @abstractmethod
+    async def event_fill_stats(self, limit: int, order: Literal["registrations", "date"], since: str | None = None) -> List[Row]:
+        """Active events' fill ratios, most registered first or soonest first (from `since`)."""
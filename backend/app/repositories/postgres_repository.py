@@ -0,0 +1,371 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Literal, Tuple, TypeVar
+from uuid import UUID
+import psycopg2
+from sqlalchemy import create_engine
+from app.config import settings
+from app.metrics import record_sql_query
+from app.repositories.base import Repository, Row
+
+# Direct connection to Postgres (DATABASE_URL) through a SQLAlchemy QueuePool of
+# psycopg2 connections. psycopg2 blocks, so each repository call runs as one
+# transaction on a thread pool as large as the connection pool. Statements are
+# PREPAREd once per connection and run with EXECUTE, so Postgres parses and
+# plans each one once per connection instead of once per call. That needs
+# session-level connections: connect directly or through a pooler in session
+# mode, not transaction mode.
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+EVENT_COLUMNS = ("id", "title", "description", "location", "event_date", "capacity", "is_active", "created_by", "created_at", "updated_at")
+EVENT_WRITABLE = {"title", "description", "location", "event_date", "capacity", "is_active", "created_by"}
+USER_COLUMNS = ("id", "email", "full_name", "hashed_password", "is_admin", "is_active", "created_at", "updated_at")
+USER_WRITABLE = {"email", "full_name", "hashed_password", "is_admin", "is_active"}
+
+# Same shape as the PostgREST embedding: creator name joined, registrations counted per event
+EVENT_ROW = (
+    ", ".join(f"e.{column}" for column in EVENT_COLUMNS)
+    + ", u.full_name AS creator_name"
+    + ", (SELECT count(*) FROM public.registrations r WHERE r.event_id = e.id) AS registration_count"
+)
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+class Session:
+    """One pooled connection inside one transaction; statements are prepared on first use per connection."""
+
+    _names: Dict[str, str] = {}
+
+    def __init__(self, connection):
+        self._connection = connection
+        self._prepared: set = connection.info.setdefault("prepared", set())
+
+    @classmethod
+    def _name(cls, sql: str) -> str:
+        name = cls._names.get(sql)
+        if name is None:
+            name = cls._names[sql] = "es_" + hashlib.sha1(sql.encode()).hexdigest()[:16]
+        return name
+
+    def all(self, sql: str, *params: Any) -> List[Row]:
+        """Run `sql` (with $1, $2... placeholders) as a prepared statement."""
+        name = self._name(sql)
+        with self._connection.cursor() as cur:
+            if name not in self._prepared:
+                cur.execute(f"PREPARE {name} AS {sql}")
+                self._prepared.add(name)
+            cur.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})" if params else f"EXECUTE {name}", params)
+            if cur.description is None:
+                return []
+            columns = [column.name for column in cur.description]
+            return [{c: _jsonable(v) for c, v in zip(columns, row)} for row in cur.fetchall()]
+
+    def one(self, sql: str, *params: Any) -> Row | None:
+        rows = self.all(sql, *params)
+        return rows[0] if rows else None
+
+    def scalar(self, sql: str, *params: Any) -> Any:
+        row = self.one(sql, *params)
+        return next(iter(row.values())) if row else None
+
+    def planned_rows(self, sql: str, *params: Any) -> int:
+        """The planner's row estimate for a query (PostgREST's count=planned)."""
+        with self._connection.cursor() as cur:
+            cur.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cur.fetchone()[0]
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+def _uuid_array(values: List[str]) -> str:
+    # A Postgres array literal: psycopg2 would send a Python list as text[]
+    return "{" + ",".join(str(value) for value in values) + "}"
+
+class PostgresRepository(Repository):
+    name = "postgres"
+
+    def __init__(self, dsn: str):
+        self._engine = create_engine(
+            dsn,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_POOL_MAX_OVERFLOW,
+            pool_timeout=settings.DB_TIMEOUT_SECONDS,
+            # Recycled rather than pinged: a ping would cost a round trip on every checkout
+            pool_recycle=1800,
+            # Timestamps come back in UTC, as PostgREST returns them
+            connect_args={"options": "-c timezone=UTC", "connect_timeout": int(settings.DB_TIMEOUT_SECONDS)},
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.DB_POOL_SIZE + settings.DB_POOL_MAX_OVERFLOW, thread_name_prefix="postgres"
+        )
+
+    def _transaction(self, work: Callable[[Session], T]) -> T:
+        connection = self._engine.raw_connection()
+        try:
+            result = work(Session(connection))
+            connection.commit()
+            return result
+        except BaseException as e:
+            # A lost connection must not go back to the pool
+            broken = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+            if not broken:
+                try:
+                    connection.rollback()
+                except Exception as rollback_error:
+                    # Report the original error, not the failed cleanup
+                    logger.error(f"Rollback failed: {type(rollback_error).__name__}: {rollback_error}")
+                    broken = True
+            if broken:
+                connection.invalidate()
+            raise
+        finally:
+            # Back to the pool, prepared statements and all (or discarded if invalidated)
+            connection.close()
+
+    async def _run(self, label: str, work: Callable[[Session], T]) -> T:
+        start, status = time.perf_counter(), 200
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, self._transaction, work)
+        except Exception:
+            status = 500
+            raise
+        finally:
+            record_sql_query(label, status, time.perf_counter() - start)
+
+    async def close(self) -> None:
+        self._executor.shutdown(wait=False)
+        self._engine.dispose()
+
+    # --- Events ---
+
+    async def list_events(
+        self, offset: int, limit: int, after: List[str] | None = None, count: str | None = None
+    ) -> Tuple[List[Row], int | None]:
+        def work(session: Session) -> Tuple[List[Row], int | None]:
+            if after:
+                seek = "e.is_active AND (e.event_date, e.id) > ($1::timestamptz, $2::uuid)"
+                rows = session.all(
+                    f"SELECT {EVENT_ROW} FROM public.events e LEFT JOIN public.users u ON u.id = e.created_by "
+                    f"WHERE {seek} ORDER BY e.event_date, e.id LIMIT $3",
+                    after[0], after[1], limit,
+                )
+                # The total is the whole active catalogue on every page, as on the first
+                return rows, self._count(session, count, "FROM public.events e WHERE e.is_active")
+            rows = session.all(
+                f"SELECT {EVENT_ROW} FROM public.events e LEFT JOIN public.users u ON u.id = e.created_by "
+                "WHERE e.is_active ORDER BY e.event_date, e.id OFFSET $1 LIMIT $2",
+                offset, limit,
+            )
+            return rows, self._count(session, count, "FROM public.events e WHERE e.is_active")
+        return await self._run("events", work)
+
+    @staticmethod
+    def _count(session: Session, count: str | None, from_where: str, *params: Any) -> int | None:
+        if count is None:
+            return None
+        if count == "exact":
+            return session.scalar(f"SELECT count(*) {from_where}", *params)
+        # planned / estimated: EXPLAIN wants %s placeholders, not $n
+        placeholders = from_where
+        for i in range(len(params), 0, -1):
+            placeholders = placeholders.replace(f"${i}", "%s")
+        return session.planned_rows(f"SELECT 1 {placeholders}", *params)
+
+    async def search_events(self, query: str, offset: int, limit: int, count: str | None = None) -> Tuple[List[Row], int | None]:
+        def work(session: Session) -> Tuple[List[Row], int | None]:
+            rows = session.all(
+                f"SELECT {EVENT_ROW} FROM public.search_events($1) WITH ORDINALITY AS e "
+                "LEFT JOIN public.users u ON u.id = e.created_by ORDER BY e.ordinality OFFSET $2 LIMIT $3",
+                query, offset, limit,
+            )
+            # The planner cannot estimate a function's result size, so any count is exact
+            total = session.scalar("SELECT count(*) FROM public.search_events($1)", query) if count else None
+            return rows, total
+        return await self._run("rpc/search_events", work)
+
+    async def get_event(self, event_id: str) -> Row | None:
+        return await self._run("events", lambda session: session.one(
+            f"SELECT {EVENT_ROW} FROM public.events e LEFT JOIN public.users u ON u.id = e.created_by WHERE e.id = $1::uuid",
+            str(event_id),
+        ))
+
+    async def get_events(self, event_ids: List[str]) -> List[Row]:
+        return await self._run("events", lambda session: session.all(
+            f"SELECT {EVENT_ROW} FROM public.events e LEFT JOIN public.users u ON u.id = e.created_by WHERE e.id = ANY($1::uuid[])",
+            _uuid_array(event_ids),
+        ))
+
+    async def insert_event(self, data: Row) -> Row:
+        columns = sorted(column for column in data if column in EVENT_WRITABLE)
+        sql = (
+            f"INSERT INTO public.events ({', '.join(columns)}) "
+            f"VALUES ({', '.join(f'${i}' for i in range(1, len(columns) + 1))}) RETURNING {', '.join(EVENT_COLUMNS)}"
+        )
+        return await self._run("events", lambda session: session.one(sql, *(data[column] for column in columns)))
+
+    async def update_event(self, event_id: str, changes: Row) -> Row | None:
+        columns = sorted(column for column in changes if column in EVENT_WRITABLE)
+        sql = (
+            f"UPDATE public.events SET {', '.join(f'{column} = ${i}' for i, column in enumerate(columns, 2))} "
+            f"WHERE id = $1::uuid RETURNING {', '.join(EVENT_COLUMNS)}"
+        )
+        return await self._run("events", lambda session: session.one(sql, str(event_id), *(changes[column] for column in columns)))
+
+    async def count_registrations(self, event_id: str) -> int:
+        return await self._run("registrations", lambda session: session.scalar(
+            "SELECT count(*) FROM public.registrations WHERE event_id = $1::uuid", str(event_id),
+        ))
+
+    # --- Registrations ---
+
+    async def register_for_event(self, user_id: str, event_id: str) -> Row:
+        return await self._run("rpc/register_for_event", lambda session: session.scalar(
+            "SELECT public.register_for_event($1::uuid, $2::uuid)", str(user_id), str(event_id),
+        ) or {})
+
+    async def register_users_bulk(self, event_id: str, user_ids: List[str]) -> List[Row]:
+        return await self._run("rpc/register_users_bulk", lambda session: session.all(
+            "SELECT user_id, status, registration_id FROM public.register_users_bulk($1::uuid, $2::uuid[])",
+            str(event_id), _uuid_array(user_ids),
+        ))
+
+    async def list_user_registrations(self, user_id: str) -> List[Row]:
+        return await self._run("registrations", lambda session: session.all(
+            "SELECT r.id, r.user_id, r.event_id, r.registered_at, e.title AS event_title, e.event_date "
+            "FROM public.registrations r LEFT JOIN public.events e ON e.id = r.event_id "
+            "WHERE r.user_id = $1::uuid ORDER BY r.registered_at DESC",
+            str(user_id),
+        ))
+
+    async def get_user_registration_ids(self, user_id: str, event_ids: List[str]) -> Dict[str, str]:
+        rows = await self._run("registrations", lambda session: session.all(
+            "SELECT id, event_id FROM public.registrations WHERE user_id = $1::uuid AND event_id = ANY($2::uuid[])",
+            str(user_id), _uuid_array(event_ids),
+        ))
+        return {row["event_id"]: row["id"] for row in rows}
+
+    async def get_registration(self, registration_id: str) -> Row | None:
+        return await self._run("registrations", lambda session: session.one(
+            "SELECT id, user_id, event_id, registered_at FROM public.registrations WHERE id = $1::uuid", str(registration_id),
+        ))
+
+    async def delete_registration(self, registration_id: str) -> None:
+        await self._run("registrations", lambda session: session.all(
+            "DELETE FROM public.registrations WHERE id = $1::uuid", str(registration_id),
+        ))
+
+    async def list_event_registrations(self, event_id: str, after: List[str] | None = None, limit: int | None = None) -> List[Row]:
+        select = (
+            "SELECT r.id AS registration_id, u.full_name AS user_full_name, u.email AS user_email, r.registered_at "
+            "FROM public.registrations r LEFT JOIN public.users u ON u.id = r.user_id WHERE r.event_id = $1::uuid"
+        )
+        if after:
+            return await self._run("registrations", lambda session: session.all(
+                f"{select} AND (r.registered_at, r.id) > ($2::timestamptz, $3::uuid) ORDER BY r.registered_at, r.id LIMIT $4",
+                str(event_id), after[0], after[1], limit,
+            ))
+        # LIMIT NULL means no limit
+        return await self._run("registrations", lambda session: session.all(
+            f"{select} ORDER BY r.registered_at, r.id LIMIT $2", str(event_id), limit,
+        ))
+
+    # --- Users ---
+
+    async def get_user_by_email(self, email: str) -> Row | None:
+        return await self._run("users", lambda session: session.one(
+            f"SELECT {', '.join(USER_COLUMNS)} FROM public.users WHERE email = $1", email,
+        ))
+
+    async def get_user(self, user_id: str) -> Row | None:
+        return await self._run("users", lambda session: session.one(
+            f"SELECT {', '.join(USER_COLUMNS)} FROM public.users WHERE id = $1::uuid", str(user_id),
+        ))
+
+    async def insert_user(self, data: Row) -> Row:
+        columns = sorted(column for column in data if column in USER_WRITABLE)
+        sql = (
+            f"INSERT INTO public.users ({', '.join(columns)}) "
+            f"VALUES ({', '.join(f'${i}' for i in range(1, len(columns) + 1))}) RETURNING {', '.join(USER_COLUMNS)}"
+        )
+        return await self._run("users", lambda session: session.one(sql, *(data[column] for column in columns)))
+
+    async def update_user(self, user_id: str, changes: Row) -> Row | None:
+        columns = sorted(column for column in changes if column in USER_WRITABLE)
+        sql = (
+            f"UPDATE public.users SET {', '.join(f'{column} = ${i}' for i, column in enumerate(columns, 2))} "
+            f"WHERE id = $1::uuid RETURNING {', '.join(USER_COLUMNS)}"
+        )
+        return await self._run("users", lambda session: session.one(sql, str(user_id), *(changes[column] for column in columns)))
+
+    async def insert_missing_users(self, users: List[Row]) -> Dict[str, str]:
+        emails = [user["email"] for user in users]
+
+        def work(session: Session) -> Dict[str, str]:
+            session.all(
+                "INSERT INTO public.users (email, full_name, hashed_password, is_admin, is_active) "
+                "SELECT * FROM unnest($1::text[], $2::text[], $3::text[], $4::boolean[], $5::boolean[]) "
+                "ON CONFLICT (email) DO NOTHING",
+                emails,
+                [user["full_name"] for user in users],
+                [user["hashed_password"] for user in users],
+                [bool(user.get("is_admin", False)) for user in users],
+                [bool(user.get("is_active", True)) for user in users],
+            )
+            # A second statement in the same transaction also sees rows a concurrent insert just committed
+            rows = session.all("SELECT id, email FROM public.users WHERE email = ANY($1::text[])", emails)
+            return {row["email"]: row["id"] for row in rows}
+        return await self._run("users", work)
+
+    async def list_users(self, offset: int, limit: int, after: List[str] | None = None) -> List[Row]:
+        select = f"SELECT {', '.join(USER_COLUMNS)} FROM public.users"
+        if after:
+            return await self._run("users", lambda session: session.all(
+                f"{select} WHERE (created_at, id) < ($1::timestamptz, $2::uuid) ORDER BY created_at DESC, id DESC LIMIT $3",
+                after[0], after[1], limit,
+            ))
+        return await self._run("users", lambda session: session.all(
+            f"{select} ORDER BY created_at DESC, id DESC OFFSET $1 LIMIT $2", offset, limit,
+        ))
+
+    async def list_users_changed_since(self, since: datetime) -> List[Row]:
+        return await self._run("users", lambda session: session.all(
+            "SELECT id, updated_at FROM public.users WHERE updated_at > $1::timestamptz", since,
+        ))
+
+    # --- Analytics ---
+
+    async def analytics_summary(self) -> Row:
+        return await self._run("rpc/analytics_summary", lambda session: session.one(
+            "SELECT * FROM public.analytics_summary()",
+        ) or {})
+
+    async def registration_trend(
+        self, bucket: Literal["hour", "day"], start: str, end: str, event_id: str | None, tz: str
+    ) -> List[Row]:
+        return await self._run("rpc/registration_trend", lambda session: session.all(
+            "SELECT bucket, registrations FROM public.registration_trend($1::text, $2::timestamptz, $3::timestamptz, $4::uuid, $5::text)",
+            bucket, start, end, event_id, tz,
+        ))
+
+    async def event_fill_stats(self, limit: int, order: Literal["registrations", "date"], since: str | None = None) -> List[Row]:
+        order_by = "registration_count DESC, event_id" if order == "registrations" else "event_date, event_id"
+        return await self._run("event_fill_stats", lambda session: session.all(
+            "SELECT event_id, title, event_date, capacity, registration_count, fill_ratio FROM public.event_fill_stats "
+            f"WHERE is_active AND ($1::timestamptz IS NULL OR event_date >= $1::timestamptz) ORDER BY {order_by} LIMIT $2",
+            since, limit,
+        ))
@@ -0,0 +1,198 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Literal, Tuple
+from app.database import supabase
+from app.repositories.base import Repository, Row
+
+# One round trip per read: the creator name and the registration count are
+# embedded by PostgREST instead of being fetched per event. Columns are listed
+# explicitly so the generated search_vector never goes over the wire.
+EVENT_COLUMNS = "id, title, description, location, event_date, capacity, is_active, created_by, created_at, updated_at"
+EVENT_SELECT = f"{EVENT_COLUMNS}, users(full_name), registrations(count)"
+FILL_STATS_COLUMNS = "event_id, title, event_date, capacity, registration_count, fill_ratio"
+
+def _flatten_event(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn the embedded users/registrations resources into EventOut fields."""
+    creator = row.pop("users", None)
+    registrations = row.pop("registrations", None)
+    row["creator_name"] = creator.get("full_name") if creator else None
+    row["registration_count"] = registrations[0].get("count", 0) if registrations else 0
+    return row
+
+def _quoted(value: str) -> str:
+    """Double-quote a value for a PostgREST logic expression, so commas and parentheses stay data."""
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+def keyset_filter(columns: tuple[str, str], values: list[str], descending: bool = False) -> str:
+    """PostgREST or() expression that seeks past the (column, tiebreaker) pair."""
+    op = "lt" if descending else "gt"
+    (sort_column, tiebreaker), (sort_value, tiebreaker_value) = columns, values
+    sort_value, tiebreaker_value = _quoted(sort_value), _quoted(tiebreaker_value)
+    return (
+        f"{sort_column}.{op}.{sort_value},"
+        f"and({sort_column}.eq.{sort_value},{tiebreaker}.{op}.{tiebreaker_value})"
+    )
+
+class SupabaseRepository(Repository):
+    """PostgREST over the pooled HTTP client in app.database."""
+
+    name = "supabase"
+
+    # --- Events ---
+
+    async def list_events(
+        self, offset: int, limit: int, after: List[str] | None = None, count: str | None = None
+    ) -> Tuple[List[Row], int | None]:
+        if after:
+            # A count on the seek request would only cover the rows past the cursor; the total
+            # is the whole active catalogue on every page, so it is counted separately (HEAD, no rows)
+            query = supabase.table("events").select(EVENT_SELECT).eq("is_active", True)
+            query = query.or_(keyset_filter(("event_date", "id"), after)).order("event_date").order("id").limit(limit)
+            if count is None:
+                response, total = await query.execute(), None
+            else:
+                counted = supabase.table("events").select("id", count=count, head=True).eq("is_active", True)
+                response, counted_response = await asyncio.gather(query.execute(), counted.execute())
+                total = counted_response.count
+            return [_flatten_event(row) for row in response.data or []], total
+        query = supabase.table("events").select(EVENT_SELECT, count=count).eq("is_active", True)
+        response = await query.order("event_date").order("id").range(offset, offset + limit - 1).execute()
+        return [_flatten_event(row) for row in response.data or []], response.count
+
+    async def search_events(self, query: str, offset: int, limit: int, count: str | None = None) -> Tuple[List[Row], int | None]:
+        request = supabase.rpc("search_events", {"p_query": query}, count=count).select(EVENT_SELECT)
+        response = await request.range(offset, offset + limit - 1).execute()
+        return [_flatten_event(row) for row in response.data or []], response.count
+
+    async def get_event(self, event_id: str) -> Row | None:
+        response = await supabase.table("events").select(EVENT_SELECT).eq("id", event_id).maybe_single().execute()
+        return _flatten_event(response.data) if response and response.data else None
+
+    async def get_events(self, event_ids: List[str]) -> List[Row]:
+        response = await supabase.table("events").select(EVENT_SELECT).in_("id", event_ids).execute()
+        return [_flatten_event(row) for row in response.data or []]
+
+    async def insert_event(self, data: Row) -> Row:
+        response = await supabase.table("events").insert(data).execute()
+        return response.data[0]
+
+    async def update_event(self, event_id: str, changes: Row) -> Row | None:
+        response = await supabase.table("events").update(changes).eq("id", event_id).execute()
+        return response.data[0] if response.data else None
+
+    async def count_registrations(self, event_id: str) -> int:
+        response = await supabase.table("registrations").select("id", count="exact").eq("event_id", event_id).limit(0).execute()
+        return response.count if response.count is not None else 0
+
+    # --- Registrations ---
+
+    async def register_for_event(self, user_id: str, event_id: str) -> Row:
+        response = await supabase.rpc("register_for_event", {"p_user_id": user_id, "p_event_id": event_id}).execute()
+        return response.data or {}
+
+    async def register_users_bulk(self, event_id: str, user_ids: List[str]) -> List[Row]:
+        response = await supabase.rpc("register_users_bulk", {"p_event_id": event_id, "p_user_ids": user_ids}).execute()
+        return response.data or []
+
+    async def list_user_registrations(self, user_id: str) -> List[Row]:
+        response = await (
+            supabase.table("registrations").select("*, events(title, event_date)")
+            .eq("user_id", user_id).order("registered_at", desc=True).execute()
+        )
+        rows = []
+        for row in response.data or []:
+            event = row.pop("events", None) or {}
+            rows.append({**row, "event_title": event.get("title"), "event_date": event.get("event_date")})
+        return rows
+
+    async def get_user_registration_ids(self, user_id: str, event_ids: List[str]) -> Dict[str, str]:
+        response = await (
+            supabase.table("registrations").select("id, event_id")
+            .eq("user_id", user_id).in_("event_id", event_ids).execute()
+        )
+        return {row["event_id"]: row["id"] for row in response.data or []}
+
+    async def get_registration(self, registration_id: str) -> Row | None:
+        response = await supabase.table("registrations").select("*").eq("id", registration_id).maybe_single().execute()
+        # maybe_single() yields no response at all when nothing matched
+        return response.data if response else None
+
+    async def delete_registration(self, registration_id: str) -> None:
+        await supabase.table("registrations").delete().eq("id", registration_id).execute()
+
+    async def list_event_registrations(self, event_id: str, after: List[str] | None = None, limit: int | None = None) -> List[Row]:
+        query = supabase.table("registrations").select("id, registered_at, users(full_name, email)").eq("event_id", event_id)
+        if after:
+            query = query.or_(keyset_filter(("registered_at", "id"), after))
+        query = query.order("registered_at").order("id")
+        response = await (query.limit(limit) if limit is not None else query).execute()
+        return [
+            {
+                "registration_id": row["id"],
+                "user_full_name": row["users"].get("full_name") if row.get("users") else None,
+                "user_email": row["users"].get("email") if row.get("users") else None,
+                "registered_at": row["registered_at"],
+            }
+            for row in response.data or []
+        ]
+
+    # --- Users ---
+
+    async def get_user_by_email(self, email: str) -> Row | None:
+        response = await supabase.table("users").select("*").eq("email", email).maybe_single().execute()
+        return response.data if response else None
+
+    async def get_user(self, user_id: str) -> Row | None:
+        response = await supabase.table("users").select("*").eq("id", user_id).maybe_single().execute()
+        return response.data if response else None
+
+    async def insert_user(self, data: Row) -> Row:
+        response = await supabase.table("users").insert(data).execute()
+        return response.data[0]
+
+    async def update_user(self, user_id: str, changes: Row) -> Row | None:
+        response = await supabase.table("users").update(changes).eq("id", user_id).execute()
+        return response.data[0] if response.data else None
+
+    async def insert_missing_users(self, users: List[Row]) -> Dict[str, str]:
+        # Existing accounts are left untouched (ignore_duplicates); one select picks up every id
+        await supabase.table("users").upsert(users, on_conflict="email", ignore_duplicates=True, returning="minimal").execute()
+        response = await supabase.table("users").select("id, email").in_("email", [user["email"] for user in users]).execute()
+        return {user["email"]: user["id"] for user in response.data or []}
+
+    async def list_users(self, offset: int, limit: int, after: List[str] | None = None) -> List[Row]:
+        query = supabase.table("users").select("*")
+        if after:
+            query = query.or_(keyset_filter(("created_at", "id"), after, descending=True))
+        query = query.order("created_at", desc=True).order("id", desc=True)
+        response = await (query.limit(limit) if after else query.range(offset, offset + limit - 1)).execute()
+        return response.data or []
+
+    async def list_users_changed_since(self, since: datetime) -> List[Row]:
+        response = await supabase.table("users").select("id, updated_at").gt("updated_at", since.isoformat()).execute()
+        return response.data or []
+
+    # --- Analytics ---
+
+    async def analytics_summary(self) -> Row:
+        response = await supabase.rpc("analytics_summary", {}).execute()
+        return response.data[0] if response.data else {}
+
+    async def registration_trend(
+        self, bucket: Literal["hour", "day"], start: str, end: str, event_id: str | None, tz: str
+    ) -> List[Row]:
+        response = await supabase.rpc("registration_trend", {
+            "p_bucket": bucket, "p_from": start, "p_to": end, "p_event_id": event_id, "p_timezone": tz,
+        }).execute()
+        return response.data or []
+
+    async def event_fill_stats(self, limit: int, order: Literal["registrations", "date"], since: str | None = None) -> List[Row]:
+        query = supabase.table("event_fill_stats").select(FILL_STATS_COLUMNS).eq("is_active", True)
+        if since:
+            query = query.gte("event_date", since)
+        if order == "registrations":
+            query = query.order("registration_count", desc=True).order("event_id")
+        else:
+            query = query.order("event_date").order("event_id")
+        response = await query.limit(limit).execute()
+        return response.data or []
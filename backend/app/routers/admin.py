@@ -1,9 +1,22 @@
+import json
 import uuid
-from typing import Annotated
-from fastapi import APIRouter, Depends, Query, HTTPException, status
-from app.database import supabase
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from typing import Literal
+from fastapi import APIRouter, Depends, Query, HTTPException, Response, UploadFile, File, status
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from app.config import settings
+from app.repositories import repository
+from app.schemas.profiling import ProfilingConfig
 from app.schemas.user import UserOut
 from app.dependencies import get_admin_user
+from app.services.event_service import get_cache_stats, get_snapshot_stats, refresh_event_snapshot
+from app.services.analytics_service import get_analytics
+from app.services.singleflight import get_coalescing_stats
+from app.services.auth_service import list_users, invalidate_user
+from app.services.export_service import stream_registrations, export_filename, export_media_type
+from app.services.import_service import parse_roster, import_registrations
+from app.services.profiling import request_profiler
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
@@ -13,30 +26,55 @@ async def get_event_registrations(
     current_user: UserOut = Depends(get_admin_user)
 ):
     """Admin: Get all registrations for a specific event."""
-    response = supabase.table("registrations").select("*, users(full_name, email)").eq("event_id", str(event_id)).order("registered_at", desc=False).execute()
-    regs = response.data if response.data else []
-    
-    out = []
-    for reg in regs:
-        u_data = reg.get("users", {})
-        out.append({
-            "registration_id": reg.get("id"),
-            "user_full_name": u_data.get("full_name") if u_data else None,
-            "user_email": u_data.get("email") if u_data else None,
-            "registered_at": reg.get("registered_at")
-        })
-    return out
+    return await repository.list_event_registrations(str(event_id))
+
+@router.get("/events/{event_id}/registrations/export")
+async def export_event_registrations(
+    event_id: uuid.UUID,
+    format: Literal["csv", "ndjson"] = "csv",
+    compression: Literal["none", "gzip", "zstd"] = "none",
+    current_user: UserOut = Depends(get_admin_user)
+):
+    """Admin: Stream all registrations for an event as CSV or NDJSON, optionally compressed."""
+    return StreamingResponse(
+        stream_registrations(event_id, format, compression),
+        media_type=export_media_type(format, compression),
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(event_id, format, compression)}"'},
+    )
+
+@router.post("/events/{event_id}/registrations/import")
+async def import_event_registrations(
+    event_id: uuid.UUID,
+    file: UploadFile = File(...),
+    format: Literal["csv", "ndjson"] | None = None,
+    current_user: UserOut = Depends(get_admin_user)
+):
+    """
+    Admin: Register a roster for an event from an uploaded CSV (name,email header)
+    or NDJSON file. Guest accounts are created for unknown emails; the response
+    reports a status for every row, and an unreadable row ends the import there.
+    """
+    if format is None:
+        format = "ndjson" if (file.filename or "").endswith((".ndjson", ".jsonl")) else "csv"
+    return await import_registrations(event_id, parse_roster(file.file, format))
 
 @router.get("/users", response_model=list[UserOut])
 async def get_all_users(
+    response: Response,
     page: int = Query(1, ge=1),
     size: int = Query(10, ge=1, le=50),
+    cursor: str | None = None,
     current_user: UserOut = Depends(get_admin_user)
 ):
-    """Admin: Get a paginated list of all users."""
-    offset = (page - 1) * size
-    response = supabase.table("users").select("*").order("created_at", desc=True).range(offset, offset + size - 1).execute()
-    users = response.data if response.data else []
+    """
+    Admin: Get a paginated list of all users.
+    
+    The cursor for the next page is returned in the X-Next-Cursor header;
+    pass it back as `cursor` to page without an OFFSET.
+    """
+    users, next_cursor = await list_users(page, size, cursor)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return [UserOut(**u) for u in users]
 
 @router.patch("/users/{user_id}/toggle-admin", response_model=UserOut)
@@ -52,15 +90,140 @@ async def toggle_admin_status(
         )
         
     # Get current user status
-    user_res = supabase.table("users").select("is_admin").eq("id", str(user_id)).maybe_single().execute()
-    if not user_res.data:
+    user = await repository.get_user(str(user_id))
+    if not user:
         raise HTTPException(status_code=404, detail="User not found")
         
-    current_is_admin = user_res.data.get("is_admin", False)
+    current_is_admin = user.get("is_admin", False)
     
     # Update and return
-    update_res = supabase.table("users").update({"is_admin": not current_is_admin}).eq("id", str(user_id)).execute()
-    if not update_res.data:
+    updated_user = await repository.update_user(str(user_id), {"is_admin": not current_is_admin})
+    if not updated_user:
         raise HTTPException(status_code=404, detail="User not found")
         
-    return UserOut(**update_res.data[0])
+    invalidate_user(email=updated_user["email"], user_id=updated_user["id"])
+    return UserOut(**updated_user)
+
+@router.patch("/users/{user_id}/toggle-active", response_model=UserOut)
+async def toggle_active_status(
+    user_id: uuid.UUID,
+    current_user: UserOut = Depends(get_admin_user)
+):
+    """Admin: Deactivate or reactivate a user. A deactivated user's tokens stop working at once."""
+    if str(user_id) == str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot deactivate yourself"
+        )
+        
+    user = await repository.get_user(str(user_id))
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+        
+    updated_user = await repository.update_user(str(user_id), {"is_active": not user.get("is_active", True)})
+    if not updated_user:
+        raise HTTPException(status_code=404, detail="User not found")
+        
+    invalidate_user(email=updated_user["email"], user_id=updated_user["id"])
+    return UserOut(**updated_user)
+
+@router.get("/analytics")
+async def get_dashboard_analytics(
+    bucket: Literal["hour", "day"] = "day",
+    days: int = Query(30, ge=1, le=366),
+    top: int = Query(10, ge=1, le=100),
+    upcoming: int = Query(20, ge=0, le=100),
+    event_id: uuid.UUID | None = None,
+    tz: str = Query("UTC", alias="timezone"),
+    current_user: UserOut = Depends(get_admin_user)
+):
+    """
+    Admin: Dashboard figures - totals and average fill ratio across active events,
+    registrations per hour or day over the last `days` (optionally for one event,
+    day buckets in `timezone`), the most registered events and the fill ratio
+    of the next upcoming events.
+    """
+    if bucket == "hour" and days > 31:
+        raise HTTPException(status_code=422, detail="Hourly buckets cover at most 31 days")
+    try:
+        ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=422, detail=f"Unknown timezone: {tz}")
+    return await get_analytics(bucket, days, top, upcoming, event_id, tz)
+
+@router.get("/cache-stats")
+async def get_event_cache_stats(current_user: UserOut = Depends(get_admin_user)):
+    """Admin: Hit/miss counters and occupancy of the in-process event cache."""
+    return get_cache_stats()
+
+@router.get("/event-snapshot")
+async def get_event_snapshot_stats(current_user: UserOut = Depends(get_admin_user)):
+    """Admin: Size, age and pending re-reads of the in-memory event listing snapshot."""
+    return get_snapshot_stats()
+
+@router.post("/event-snapshot/refresh")
+async def force_event_snapshot_refresh(current_user: UserOut = Depends(get_admin_user)):
+    """Admin: Reload the event listing snapshot from the database now."""
+    return await refresh_event_snapshot()
+
+@router.get("/coalescing-stats")
+async def get_request_coalescing_stats(current_user: UserOut = Depends(get_admin_user)):
+    """Admin: How many event lookups were served by sharing an in-flight query."""
+    return get_coalescing_stats()
+
+# --- Profiling (per worker; see app.services.profiling) ---
+
+@router.get("/profiling")
+async def get_profiling_status(current_user: UserOut = Depends(get_admin_user)):
+    """Admin: Current sampling rate and slow-request threshold, kept profiles (slowest first) and slow log size."""
+    return {"enabled": settings.PROFILING_ENABLED, **request_profiler.status()}
+
+@router.put("/profiling")
+async def configure_profiling(config: ProfilingConfig, current_user: UserOut = Depends(get_admin_user)):
+    """
+    Admin: Profile `sample_percent` of requests and/or log every request slower
+    than `slow_request_ms`; 0 switches either off.
+    """
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Profiling is disabled (PROFILING_ENABLED)")
+    return {"enabled": True, **request_profiler.configure(config.sample_percent, config.slow_request_ms)}
+
+@router.delete("/profiling", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_profiling_results(current_user: UserOut = Depends(get_admin_user)):
+    """Admin: Drop the kept profiles and the slow-request log."""
+    request_profiler.clear()
+
+@router.get("/profiling/download")
+async def download_profiling_results(
+    format: Literal["json", "collapsed"] = "json",
+    profile_id: str | None = None,
+    current_user: UserOut = Depends(get_admin_user)
+):
+    """
+    Admin: Download the kept profiles and the slow-request log as JSON, or the
+    profiles alone as collapsed stacks for flamegraph.pl / speedscope.
+    Pass `profile_id` for a single profile.
+    """
+    profiles = request_profiler.profiles()
+    if profile_id is not None:
+        profile = request_profiler.get(profile_id)
+        if profile is None:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        profiles = [profile]
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    if format == "collapsed":
+        return PlainTextResponse(
+            "".join(line + "\n" for profile in profiles for line in profile.collapsed()),
+            headers={"Content-Disposition": f'attachment; filename="profiles-{stamp}.folded"'},
+        )
+    body = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "sample_interval_ms": settings.PROFILING_SAMPLE_INTERVAL_MS,
+        "profiles": [{**profile.summary(), "stacks": profile.collapsed()} for profile in profiles],
+        "slow_requests": list(request_profiler.slow_log) if profile_id is None else [],
+    }
+    return Response(
+        json.dumps(body),
+        media_type="application/json",
+        headers={"Content-Disposition": f'attachment; filename="profiling-{stamp}.json"'},
+    )
@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from app.schemas.user import UserCreate, UserLogin, UserOut, TokenResponse
-from app.services.auth_service import hash_password, verify_password, create_access_token, get_user_by_email, create_user
+from app.schemas.user import UserCreate, UserOut, TokenResponse
+from app.services.auth_service import (
+    hash_password, verify_password, needs_rehash, upgrade_password_hash,
+    create_access_token, get_user_by_email, create_user,
+)
 from app.dependencies import get_current_user
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
@@ -9,7 +12,7 @@ router = APIRouter(prefix="/api/auth", tags=["auth"])
 @router.post("/register", response_model=UserOut, status_code=status.HTTP_201_CREATED)
 async def register(user_data: UserCreate):
     """Register a new user account."""
-    existing_user = get_user_by_email(user_data.email)
+    existing_user = await get_user_by_email(user_data.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -19,26 +22,42 @@ async def register(user_data: UserCreate):
     new_user_dict = {
         "email": user_data.email,
         "full_name": user_data.full_name,
-        "hashed_password": hash_password(user_data.password)
+        "hashed_password": await hash_password(user_data.password)
     }
     
-    created_user = create_user(new_user_dict)
+    created_user = await create_user(new_user_dict)
     return UserOut(**created_user)
 
 @router.post("/login", response_model=TokenResponse)
-async def login(form_data: OAuth2PasswordRequestForm = Depends()):
+async def login(background_tasks: BackgroundTasks, form_data: OAuth2PasswordRequestForm = Depends()):
     """Authenticate a user and return a JWT token."""
-    user = get_user_by_email(form_data.username)
+    user = await get_user_by_email(form_data.username)
     
-    if not user or not verify_password(form_data.password, user["hashed_password"]):
+    if not await verify_password(form_data.password, user["hashed_password"] if user else None):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if not user.get("is_active", True):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Account is deactivated",
+        )
+    if needs_rehash(user["hashed_password"]):
+        # Legacy plaintext or an outdated work factor: upgrade after responding
+        background_tasks.add_task(upgrade_password_hash, user["id"], form_data.password)
         
     access_token = create_access_token(
-        data={"sub": user["email"], "id": str(user["id"]), "is_admin": user["is_admin"]}
+        data={
+            "sub": user["email"],
+            "id": str(user["id"]),
+            "is_admin": user["is_admin"],
+            # Profile claims let get_current_user skip the DB when TRUST_TOKEN_CLAIMS is on
+            "full_name": user["full_name"],
+            "is_active": user["is_active"],
+            "created_at": str(user["created_at"]),
+        }
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
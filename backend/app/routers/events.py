@@ -1,56 +1,175 @@
+import asyncio
+import hashlib
+import json
 import uuid
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import Any, Literal
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, WebSocket, WebSocketDisconnect, WebSocketException, status, Query
+from fastapi.responses import StreamingResponse
+from app.config import settings
 from app.schemas.user import UserOut
 from app.schemas.event import EventCreate, EventUpdate, EventOut, EventList
-from app.dependencies import get_admin_user
+from app.dependencies import get_admin_user, parse_event_ids
 from app.services.event_service import (
-    get_events, get_event_by_id, create_event, 
-    update_event, soft_delete_event, get_registration_count
+    get_events, get_event_by_id, get_events_by_ids, create_event, 
+    update_event, soft_delete_event, event_broadcaster
 )
 
 router = APIRouter(prefix="/api/events", tags=["events"])
 
+# --- Conditional GET ---
+# Public reads carry a strong ETag built from each event's updated_at (kept
+# current by a trigger) and its registration count, so a client or the nginx
+# micro-cache holding the same version gets a 304 with no body.
+
+def _event_version(event: dict) -> tuple:
+    return (str(event["id"]), str(event.get("updated_at")), event.get("registration_count"), event.get("creator_name"))
+
+def _etag(*parts: Any) -> str:
+    digest = hashlib.sha256(json.dumps(parts, default=str, separators=(",", ":")).encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+def _not_modified(request: Request, response: Response, etag: str) -> Response | None:
+    """Set the caching headers; return a 304 response when the client already has this version."""
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.EVENTS_HTTP_MAX_AGE_SECONDS}, must-revalidate",
+    }
+    response.headers.update(headers)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [t.strip().removeprefix("W/") for t in if_none_match.split(",")]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return None
+
 @router.get("/", response_model=EventList)
 async def list_events(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1),
     size: int = Query(10, ge=1, le=50),
-    search: str | None = None
+    search: str | None = None,
+    cursor: str | None = None,
+    count: Literal["exact", "planned", "estimated", "none"] | None = None
 ):
-    """Retrieve a paginated list of active events."""
-    events, total = get_events(page, size, search)
+    """
+    Retrieve a paginated list of active events.
     
-    out_events = []
-    for event_data in events:
-        reg_count = get_registration_count(event_data["id"])
-        
-        # Handle the joined user data
-        creator_name = event_data.get("users", {}).get("full_name") if event_data.get("users") else None
-            
-        event_dict = {
-            **event_data,
-            "registration_count": reg_count,
-            "creator_name": creator_name
-        }
-        out_events.append(EventOut(**event_dict))
+    Pass the returned next_cursor back as `cursor` to seek to the next page
+    (page is then ignored). The total is exact by default for page-based
+    requests and skipped for cursor requests unless `count` asks for it.
+    
+    `search` runs a ranked prefix search over title, location and description;
+    search results are paged by page/size.
+    """
+    if count is None:
+        count = "none" if cursor else "exact"
+    # Registration counts and creator names come embedded in the same query
+    events, total, next_cursor = await get_events(
+        page, size, search, cursor=cursor, count=None if count == "none" else count
+    )
+    etag = _etag(str(request.url.query), total, next_cursor, [_event_version(e) for e in events])
+    not_modified = _not_modified(request, response, etag)
+    if not_modified:
+        return not_modified
+    
+    out_events = [EventOut(**event_data) for event_data in events]
         
-    return EventList(items=out_events, total=total, page=page, size=size)
+    return EventList(items=out_events, total=total, page=page, size=size, next_cursor=next_cursor)
+
+# --- Live seat counts ---
+# registration_count / capacity / is_active for up to EVENT_STREAM_MAX_IDS events,
+# pushed whenever a registration, cancellation or admin edit changes them.
+
+@router.get("/stream")
+async def stream_event_updates(ids: str = Query(..., description="Comma-separated event ids")):
+    """
+    Server-Sent Events: one `seats` message per event on connect, then one
+    whenever an event's registration_count or is_active changes.
+    """
+    subscription, initial = await event_broadcaster.subscribe(parse_event_ids(ids, settings.EVENT_STREAM_MAX_IDS))
+    
+    async def messages():
+        try:
+            states = initial
+            while True:
+                for state in states:
+                    yield f"event: seats\ndata: {json.dumps(state)}\n\n"
+                if not states:
+                    yield ": keep-alive\n\n"
+                states = await subscription.next(settings.EVENT_STREAM_HEARTBEAT_SECONDS)
+        finally:
+            subscription.close()
+    
+    return StreamingResponse(
+        messages(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.websocket("/ws")
+async def event_updates_socket(websocket: WebSocket, ids: str = Query(...)):
+    """WebSocket variant of /stream: JSON messages {"type": "seats", ...state} and {"type": "ping"}."""
+    try:
+        event_ids = parse_event_ids(ids, settings.EVENT_STREAM_MAX_IDS)
+    except HTTPException as e:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason=e.detail)
+    await websocket.accept()
+    subscription, states = await event_broadcaster.subscribe(event_ids)
+    
+    async def until_closed():
+        # Incoming messages are ignored; receiving is how a disconnect is noticed
+        while True:
+            await websocket.receive_text()
+    
+    closed = asyncio.ensure_future(until_closed())
+    try:
+        while True:
+            for state in states:
+                await websocket.send_json({"type": "seats", **state})
+            if not states:
+                await websocket.send_json({"type": "ping"})
+            update = asyncio.ensure_future(subscription.next(settings.EVENT_STREAM_HEARTBEAT_SECONDS))
+            await asyncio.wait({update, closed}, return_when=asyncio.FIRST_COMPLETED)
+            if closed.done():
+                update.cancel()
+                break
+            states = update.result()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        closed.cancel()
+        subscription.close()
+
+# --- Batch reads ---
+# Declared before /{event_id} so "batch" is not taken for an event id.
+
+@router.get("/batch", response_model=list[EventOut])
+async def get_events_batch(
+    request: Request,
+    response: Response,
+    ids: str = Query(..., description="Comma-separated event ids"),
+):
+    """
+    Several events at once, in the order asked for. Ids that are unknown or
+    no longer active are left out rather than failing the whole batch.
+    """
+    events = await get_events_by_ids(parse_event_ids(ids, settings.BATCH_MAX_IDS))
+    not_modified = _not_modified(request, response, _etag(*[_event_version(e) for e in events]))
+    if not_modified:
+        return not_modified
+    return [EventOut(**event_data) for event_data in events]
 
 @router.get("/{event_id}", response_model=EventOut)
-async def get_event(event_id: uuid.UUID):
+async def get_event(event_id: uuid.UUID, request: Request, response: Response):
     """Retrieve a specific event by its ID."""
-    event_data = get_event_by_id(event_id)
+    event_data = await get_event_by_id(event_id)
     if not event_data or not event_data.get("is_active"):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
         
-    reg_count = get_registration_count(event_id)
-    creator_name = event_data.get("users", {}).get("full_name") if event_data.get("users") else None
-    
-    event_dict = {
-        **event_data,
-        "registration_count": reg_count,
-        "creator_name": creator_name
-    }
-    return EventOut(**event_dict)
+    not_modified = _not_modified(request, response, _etag(_event_version(event_data)))
+    if not_modified:
+        return not_modified
+        
+    return EventOut(**event_data)
 
 @router.post("/", response_model=EventOut, status_code=status.HTTP_201_CREATED)
 async def create_new_event(
@@ -62,7 +181,7 @@ async def create_new_event(
     if event_data.event_date <= datetime.now(timezone.utc):
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Event date must be in the future")
         
-    created_event = create_event(event_data, current_user.id)
+    created_event = await create_event(event_data, current_user.id, creator_name=current_user.full_name)
     
     event_dict = {
         **created_event,
@@ -79,24 +198,22 @@ async def update_existing_event(
 ):
     """Update an existing event (Admin only)."""
     # Verify exists
-    existing = get_event_by_id(event_id)
+    existing = await get_event_by_id(event_id)
     if not existing:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
         
-    updated_event = update_event(event_id, event_data)
+    updated_event = await update_event(event_id, event_data)
     if not updated_event:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
         
-    reg_count = get_registration_count(event_id)
-    # The updated response from update() won't include the users() join unless we fetch again or just reuse existing
-    # Best to fetch again to get the joined data cleanly
-    fresh_event_data = get_event_by_id(event_id)
-    creator_name = fresh_event_data.get("users", {}).get("full_name") if fresh_event_data.get("users") else None
+    # The updated response from update() won't include the embedded creator and count,
+    # so fetch again through the same single-query path used by the reads
+    fresh_event_data = await get_event_by_id(event_id) or {}
     
     event_dict = {
         **updated_event,
-        "registration_count": reg_count,
-        "creator_name": creator_name
+        "registration_count": fresh_event_data.get("registration_count", 0),
+        "creator_name": fresh_event_data.get("creator_name")
     }
     return EventOut(**event_dict)
 
@@ -106,6 +223,6 @@ async def delete_event(
     current_user: UserOut = Depends(get_admin_user)
 ):
     """Soft delete an event (Admin only)."""
-    success = soft_delete_event(event_id)
+    success = await soft_delete_event(event_id)
     if not success:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
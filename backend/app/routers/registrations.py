@@ -1,61 +1,76 @@
 import uuid
-from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel, EmailStr
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from app.config import settings
 from app.schemas.user import UserOut
-from app.schemas.registration import RegistrationCreate, RegistrationOut
-from app.dependencies import get_current_user
-from app.services.registration_service import register_user, get_user_registrations, cancel_registration
-from app.database import supabase
+from app.schemas.registration import RegistrationCreate, RegistrationOut, RegistrationStatus, RegistrationTicket
+from app.dependencies import get_current_user, parse_event_ids
+from app.services.registration_service import (
+    register_user, get_user_registrations, get_registration_status, cancel_registration, REGISTRATION_ERRORS
+)
+from app.services.registration_queue import registration_queue
+from app.services.event_service import get_event_by_id
+from app.services.auth_service import resolve_guest_users
 
 router = APIRouter(prefix="/api/registrations", tags=["registrations"])
 
+QUEUED_RESPONSES = {status.HTTP_202_ACCEPTED: {"model": RegistrationTicket, "description": "Queued (REGISTRATION_QUEUE_ENABLED)"}}
+
+async def _enqueue(event_id: uuid.UUID, **who) -> JSONResponse:
+    """Cheap up-front checks against the cached event, then hand off to the intake queue."""
+    event = await get_event_by_id(event_id)
+    if not event or not event.get("is_active"):
+        raise HTTPException(status_code=404, detail=REGISTRATION_ERRORS["event_not_found"][1])
+    event_date = datetime.fromisoformat(event["event_date"].replace("Z", "+00:00"))
+    if event_date <= datetime.now(timezone.utc):
+        raise HTTPException(status_code=400, detail=REGISTRATION_ERRORS["event_past"][1])
+    
+    ticket = registration_queue.submit(event_id, **who)
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=ticket.to_dict(),
+        headers={"Location": f"{router.prefix}/tickets/{ticket.id}"},
+    )
+
 # --- Public Registration (no auth required) ---
 class PublicRegistrationCreate(BaseModel):
     event_id: uuid.UUID
     name: str
     email: str
 
-@router.post("/public", status_code=status.HTTP_201_CREATED)
+@router.post("/public", status_code=status.HTTP_201_CREATED, responses=QUEUED_RESPONSES)
 async def create_public_registration(data: PublicRegistrationCreate):
     """Register for an event without authentication (demo/public use)."""
-    # Find or create a guest user
-    existing = supabase.table("users").select("*").eq("email", data.email).execute()
-    
-    if existing.data and len(existing.data) > 0:
-        user = existing.data[0]
-    else:
-        # Create a guest user with a dummy password
-        user_res = supabase.table("users").insert({
-            "email": data.email,
-            "full_name": data.name,
-            "hashed_password": "guest_no_login",
-            "is_admin": False,
-            "is_active": True,
-        }).execute()
-        user = user_res.data[0]
+    if settings.REGISTRATION_QUEUE_ENABLED:
+        return await _enqueue(data.event_id, email=data.email, name=data.name)
     
-    user_id = user["id"]
+    # Find or create a guest user
+    user_ids = await resolve_guest_users([{"email": data.email, "name": data.name}])
+    user_id = user_ids[data.email]
     
     # Use existing registration logic
     try:
-        reg = register_user(uuid.UUID(user_id), data.event_id)
+        reg = await register_user(uuid.UUID(user_id), data.event_id)
     except HTTPException as e:
         raise e
     
     return {"id": reg["id"], "message": "Registration successful", "name": data.name, "email": data.email}
 
-@router.post("/", response_model=RegistrationOut, status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=RegistrationOut, status_code=status.HTTP_201_CREATED, responses=QUEUED_RESPONSES)
 async def create_registration(
     data: RegistrationCreate,
     current_user: UserOut = Depends(get_current_user)
 ):
     """Register for an event."""
-    reg = register_user(current_user.id, data.event_id)
+    if settings.REGISTRATION_QUEUE_ENABLED:
+        return await _enqueue(data.event_id, user_id=current_user.id)
+    
+    reg = await register_user(current_user.id, data.event_id)
     
     # Needs to eagerly load event to get title, wait the get_user_registrations needs selectinload or we fetch it
-    from app.services.event_service import get_event_by_id
-    event = get_event_by_id(data.event_id)
+    event = await get_event_by_id(data.event_id)
     
     reg_dict = {
         **reg,
@@ -64,30 +79,50 @@ async def create_registration(
     }
     return RegistrationOut(**reg_dict)
 
+@router.get("/tickets/{ticket_id}", response_model=RegistrationTicket)
+async def get_registration_ticket(
+    ticket_id: uuid.UUID,
+    wait: float = Query(0, ge=0, description="Seconds to wait for the ticket to leave the queue"),
+):
+    """Status of a queued registration; pass ?wait= to long-poll instead of polling."""
+    ticket = registration_queue.get(str(ticket_id))
+    if not ticket:
+        raise HTTPException(status_code=404, detail="Ticket not found or expired")
+    await registration_queue.wait(ticket, min(wait, settings.REGISTRATION_TICKET_MAX_WAIT_SECONDS))
+    return ticket.to_dict()
+
 @router.get("/my", response_model=list[RegistrationOut])
 async def list_my_registrations(
     current_user: UserOut = Depends(get_current_user)
 ):
     """Get all registrations for the current user."""
-    regs = get_user_registrations(current_user.id)
+    regs = await get_user_registrations(current_user.id)
     out_regs = []
     
     for reg in regs:
-        # registration_service.py already does left join: *, events(title, event_date)
-        event_data = reg.get("events")
-        
+        # The repository already joins in event_title and event_date
         reg_dict = {
             **reg,
-            "event_title": event_data.get("title") if event_data else None,
             "user_full_name": current_user.full_name
         }
         out_regs.append(RegistrationOut(**reg_dict))
     return out_regs
 
+@router.get("/status", response_model=list[RegistrationStatus])
+async def get_my_registration_status(
+    event_ids: str = Query(..., description="Comma-separated event ids"),
+    current_user: UserOut = Depends(get_current_user)
+):
+    """
+    Whether the current user is registered for each of several events (one
+    query for the whole list): registration_id is null where they are not.
+    """
+    return await get_registration_status(current_user.id, parse_event_ids(event_ids, settings.BATCH_MAX_IDS))
+
 @router.delete("/{registration_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def cancel_user_registration(
     registration_id: uuid.UUID,
     current_user: UserOut = Depends(get_current_user)
 ):
     """Cancel a registration (at least 24 hours before event)."""
-    cancel_registration(registration_id, current_user.id)
+    await cancel_registration(registration_id, current_user.id)
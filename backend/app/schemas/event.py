@@ -32,6 +32,7 @@ class EventOut(EventBase):
 
 class EventList(BaseModel):
     items: list[EventOut]
-    total: int
+    total: int | None
     page: int
     size: int
+    next_cursor: str | None = None
@@ -0,0 +1,6 @@
+from pydantic import BaseModel, Field
+
+class ProfilingConfig(BaseModel):
+    """Fields left out keep their current value; 0 switches that part off."""
+    sample_percent: float | None = Field(None, ge=0, le=100)
+    slow_request_ms: float | None = Field(None, ge=0)
@@ -1,5 +1,6 @@
 import uuid
 from datetime import datetime
+from typing import Literal
 from pydantic import BaseModel, ConfigDict
 
 class RegistrationBase(BaseModel):
@@ -16,3 +17,15 @@ class RegistrationOut(RegistrationBase):
     user_full_name: str | None = None
 
     model_config = ConfigDict(from_attributes=True)
+
+class RegistrationStatus(BaseModel):
+    event_id: uuid.UUID
+    registration_id: uuid.UUID | None = None
+
+class RegistrationTicket(BaseModel):
+    ticket_id: uuid.UUID
+    status: Literal["queued", "registered", "rejected"]
+    event_id: uuid.UUID
+    registration_id: uuid.UUID | None = None
+    status_code: int | None = None
+    detail: str | None = None
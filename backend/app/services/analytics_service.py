@@ -0,0 +1,39 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Literal
+from app.repositories import repository
+
+# Admin dashboard figures. Everything is aggregated in Postgres from the
+# registration rollups in schema.sql (registration_stats_hourly,
+# event_registration_totals, the event_fill_stats view), so a dashboard load
+# is four small queries issued together rather than a scan of registrations.
+
+async def get_analytics(
+    bucket: Literal["hour", "day"],
+    days: int,
+    top: int,
+    upcoming: int,
+    event_id: uuid.UUID | None = None,
+    tz: str = "UTC",
+) -> Dict[str, Any]:
+    now = datetime.now(timezone.utc)
+    event_key = str(event_id) if event_id else None
+    summary, trend, top_events, upcoming_events = await asyncio.gather(
+        repository.analytics_summary(),
+        repository.registration_trend(bucket, (now - timedelta(days=days)).isoformat(), now.isoformat(), event_key, tz),
+        repository.event_fill_stats(top, "registrations"),
+        repository.event_fill_stats(upcoming, "date", since=now.isoformat()),
+    )
+    return {
+        "generated_at": now.isoformat(),
+        "summary": summary,
+        "registrations": {
+            "bucket": bucket,
+            "timezone": tz,
+            "event_id": event_key,
+            "series": trend,
+        },
+        "top_events": top_events,
+        "upcoming_events": upcoming_events,
+    }
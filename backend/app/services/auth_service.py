@@ -1,49 +1,199 @@
+import asyncio
+import hmac
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+import bcrypt
+from cachetools import TTLCache
 from jose import jwt, JWTError
 from fastapi import HTTPException, status
 from app.config import settings
-from app.database import supabase
-from postgrest.exceptions import APIError
+from app.repositories import repository
+from app.services.pagination import encode_cursor, decode_cursor
+from app.services.invalidation import invalidation_bus
 
-# Demo mode: use simple password comparison instead of bcrypt
-# For production, replace with proper hashing (bcrypt/argon2)
+logger = logging.getLogger(__name__)
 
-def hash_password(password: str) -> str:
-    # Demo: store as plaintext
-    return password
+# Placeholder password for guest users created by public/bulk registration.
+# It is not a hash, so verify_password() never accepts anything for a guest.
+GUEST_PASSWORD = "guest_no_login"
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    # Demo: simple comparison (supports both plaintext and bcrypt if needed)
-    return plain_password == hashed_password
+# bcrypt is deliberately slow (~250 ms at 12 rounds), so hashing runs on a
+# small thread pool (bcrypt releases the GIL) instead of the event loop, and at
+# most PASSWORD_HASH_MAX_PENDING hashes may be running or queued at once.
+_hash_pool = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_hash_slots = asyncio.Semaphore(settings.PASSWORD_HASH_MAX_PENDING)
+# Verified against when the email is unknown, so a miss costs the same as a wrong password
+_dummy_hash: str | None = None
+
+def hash_password_sync(password: str) -> str:
+    # bcrypt only looks at the first 72 bytes (passlib truncated silently; bcrypt 5 raises instead)
+    return bcrypt.hashpw(password.encode()[:72], bcrypt.gensalt(rounds=settings.PASSWORD_BCRYPT_ROUNDS)).decode()
+
+def _is_bcrypt(hashed: str) -> bool:
+    return hashed.startswith(("$2a$", "$2b$", "$2y$"))
+
+def _verify_sync(plain_password: str, hashed_password: str) -> bool:
+    if _is_bcrypt(hashed_password):
+        return bcrypt.checkpw(plain_password.encode()[:72], hashed_password.encode())
+    if hashed_password == GUEST_PASSWORD:
+        return False
+    # Legacy rows from the plaintext demo era; needs_rehash() upgrades them on login
+    return hmac.compare_digest(plain_password.encode(), hashed_password.encode())
+
+def needs_rehash(hashed_password: str) -> bool:
+    """True for legacy plaintext rows and bcrypt hashes below the configured work factor."""
+    if hashed_password == GUEST_PASSWORD:
+        return False
+    if not _is_bcrypt(hashed_password):
+        return True
+    return int(hashed_password.split("$")[2]) < settings.PASSWORD_BCRYPT_ROUNDS
+
+async def _in_hash_pool(fn, *args):
+    if _hash_slots.locked():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many logins in progress, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+    async with _hash_slots:
+        return await asyncio.get_running_loop().run_in_executor(_hash_pool, fn, *args)
+
+async def hash_password(password: str) -> str:
+    return await _in_hash_pool(hash_password_sync, password)
+
+async def verify_password(plain_password: str, hashed_password: str | None) -> bool:
+    global _dummy_hash
+    # A guest row is rejected at the cost of an unknown email, so timing can't tell them apart
+    if hashed_password is None or hashed_password == GUEST_PASSWORD:
+        if _dummy_hash is None:
+            _dummy_hash = await _in_hash_pool(hash_password_sync, "dummy-password")
+        await _in_hash_pool(_verify_sync, plain_password, _dummy_hash)
+        return False
+    return await _in_hash_pool(_verify_sync, plain_password, hashed_password)
+
+async def upgrade_password_hash(user_id: str, password: str) -> None:
+    """Re-hash a just-verified password at the current work factor (run after the login response)."""
+    try:
+        hashed = await hash_password(password)
+        await repository.update_user(str(user_id), {"hashed_password": hashed})
+    except Exception as e:
+        logger.warning(f"Password rehash for user {user_id} failed: {type(e).__name__}: {e}")
+
+# Authenticated requests skip re-verifying the same token and re-reading the
+# same user row. Both caches are short-lived; invalidate_user() drops a user
+# whose admin/active status changed and marks older tokens as stale.
+# _user_changed_at is seeded from users.updated_at at startup (load_user_changes),
+# so a restart does not make stale claims trusted again.
+_token_cache: TTLCache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+_user_cache: TTLCache = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+_user_changed_at: dict[str, float] = {}
+_user_changes_loaded = False
 
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    now = datetime.now(timezone.utc)
+    expire = now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    to_encode.update({"exp": expire, "iat": now})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 def decode_token(token: str) -> dict:
+    cached = _token_cache.get(token)
+    if cached is not None and cached.get("exp", 0) > time.time():
+        return cached
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    _token_cache[token] = payload
+    return payload
+
+def user_from_claims(payload: dict) -> dict | None:
+    """
+    The user profile signed into the token at login, or None when the claims
+    are incomplete or the user changed after the token was issued.
+    """
+    required = ("sub", "id", "full_name", "is_admin", "is_active", "created_at")
+    if not _user_changes_loaded or any(payload.get(claim) is None for claim in required):
+        return None
+    if payload.get("iat", 0) <= _user_changed_at.get(payload["id"], 0):
+        return None
+    return {
+        "email": payload["sub"],
+        "id": payload["id"],
+        "full_name": payload["full_name"],
+        "is_admin": payload["is_admin"],
+        "is_active": payload["is_active"],
+        "created_at": payload["created_at"],
+    }
+
+async def get_cached_user(email: str) -> dict | None:
+    user = _user_cache.get(email)
+    if user is None:
+        user = await get_user_by_email(email)
+        if user is not None:
+            _user_cache[email] = user
+    return user
 
-def get_user_by_email(email: str) -> dict | None:
+def invalidate_user(email: str | None = None, user_id: str | None = None, changed_at: float | None = None, broadcast: bool = True) -> None:
+    changed_at = changed_at or time.time()
+    if email:
+        _user_cache.pop(email, None)
+    if user_id:
+        # Tokens issued up to now no longer vouch for this user's claims
+        _user_changed_at[str(user_id)] = max(changed_at, _user_changed_at.get(str(user_id), 0))
+    if broadcast:
+        invalidation_bus.publish("user", email, str(user_id) if user_id else None, changed_at)
+
+invalidation_bus.subscribe(
+    "user", lambda email, user_id, changed_at: invalidate_user(email, user_id, changed_at, broadcast=False)
+)
+
+async def load_user_changes() -> None:
+    """
+    Record every user changed within the token lifetime (older changes predate
+    every unexpired token). Token claims are not trusted until this has run.
+    """
+    global _user_changes_loaded
+    since = datetime.now(timezone.utc) - timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    for user in await repository.list_users_changed_since(since):
+        changed_at = datetime.fromisoformat(str(user["updated_at"]).replace("Z", "+00:00")).timestamp()
+        invalidate_user(user_id=user["id"], changed_at=changed_at, broadcast=False)
+    _user_changes_loaded = True
+
+async def get_user_by_email(email: str) -> dict | None:
     try:
-        response = supabase.table("users").select("*").eq("email", email).maybe_single().execute()
-        return response.data
+        return await repository.get_user_by_email(email)
     except Exception as e:
-        print(f"[AUTH ERROR] get_user_by_email failed: {type(e).__name__}: {e}")
+        logger.error(f"get_user_by_email failed: {type(e).__name__}: {e}")
         return None
 
-def create_user(data: dict) -> dict:
-    response = supabase.table("users").insert(data).execute()
-    if not response.data:
+async def create_user(data: dict) -> dict:
+    user = await repository.insert_user(data)
+    if not user:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create user")
-    return response.data[0]
+    return user
+
+async def resolve_guest_users(rows: list[dict]) -> dict[str, str]:
+    """Insert missing guest users ({"email", "name"} rows) in one statement and return email -> user id."""
+    guests = [
+        {"email": row["email"], "full_name": row["name"], "hashed_password": GUEST_PASSWORD,
+         "is_admin": False, "is_active": True}
+        for row in rows
+    ]
+    # Existing accounts are left untouched
+    return await repository.insert_missing_users(guests)
+
+async def list_users(page: int, size: int, cursor: str | None = None) -> tuple[list[dict], str | None]:
+    """Newest users first; with a cursor, seek on (created_at, id) instead of an OFFSET."""
+    # One extra row tells us whether there is a next page
+    rows = await repository.list_users((page - 1) * size, size + 1, decode_cursor(cursor) if cursor else None)
+    users = rows[:size]
+    next_cursor = encode_cursor(users[-1]["created_at"], users[-1]["id"]) if len(rows) > size else None
+    return users, next_cursor
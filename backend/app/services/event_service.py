@@ -1,63 +1,307 @@
+import asyncio
+import logging
 import uuid
 from typing import Tuple, List, Dict, Any
-from app.database import supabase
+from cachetools import TTLCache
+from app.config import settings
+from app.metrics import Collector, register
+from app.repositories import repository
 from app.schemas.event import EventCreate, EventUpdate
+from app.services.event_snapshot import EventSnapshot
+from app.services.event_stream import EventBroadcaster
+from app.services.invalidation import invalidation_bus
+from app.services.pagination import encode_cursor, decode_cursor
+from app.services.singleflight import coalesce
 
-def get_events(page: int, size: int, search: str | None = None) -> Tuple[List[Dict[str, Any]], int]:
+logger = logging.getLogger(__name__)
+
+# Hot events (detail pages, registration lookups) are served from memory.
+# Bounded LRU with a TTL; every write path below invalidates its entry.
+_event_cache: TTLCache = TTLCache(maxsize=settings.EVENT_CACHE_SIZE, ttl=settings.EVENT_CACHE_TTL_SECONDS)
+_cache_stats = {"hits": 0, "misses": 0}
+# Bumped on every invalidation so a fetch that raced with a write is not cached
+_invalidations = 0
+
+# The active catalogue, held in memory for listing (see event_snapshot.py).
+# Writes that know the resulting row apply it directly; anything else marks the
+# event dirty and the next read re-fetches just the dirty rows in one query.
+_snapshot = EventSnapshot()
+_snapshot_lock = asyncio.Lock()
+SNAPSHOT_LOAD_PAGE = 1000
+
+def _forget_cached(event_id: uuid.UUID | str) -> None:
+    global _invalidations
+    _invalidations += 1
+    _event_cache.pop(str(event_id), None)
+    # Reads from now on must not join a query that started before the write
+    _fetch_event.forget(str(event_id))
+    _query_events.forget_all()
+    search_events.forget_all()
+
+def invalidate_event(event_id: uuid.UUID | str, broadcast: bool = True) -> None:
+    _forget_cached(event_id)
+    _snapshot.mark_dirty(str(event_id))
+    event_broadcaster.changed(str(event_id))
+    if broadcast:
+        invalidation_bus.publish("event", str(event_id))
+
+# Other workers re-read the event on their next lookup
+invalidation_bus.subscribe("event", lambda event_id: invalidate_event(event_id, broadcast=False))
+
+def set_cached_registration_count(event_id: uuid.UUID | str, count: int) -> None:
+    """Write-through for registration writes that already know the new count."""
+    cached = _event_cache.get(str(event_id))
+    # Like any write: a fetch or listing that started before it must not be cached or joined
+    _forget_cached(event_id)
+    if cached is not None:
+        _event_cache[str(event_id)] = {**cached, "registration_count": count}
+    _snapshot.set_registration_count(str(event_id), count)
+    event_broadcaster.changed(str(event_id))
+    invalidation_bus.publish("event", str(event_id))
+
+def get_cache_stats() -> Dict[str, Any]:
+    return {
+        **_cache_stats,
+        "size": len(_event_cache),
+        "maxsize": _event_cache.maxsize,
+        "ttl_seconds": _event_cache.ttl,
+    }
+
+register(Collector(
+    "event_cache_lookups_total", "Event cache lookups by outcome", ("result",),
+    lambda: [(("hit",), _cache_stats["hits"]), (("miss",), _cache_stats["misses"])],
+    kind="counter",
+))
+register(Collector("event_cache_entries", "Events currently cached", (), lambda: [((), len(_event_cache))]))
+register(Collector("event_snapshot_events", "Active events held in the listing snapshot", (), lambda: [((), len(_snapshot))]))
+register(Collector(
+    "event_snapshot_age_seconds", "Seconds since the listing snapshot was last fully loaded", (),
+    lambda: [((), _snapshot.age)] if _snapshot.age is not None else [],
+))
+
+async def _load_active_events() -> List[Dict[str, Any]] | None:
+    """Every active event; None once there are more than EVENT_SNAPSHOT_MAX_EVENTS."""
+    rows: List[Dict[str, Any]] = []
+    while True:
+        batch, _ = await repository.list_events(len(rows), SNAPSHOT_LOAD_PAGE)
+        rows.extend(batch)
+        if len(rows) > settings.EVENT_SNAPSHOT_MAX_EVENTS:
+            return None
+        if len(batch) < SNAPSHOT_LOAD_PAGE:
+            return rows
+
+async def refresh_event_snapshot() -> Dict[str, Any]:
+    """Reload the whole listing snapshot now (startup, staleness bound, admin forced refresh)."""
+    async with _snapshot_lock:
+        await _reload_snapshot()
+    return get_snapshot_stats()
+
+async def _reload_snapshot() -> None:
+    settled = _snapshot.dirty
+    _snapshot.reloading = True
     try:
-        offset = (page - 1) * size
-        
-        query = supabase.table("events").select("*, users(full_name)", count="exact")
-        
-        if search:
-            query = query.ilike("title", f"%{search}%")
-            
-        query = query.eq("is_active", True)
-        query = query.order("event_date").range(offset, offset + size - 1)
-        
-        response = query.execute()
-        
-        events = response.data if response.data else []
-        total_count = response.count if response.count is not None else 0
-        return events, total_count
+        rows = await _load_active_events()
+    finally:
+        _snapshot.reloading = False
+    if rows is None:
+        logger.warning(f"More than {settings.EVENT_SNAPSHOT_MAX_EVENTS} active events; listing from the database")
+        _snapshot.disable()
+    else:
+        _snapshot.replace_all(rows, settled)
+
+async def _refresh_dirty() -> None:
+    ids = _snapshot.take_dirty()
+    try:
+        rows = await repository.get_events(ids)
+    except Exception:
+        for event_id in ids:
+            _snapshot.mark_dirty(event_id)
+        raise
+    _snapshot.resolve_dirty(ids, rows)
+
+async def _snapshot_ready() -> bool:
+    """Bring the snapshot within its staleness bound; False when listings must go to the database."""
+    if not settings.EVENT_SNAPSHOT_ENABLED:
+        return False
+    
+    def stale() -> bool:
+        return _snapshot.age is None or _snapshot.age > settings.EVENT_SNAPSHOT_MAX_STALENESS_SECONDS
+    
+    if stale() or _snapshot.dirty:
+        try:
+            async with _snapshot_lock:
+                # Re-check: whoever held the lock may have just done the work
+                if stale():
+                    await _reload_snapshot()
+                if _snapshot.dirty and _snapshot.usable:
+                    await _refresh_dirty()
+        except Exception as e:
+            logger.error(f"Event snapshot refresh failed: {type(e).__name__}: {e}")
+            return False
+    return _snapshot.usable
+
+def get_snapshot_stats() -> Dict[str, Any]:
+    age = _snapshot.age
+    return {
+        "enabled": settings.EVENT_SNAPSHOT_ENABLED,
+        "usable": _snapshot.usable,
+        "events": len(_snapshot),
+        "dirty": len(_snapshot.dirty),
+        "age_seconds": round(age, 3) if age is not None else None,
+        "max_staleness_seconds": settings.EVENT_SNAPSHOT_MAX_STALENESS_SECONDS,
+    }
+
+async def get_events(
+    page: int,
+    size: int,
+    search: str | None = None,
+    cursor: str | None = None,
+    count: str | None = "exact",
+) -> Tuple[List[Dict[str, Any]], int | None, str | None]:
+    """
+    Return (events, total, next_cursor). With a cursor the page is found by
+    seeking on (event_date, id) instead of an OFFSET, so every page costs the
+    same; count may be "exact", "planned", "estimated" or None to skip it.
+    
+    A search is ranked by relevance, so it is paged by page/size only. It always
+    goes to the database, whose english full-text search (stemming, stopwords)
+    the snapshot does not reproduce.
+    
+    Listings are served from the in-memory snapshot when it is enabled and loaded
+    (the total is then always exact), otherwise from the database.
+    """
+    search = search.strip() if search else None
+    if search:
+        return await search_events(search, page, size, count)
+    after = decode_cursor(cursor) if cursor else None
+    if await _snapshot_ready():
+        events, total, more = _snapshot.page(page, size, after)
+        next_cursor = encode_cursor(events[-1]["event_date"], events[-1]["id"]) if more else None
+        return events, total if count else None, next_cursor
+    return await _query_events(page, size, cursor, count)
+
+@coalesce
+async def _query_events(
+    page: int, size: int, cursor: str | None, count: str | None
+) -> Tuple[List[Dict[str, Any]], int | None, str | None]:
+    after = decode_cursor(cursor) if cursor else None
+    try:
+        # One extra row tells us whether there is a next page
+        rows, total = await repository.list_events((page - 1) * size, size + 1, after, count)
+        events = rows[:size]
+        next_cursor = encode_cursor(events[-1]["event_date"], events[-1]["id"]) if len(rows) > size else None
+        return events, total, next_cursor
     except Exception as e:
-        import logging
-        logging.error(f"Supabase error fetching events: {e}")
-        return [], 0
+        logger.error(f"Database error fetching events: {e}")
+        return [], 0, None
+
+@coalesce
+async def search_events(
+    search: str, page: int, size: int, count: str | None = "exact"
+) -> Tuple[List[Dict[str, Any]], int | None, str | None]:
+    """Indexed, ranked prefix search over title, location and description (see search_events in schema.sql)."""
+    try:
+        events, total = await repository.search_events(search, (page - 1) * size, size, count)
+        return events, total, None
+    except Exception as e:
+        logger.error(f"Database error searching events: {e}")
+        return [], 0, None
+
+async def get_event_by_id(event_id: uuid.UUID) -> Dict[str, Any] | None:
+    key = str(event_id)
+    cached = _event_cache.get(key)
+    if cached is not None:
+        _cache_stats["hits"] += 1
+        # Callers are free to mutate what they get back
+        return dict(cached)
+    _cache_stats["misses"] += 1
+    
+    generation = _invalidations
+    event = await _fetch_event(key)
+    if event is None:
+        return None
+    if generation == _invalidations:
+        _event_cache[key] = event
+    return dict(event)
+
+async def get_events_by_ids(event_ids: List[str]) -> List[Dict[str, Any]]:
+    """
+    Active events among `event_ids`, in that order. Served from the snapshot
+    when it is loaded; otherwise cached events are used and the rest are read
+    in a single query.
+    """
+    if await _snapshot_ready():
+        found = {event_id: _snapshot.get(event_id) for event_id in event_ids}
+    else:
+        found = {}
+        for event_id in event_ids:
+            cached = _event_cache.get(event_id)
+            if cached is not None:
+                _cache_stats["hits"] += 1
+                found[event_id] = dict(cached)
+        missing = [event_id for event_id in event_ids if event_id not in found]
+        if missing:
+            _cache_stats["misses"] += len(missing)
+            generation = _invalidations
+            for event in await repository.get_events(missing):
+                found[str(event["id"])] = event
+                if generation == _invalidations:
+                    _event_cache[str(event["id"])] = dict(event)
+    return [found[event_id] for event_id in event_ids if found.get(event_id) and found[event_id].get("is_active")]
+
+# Live seat-count push (see event_stream.py); fed by every write path above and below
+event_broadcaster = EventBroadcaster(loader=get_event_by_id)
+register(Collector("event_stream_subscribers", "Open live event update streams", (), lambda: [((), event_broadcaster.subscriber_count)]))
 
-def get_event_by_id(event_id: uuid.UUID) -> Dict[str, Any] | None:
+@coalesce
+async def _fetch_event(event_id: str) -> Dict[str, Any] | None:
     try:
-        response = supabase.table("events").select("*, users(full_name)").eq("id", str(event_id)).single().execute()
-        return response.data
+        return await repository.get_event(event_id)
     except Exception:
         return None
 
-def create_event(data: EventCreate, user_id: uuid.UUID) -> Dict[str, Any]:
+async def create_event(data: EventCreate, user_id: uuid.UUID, creator_name: str | None = None) -> Dict[str, Any]:
     event_data = data.model_dump()
     # Pydantic dict gives datetime objects; Supabase python SDK serializes them but it's safer to ensure string formats if issues arise.
     event_data["event_date"] = event_data["event_date"].isoformat()
     event_data["created_by"] = str(user_id)
     
-    response = supabase.table("events").insert(event_data).execute()
-    return response.data[0]
+    created = await repository.insert_event(event_data)
+    _forget_cached(created["id"])
+    if creator_name is not None:
+        _snapshot.apply({**created, "creator_name": creator_name, "registration_count": 0})
+    else:
+        _snapshot.mark_dirty(created["id"])
+    invalidation_bus.publish("event", str(created["id"]))
+    return created
 
-def update_event(event_id: uuid.UUID, data: EventUpdate) -> Dict[str, Any] | None:
+async def update_event(event_id: uuid.UUID, data: EventUpdate) -> Dict[str, Any] | None:
     update_data = data.model_dump(exclude_unset=True)
     if not update_data:
-        return get_event_by_id(event_id)
+        return await get_event_by_id(event_id)
         
     if "event_date" in update_data and update_data["event_date"]:
         update_data["event_date"] = update_data["event_date"].isoformat()
         
-    response = supabase.table("events").update(update_data).eq("id", str(event_id)).execute()
-    if not response.data:
+    updated = await repository.update_event(str(event_id), update_data)
+    if updated is None:
+        invalidate_event(event_id)
         return None
-    return response.data[0]
+    _forget_cached(event_id)
+    # The row comes back without the creator name and count; keep the snapshot's
+    if not _snapshot.merge(str(event_id), updated):
+        _snapshot.mark_dirty(str(event_id))
+    event_broadcaster.changed(str(event_id))
+    invalidation_bus.publish("event", str(event_id))
+    return updated
 
-def soft_delete_event(event_id: uuid.UUID) -> bool:
-    response = supabase.table("events").update({"is_active": False}).eq("id", str(event_id)).execute()
-    return len(response.data) > 0
+async def soft_delete_event(event_id: uuid.UUID) -> bool:
+    updated = await repository.update_event(str(event_id), {"is_active": False})
+    _forget_cached(event_id)
+    _snapshot.merge(str(event_id), {"is_active": False})
+    event_broadcaster.changed(str(event_id))
+    invalidation_bus.publish("event", str(event_id))
+    return updated is not None
 
-def get_registration_count(event_id: uuid.UUID) -> int:
-    response = supabase.table("registrations").select("id", count="exact").eq("event_id", str(event_id)).execute()
-    return response.count if response.count is not None else 0
+async def get_registration_count(event_id: uuid.UUID) -> int:
+    return await repository.count_registrations(str(event_id))
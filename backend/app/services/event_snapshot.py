@@ -0,0 +1,117 @@
+import bisect
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Tuple
+
+# In-memory copy of the active event catalogue (with creator names and
+# registration counts), kept sorted on (event_date, id) so listing and cursor
+# seeks run in process; search stays on the database's full-text index.
+# event_service owns loading and wires every write path into
+# apply()/mark_dirty(); this module does no I/O.
+
+def _sort_key(event_date: str, event_id: str) -> Tuple[datetime, str]:
+    return datetime.fromisoformat(str(event_date).replace("Z", "+00:00")), str(event_id)
+
+class EventSnapshot:
+    def __init__(self):
+        self._events: Dict[str, Dict[str, Any]] = {}
+        self._keys: List[Tuple[datetime, str]] = []
+        self._dirty: set[str] = set()
+        self.loaded_at: float | None = None
+        self.reloading = False
+        # False after a load found more events than the snapshot is allowed to hold
+        self.usable = False
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    @property
+    def age(self) -> float | None:
+        return time.monotonic() - self.loaded_at if self.loaded_at is not None else None
+
+    def replace_all(self, events: Iterable[Dict[str, Any]], settled: set[str]) -> None:
+        """Swap in a full reload; ids marked dirty while it was in flight (not in `settled`) stay dirty."""
+        self._events, self._keys = {}, []
+        for event in events:
+            self._insert(event)
+        self._dirty -= settled
+        self.loaded_at = time.monotonic()
+        self.usable = True
+
+    def disable(self) -> None:
+        """Drop the contents but remember when, so the load is retried only after the staleness bound."""
+        self._events, self._keys, self._dirty = {}, [], set()
+        self.loaded_at = time.monotonic()
+        self.usable = False
+
+    def apply(self, event: Dict[str, Any]) -> None:
+        """Upsert a full event row (with creator_name and registration_count); inactive rows are dropped."""
+        self._remove(str(event["id"]))
+        if event.get("is_active"):
+            self._insert(event)
+        if self.reloading:
+            # The reload may have read the row before this write
+            self._dirty.add(str(event["id"]))
+
+    def merge(self, event_id: str, changes: Dict[str, Any]) -> bool:
+        """Apply a partial update on top of the current entry; False if the event is not in the snapshot."""
+        current = self._events.get(str(event_id))
+        if current is None:
+            return False
+        self.apply({**current, **changes})
+        return True
+
+    def get(self, event_id: str) -> Dict[str, Any] | None:
+        event = self._events.get(str(event_id))
+        return dict(event) if event is not None else None
+
+    def set_registration_count(self, event_id: str, count: int) -> None:
+        event = self._events.get(str(event_id))
+        if event is not None:
+            event["registration_count"] = count
+        if self.reloading:
+            # The reload may have read the count before this write
+            self._dirty.add(str(event_id))
+
+    def mark_dirty(self, event_id: str) -> None:
+        self._dirty.add(str(event_id))
+
+    @property
+    def dirty(self) -> set[str]:
+        return set(self._dirty)
+
+    def take_dirty(self) -> List[str]:
+        dirty, self._dirty = list(self._dirty), set()
+        return dirty
+
+    def resolve_dirty(self, ids: List[str], rows: Iterable[Dict[str, Any]]) -> None:
+        """Apply the re-read rows for `ids`; ids with no row came back deleted or never existed."""
+        seen = set()
+        for row in rows:
+            seen.add(str(row["id"]))
+            self.apply(row)
+        for event_id in ids:
+            if event_id not in seen:
+                self._remove(event_id)
+
+    def _insert(self, event: Dict[str, Any]) -> None:
+        event_id = str(event["id"])
+        event = dict(event)
+        self._events[event_id] = event
+        bisect.insort(self._keys, _sort_key(event["event_date"], event_id))
+
+    def _remove(self, event_id: str) -> None:
+        event = self._events.pop(event_id, None)
+        if event is None:
+            return
+        key = _sort_key(event["event_date"], event_id)
+        i = bisect.bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+
+    def page(self, page: int, size: int, after: List[Any] | None = None) -> Tuple[List[Dict[str, Any]], int, bool]:
+        """(events, total, has_more) in (event_date, id) order: a keyset seek when `after` is given, else page/size."""
+        start = bisect.bisect_right(self._keys, _sort_key(*after)) if after else (page - 1) * size
+        keys = self._keys[start:start + size + 1]
+        events = [dict(self._events[event_id]) for _, event_id in keys[:size]]
+        return events, len(self._keys), len(keys) > size
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterable
+
+logger = logging.getLogger(__name__)
+
+# Live seat counts. Viewers of an event page subscribe to a set of event ids
+# over SSE or WebSocket; every write path that changes an event calls
+# changed(), which re-reads the event once (normally from the event cache)
+# and fans the new state out to every subscriber of that id. Subscribers keep
+# only the latest state per event, so a slow client skips intermediate counts
+# instead of queueing them.
+
+EventState = Dict[str, Any]
+
+def event_state(event_id: str, event: Dict[str, Any] | None) -> EventState:
+    if event is None:
+        return {"event_id": event_id, "registration_count": None, "capacity": None, "is_active": False}
+    return {
+        "event_id": event_id,
+        "registration_count": event.get("registration_count"),
+        "capacity": event.get("capacity"),
+        "is_active": bool(event.get("is_active")),
+    }
+
+class Subscription:
+    def __init__(self, broadcaster: "EventBroadcaster", event_ids: Iterable[str]):
+        self.event_ids = set(event_ids)
+        self._broadcaster = broadcaster
+        self._pending: Dict[str, EventState] = {}
+        self._wake = asyncio.Event()
+
+    def _offer(self, state: EventState) -> None:
+        self._pending[state["event_id"]] = state
+        self._wake.set()
+
+    async def next(self, timeout: float) -> list[EventState]:
+        """Changed states since the last call; empty after `timeout` seconds without changes (heartbeat time)."""
+        if not self._pending:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        self._wake.clear()
+        states, self._pending = list(self._pending.values()), {}
+        return states
+
+    def close(self) -> None:
+        self._broadcaster._unsubscribe(self)
+
+class EventBroadcaster:
+    def __init__(self, loader: Callable[[str], Awaitable[Dict[str, Any] | None]]):
+        self._loader = loader
+        self._subscribers: Dict[str, set[Subscription]] = {}
+        self._refreshing: set[str] = set()
+        self._rerun: set[str] = set()
+        self._last: Dict[str, EventState] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def watching(self, event_id: str) -> bool:
+        return bool(self._subscribers.get(str(event_id)))
+
+    @property
+    def subscriber_count(self) -> int:
+        return len({sub for subs in self._subscribers.values() for sub in subs})
+
+    async def subscribe(self, event_ids: Iterable[str]) -> tuple[Subscription, list[EventState]]:
+        """Register a subscriber and return it with the current state of each event."""
+        subscription = Subscription(self, (str(event_id) for event_id in event_ids))
+        for event_id in subscription.event_ids:
+            self._subscribers.setdefault(event_id, set()).add(subscription)
+        states = [event_state(event_id, await self._loader(event_id)) for event_id in subscription.event_ids]
+        for state in states:
+            self._last[state["event_id"]] = state
+        return subscription, states
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        for event_id in subscription.event_ids:
+            subs = self._subscribers.get(event_id)
+            if subs is None:
+                continue
+            subs.discard(subscription)
+            if not subs:
+                del self._subscribers[event_id]
+                self._last.pop(event_id, None)
+
+    def changed(self, event_id: str) -> None:
+        """An event was written; push its new state to subscribers. Free when nobody watches it."""
+        event_id = str(event_id)
+        if not self.watching(event_id):
+            return
+        if event_id in self._refreshing:
+            # A read is already in flight and may predate this write; read once more after it
+            self._rerun.add(event_id)
+            return
+        self._refreshing.add(event_id)
+        task = asyncio.get_running_loop().create_task(self._refresh(event_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(self, event_id: str) -> None:
+        try:
+            while True:
+                self._rerun.discard(event_id)
+                try:
+                    state = event_state(event_id, await self._loader(event_id))
+                except Exception as e:
+                    logger.error(f"Live update read failed for event {event_id}: {type(e).__name__}: {e}")
+                    return
+                if state != self._last.get(event_id):
+                    self._last[event_id] = state
+                    for subscription in list(self._subscribers.get(event_id, ())):
+                        subscription._offer(state)
+                if event_id not in self._rerun:
+                    return
+        finally:
+            self._refreshing.discard(event_id)
@@ -0,0 +1,67 @@
+import csv
+import io
+import json
+import uuid
+import zlib
+from typing import Any, AsyncIterator, Dict, Iterable, List
+import zstandard
+from app.config import settings
+from app.repositories import repository
+
+EXPORT_COLUMNS = ["registration_id", "user_full_name", "user_email", "registered_at"]
+
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+COMPRESSED_MEDIA_TYPES = {"gzip": ("application/gzip", ".gz"), "zstd": ("application/zstd", ".zst")}
+
+async def iter_registration_chunks(event_id: uuid.UUID, chunk_size: int) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Page through an event's registrations on (registered_at, id), one chunk per query."""
+    after: list[str] | None = None
+    while True:
+        rows = await repository.list_event_registrations(str(event_id), after, chunk_size)
+        if rows:
+            yield rows
+        if len(rows) < chunk_size:
+            return
+        after = [rows[-1]["registered_at"], rows[-1]["registration_id"]]
+
+def _encode_csv(rows: Iterable[Dict[str, Any]], header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    if header:
+        writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().encode()
+
+def _encode_ndjson(rows: Iterable[Dict[str, Any]]) -> bytes:
+    return "".join(json.dumps(row) + "\n" for row in rows).encode()
+
+def _compressor(compression: str):
+    if compression == "gzip":
+        gzip = zlib.compressobj(settings.EXPORT_GZIP_LEVEL, zlib.DEFLATED, 31)
+        return (lambda data: gzip.compress(data) + gzip.flush(zlib.Z_SYNC_FLUSH)), gzip.flush
+    if compression == "zstd":
+        zstd = zstandard.ZstdCompressor(level=settings.EXPORT_ZSTD_LEVEL).compressobj()
+        return (lambda data: zstd.compress(data) + zstd.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)), zstd.flush
+    return (lambda data: data), (lambda: b"")
+
+async def stream_registrations(event_id: uuid.UUID, fmt: str, compression: str) -> AsyncIterator[bytes]:
+    """
+    Yield the export as it is read: each chunk is encoded and (optionally)
+    flushed through the compressor before the next page is fetched, so memory
+    stays constant and the download starts with the first page.
+    """
+    compress, finish = _compressor(compression)
+    if fmt == "csv":
+        yield compress(_encode_csv([], header=True))
+    async for rows in iter_registration_chunks(event_id, settings.EXPORT_CHUNK_SIZE):
+        yield compress(_encode_csv(rows, header=False) if fmt == "csv" else _encode_ndjson(rows))
+    tail = finish()
+    if tail:
+        yield tail
+
+def export_filename(event_id: uuid.UUID, fmt: str, compression: str) -> str:
+    suffix = COMPRESSED_MEDIA_TYPES[compression][1] if compression in COMPRESSED_MEDIA_TYPES else ""
+    return f"registrations-{event_id}.{fmt}{suffix}"
+
+def export_media_type(fmt: str, compression: str) -> str:
+    return COMPRESSED_MEDIA_TYPES[compression][0] if compression in COMPRESSED_MEDIA_TYPES else MEDIA_TYPES[fmt]
@@ -0,0 +1,117 @@
+import csv
+import json
+import uuid
+from typing import Any, Dict, Iterable, Iterator, List, BinaryIO
+from pydantic import EmailStr, TypeAdapter, ValidationError
+from starlette.concurrency import iterate_in_threadpool
+from app.config import settings
+from app.repositories import repository
+from app.services.auth_service import resolve_guest_users
+from app.services.event_service import invalidate_event
+
+_email_adapter = TypeAdapter(EmailStr)
+
+def _decoded_lines(file: BinaryIO) -> Iterator[str]:
+    # One line at a time, so a bad byte is reported on the row that holds it
+    for number, line in enumerate(iter(file.readline, b"")):
+        yield line.decode("utf-8-sig" if number == 0 else "utf-8")
+
+def parse_roster(file: BinaryIO, fmt: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield {"name", "email"} dicts from a CSV (header row required) or NDJSON upload, lazily.
+    Input that cannot be decoded or parsed ends the roster with one {"error"} row, so the
+    rows before it are still imported and reported.
+    """
+    lines = _decoded_lines(file)
+    try:
+        if fmt == "csv":
+            for row in csv.DictReader(lines):
+                yield {"name": row.get("name") or row.get("full_name"), "email": row.get("email")}
+            return
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                row = {}
+            if not isinstance(row, dict):
+                row = {}
+            yield {"name": row.get("name") or row.get("full_name"), "email": row.get("email")}
+    except (UnicodeDecodeError, csv.Error) as e:
+        yield {"name": None, "email": None, "error": f"Could not parse roster: {e}"}
+
+def _batches(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+async def import_registrations(event_id: uuid.UUID, rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Register a roster in batches: guest users are upserted in bulk and each batch
+    is registered by one register_users_bulk call, which enforces capacity in
+    file order. Returns a summary plus one result per input row.
+    
+    `rows` may do blocking I/O (parse_roster reads the upload), so each batch
+    is pulled on the thread pool rather than the event loop.
+    """
+    results: List[Dict[str, Any]] = []
+    seen: set[str] = set()
+    row_number = 0
+    
+    try:
+        async for batch in iterate_in_threadpool(_batches(rows, settings.IMPORT_BATCH_SIZE)):
+            valid = []
+            for row in batch:
+                row_number += 1
+                result = {"row": row_number, "email": row.get("email"), "status": None, "registration_id": None}
+                results.append(result)
+                if row.get("error"):
+                    result["status"] = "invalid"
+                    result["detail"] = row["error"]
+                    continue
+                try:
+                    email = _email_adapter.validate_python((row.get("email") or "").strip())
+                except ValidationError:
+                    result["status"] = "invalid"
+                    result["detail"] = "Invalid email"
+                    continue
+                name = (row.get("name") or "").strip()
+                if not name:
+                    result["status"] = "invalid"
+                    result["detail"] = "Missing name"
+                    continue
+                if email in seen:
+                    result["status"] = "duplicate_in_file"
+                    continue
+                seen.add(email)
+                result["email"] = email
+                valid.append((result, {"email": email, "name": name}))
+            
+            if not valid:
+                continue
+            
+            user_ids = await resolve_guest_users([row for _, row in valid])
+            registered = await repository.register_users_bulk(
+                str(event_id), [user_ids[row["email"]] for _, row in valid if row["email"] in user_ids]
+            )
+            outcome = {item["user_id"]: item for item in registered}
+            
+            for result, row in valid:
+                item = outcome.get(user_ids.get(row["email"]), {})
+                result["status"] = "registered" if item.get("status") == "ok" else item.get("status", "failed")
+                result["registration_id"] = item.get("registration_id")
+
+    finally:
+        # Earlier batches are committed even when a later one fails
+        invalidate_event(event_id)
+    
+    summary: Dict[str, int] = {}
+    for result in results:
+        summary[result["status"]] = summary.get(result["status"], 0) + 1
+    return {"total": len(results), "summary": summary, "results": results}
@@ -0,0 +1,281 @@
+import asyncio
+import glob
+import json
+import logging
+import os
+import socket
+import threading
+import uuid
+from typing import Any, Callable, Dict
+from app.config import settings
+from app.metrics import Counter, register
+
+logger = logging.getLogger(__name__)
+
+# Cross-worker cache invalidation. Each worker keeps its own caches (event
+# detail cache, listing snapshot, user/token caches); when one worker writes,
+# it publishes "event X changed" / "user Y changed" and every other worker
+# drops or re-reads its copy. Changes published in the same event-loop tick are
+# sent as one message. Backends:
+#   none      single worker, nothing to tell (default)
+#   unix      Unix datagram sockets in a shared directory (one host, e.g. uvicorn --workers N)
+#   postgres  LISTEN/NOTIFY over DATABASE_URL (psycopg2)
+#   realtime  Supabase Realtime broadcast channel
+
+# Distinguishes this worker's own messages when a backend echoes them back
+WORKER_ID = uuid.uuid4().hex
+# Keys per message; keeps NOTIFY payloads under Postgres' 8000-byte limit
+MAX_KEYS_PER_MESSAGE = 50
+
+MESSAGES = register(Counter("invalidation_messages_total", "Cache invalidation messages by direction", ("direction",)))
+
+Message = Dict[str, Any]
+
+class Backend:
+    async def start(self, deliver: Callable[[Message], None]) -> None:
+        pass
+
+    async def publish(self, message: Message) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+class UnixSocketBackend(Backend):
+    """Every worker binds a datagram socket in INVALIDATION_SOCKET_DIR and sends to all the others."""
+
+    def __init__(self, directory: str, worker_id: str = WORKER_ID):
+        self.directory = directory
+        self.path = os.path.join(directory, f"{os.getpid()}-{worker_id[:8]}.sock")
+        self._sock: socket.socket | None = None
+
+    async def start(self, deliver: Callable[[Message], None]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.bind(self.path)
+        self._sock.setblocking(False)
+
+        def on_readable():
+            while True:
+                try:
+                    data = self._sock.recv(65536)
+                except BlockingIOError:
+                    return
+                deliver(json.loads(data))
+
+        asyncio.get_running_loop().add_reader(self._sock.fileno(), on_readable)
+
+    async def publish(self, message: Message) -> None:
+        data = json.dumps(message).encode()
+        for path in glob.glob(os.path.join(self.directory, "*.sock")):
+            if path == self.path:
+                continue
+            try:
+                self._sock.sendto(data, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Left behind by a worker that exited without cleaning up
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            except BlockingIOError:
+                logger.warning(f"Invalidation receiver {path} is not keeping up; message dropped")
+
+    async def stop(self) -> None:
+        if self._sock is not None:
+            asyncio.get_running_loop().remove_reader(self._sock.fileno())
+            self._sock.close()
+            self._sock = None
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+class PostgresBackend(Backend):
+    """LISTEN on one autocommit connection (watched by the event loop), NOTIFY on another from a thread."""
+
+    RECONNECT_SECONDS = 5.0
+
+    def __init__(self, dsn: str, channel: str):
+        self.dsn, self.channel = dsn, channel
+        self._listen_conn = None
+        self._notify_conn = None
+        self._notify_lock = threading.Lock()
+        self._deliver: Callable[[Message], None] | None = None
+        self._reconnect_task: asyncio.Task | None = None
+
+    def _connect(self):
+        import psycopg2
+        conn = psycopg2.connect(self.dsn)
+        conn.autocommit = True
+        return conn
+
+    async def start(self, deliver: Callable[[Message], None]) -> None:
+        self._deliver = deliver
+        await self._listen()
+
+    async def _listen(self) -> None:
+        from psycopg2 import sql
+        self._listen_conn = await asyncio.to_thread(self._connect)
+        with self._listen_conn.cursor() as cur:
+            cur.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.channel)))
+        asyncio.get_running_loop().add_reader(self._listen_conn.fileno(), self._on_readable)
+
+    def _on_readable(self) -> None:
+        try:
+            self._listen_conn.poll()
+        except Exception as e:
+            logger.error(f"Invalidation LISTEN connection lost: {type(e).__name__}: {e}")
+            self._drop_listener()
+            self._reconnect_task = asyncio.create_task(self._reconnect())
+            return
+        while self._listen_conn.notifies:
+            notify = self._listen_conn.notifies.pop(0)
+            self._deliver(json.loads(notify.payload))
+
+    def _drop_listener(self) -> None:
+        if self._listen_conn is None:
+            return
+        try:
+            asyncio.get_running_loop().remove_reader(self._listen_conn.fileno())
+        except (ValueError, OSError):
+            pass
+        try:
+            self._listen_conn.close()
+        except Exception:
+            pass
+        self._listen_conn = None
+
+    async def _reconnect(self) -> None:
+        while True:
+            await asyncio.sleep(self.RECONNECT_SECONDS)
+            try:
+                await self._listen()
+                return
+            except Exception as e:
+                logger.error(f"Invalidation LISTEN reconnect failed: {type(e).__name__}: {e}")
+
+    def _notify(self, payload: str) -> None:
+        with self._notify_lock:
+            for attempt in range(2):
+                try:
+                    if self._notify_conn is None or self._notify_conn.closed:
+                        self._notify_conn = self._connect()
+                    with self._notify_conn.cursor() as cur:
+                        cur.execute("SELECT pg_notify(%s, %s)", (self.channel, payload))
+                    return
+                except Exception:
+                    self._notify_conn = None
+                    if attempt:
+                        raise
+
+    async def publish(self, message: Message) -> None:
+        await asyncio.to_thread(self._notify, json.dumps(message))
+
+    async def stop(self) -> None:
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+        self._drop_listener()
+        if self._notify_conn is not None:
+            self._notify_conn.close()
+
+class RealtimeBackend(Backend):
+    """Broadcast channel on the project's Supabase Realtime server (the same URL and key as PostgREST)."""
+
+    EVENT = "invalidate"
+
+    def __init__(self, channel: str):
+        self.topic = channel
+        self._channel = None
+
+    async def start(self, deliver: Callable[[Message], None]) -> None:
+        from app.database import supabase
+        self._channel = supabase.channel(self.topic, {"config": {"broadcast": {"self": False, "ack": False}}})
+        self._channel.on_broadcast(self.EVENT, lambda payload: deliver(payload["payload"]))
+        await self._channel.subscribe()
+
+    async def publish(self, message: Message) -> None:
+        await self._channel.send_broadcast(self.EVENT, message)
+
+    async def stop(self) -> None:
+        if self._channel is not None:
+            from app.database import supabase
+            await supabase.remove_channel(self._channel)
+
+def _make_backend(name: str, worker_id: str) -> Backend | None:
+    if name == "unix":
+        return UnixSocketBackend(settings.INVALIDATION_SOCKET_DIR, worker_id)
+    if name == "postgres":
+        if not settings.DATABASE_URL:
+            raise RuntimeError("INVALIDATION_BUS=postgres needs DATABASE_URL")
+        return PostgresBackend(settings.DATABASE_URL, settings.INVALIDATION_CHANNEL)
+    if name == "realtime":
+        return RealtimeBackend(settings.INVALIDATION_CHANNEL)
+    if name == "none":
+        return None
+    raise RuntimeError(f"Unknown INVALIDATION_BUS: {name}")
+
+class InvalidationBus:
+    def __init__(self, worker_id: str = WORKER_ID):
+        self.worker_id = worker_id
+        self._handlers: Dict[str, Callable[..., None]] = {}
+        self._pending: Dict[str, set] = {}
+        self._backend: Backend | None = None
+        self._flush: asyncio.Task | None = None
+
+    def subscribe(self, kind: str, handler: Callable[..., None]) -> None:
+        """handler(*key) runs for every change of `kind` published by another worker."""
+        self._handlers[kind] = handler
+        self._pending.setdefault(kind, set())
+
+    def publish(self, kind: str, *key: Any) -> None:
+        """Tell the other workers; a no-op without a backend. Callable from sync code on the loop."""
+        if self._backend is None:
+            return
+        self._pending.setdefault(kind, set()).add(key)
+        if self._flush is None:
+            self._flush = asyncio.get_running_loop().create_task(self._send())
+
+    async def _send(self) -> None:
+        pending = {kind: list(keys) for kind, keys in self._pending.items() if keys}
+        for keys in self._pending.values():
+            keys.clear()
+        self._flush = None
+        for kind, keys in pending.items():
+            for i in range(0, len(keys), MAX_KEYS_PER_MESSAGE):
+                message = {"origin": self.worker_id, "kind": kind, "keys": keys[i:i + MAX_KEYS_PER_MESSAGE]}
+                try:
+                    await self._backend.publish(message)
+                    MESSAGES.inc("sent")
+                except Exception as e:
+                    # Peers fall back on their cache TTLs and snapshot staleness bound
+                    logger.error(f"Invalidation publish failed: {type(e).__name__}: {e}")
+
+    def _deliver(self, message: Message) -> None:
+        if message.get("origin") == self.worker_id:
+            return
+        handler = self._handlers.get(message.get("kind"))
+        if handler is None:
+            return
+        MESSAGES.inc("received")
+        for key in message.get("keys", []):
+            try:
+                handler(*key)
+            except Exception as e:
+                logger.error(f"Invalidation handler failed for {message.get('kind')} {key}: {type(e).__name__}: {e}")
+
+    async def start(self, backend: str) -> None:
+        self._backend = _make_backend(backend, self.worker_id)
+        if self._backend is not None:
+            await self._backend.start(self._deliver)
+            logger.info(f"Cache invalidation bus started ({backend})")
+
+    async def stop(self) -> None:
+        if self._backend is None:
+            return
+        if self._flush is not None:
+            await self._flush
+        await self._backend.stop()
+        self._backend = None
+
+invalidation_bus = InvalidationBus()
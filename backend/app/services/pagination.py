@@ -0,0 +1,38 @@
+import base64
+import binascii
+import json
+import uuid
+from datetime import datetime
+from fastapi import HTTPException, status
+
+# Keyset (cursor) pagination helpers. A cursor is the opaque, URL-safe encoding
+# of the sort key of the last row on the previous page: a timestamp with a
+# time zone and a row id, e.g. (event_date, id).
+
+def encode_cursor(*values) -> str:
+    raw = json.dumps([str(v) for v in values], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+def decode_cursor(cursor: str) -> list[str]:
+    """
+    Returns [timestamp, id] in canonical form. Anything else is a 400: the
+    values go into database filters and the snapshot's sort keys, which both
+    need an aware timestamp and a real UUID.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, binascii.Error):
+        raise _invalid_cursor()
+    if not isinstance(values, list) or len(values) != 2 or not all(isinstance(v, str) for v in values):
+        raise _invalid_cursor()
+    try:
+        timestamp = datetime.fromisoformat(values[0].replace("Z", "+00:00"))
+        row_id = uuid.UUID(values[1])
+    except ValueError:
+        raise _invalid_cursor()
+    if timestamp.tzinfo is None:
+        raise _invalid_cursor()
+    return [timestamp.isoformat(), str(row_id)]
@@ -0,0 +1,210 @@
+import heapq
+import itertools
+import os
+import random
+import sys
+import threading
+import uuid
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from types import FrameType
+from typing import Any, Deque, Dict, List
+from urllib.parse import parse_qsl
+from app.config import settings
+from app.metrics import RequestStats
+
+# On-demand production profiling, switched on at runtime from /api/admin/profiling.
+# Two independent parts, both off by default:
+# - sampling: SAMPLE_PERCENT of requests are watched by a background thread that
+#   snapshots the event loop thread's stack every SAMPLE_INTERVAL_MS; a sample
+#   belongs to a request when that request's coroutine is on the stack, so
+#   concurrent requests do not pollute each other's profiles. The slowest
+#   KEEP_SLOWEST profiles are kept as collapsed stacks ("a;b;c 12" lines, the
+#   input format of flamegraph.pl and speedscope).
+# - the slow-request log: every request slower than SLOW_REQUEST_MS, with its
+#   route, parameters, status and each database call it made (app.metrics).
+# State is per worker: with several uvicorn workers, each keeps its own.
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+@dataclass
+class Profile:
+    id: str
+    method: str
+    path: str
+    query: str
+    started_at: str
+    route: str = "<unmatched>"
+    status: int = 500
+    seconds: float = 0.0
+    samples: int = 0
+    stacks: Counter = field(default_factory=Counter)
+    db_calls: List[Dict[str, Any]] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "route": self.route,
+            "path": self.path,
+            "params": dict(parse_qsl(self.query)),
+            "status": self.status,
+            "started_at": self.started_at,
+            "duration_ms": round(self.seconds * 1000, 2),
+            "samples": self.samples,
+            "sampled_ms": round(self.samples * settings.PROFILING_SAMPLE_INTERVAL_MS, 2),
+            "db_calls": self.db_calls,
+        }
+
+    def collapsed(self) -> List[str]:
+        root = f"{self.method} {self.route} [{self.summary()['duration_ms']}ms]"
+        return [f"{root};{stack} {count}" for stack, count in self.stacks.most_common()]
+
+class RequestProfiler:
+    def __init__(self):
+        self.sample_percent = settings.PROFILING_SAMPLE_PERCENT
+        self.slow_request_ms = settings.PROFILING_SLOW_REQUEST_MS
+        # Middleware coroutine frame -> the profile its samples go to
+        self._watched: Dict[FrameType, Profile] = {}
+        self._slowest: List[tuple] = []
+        self._tiebreak = itertools.count()
+        self.slow_log: Deque[Dict[str, Any]] = deque(maxlen=settings.PROFILING_SLOW_LOG_SIZE)
+        self._loop_thread_id: int | None = None
+        self._sampler: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        """False means the middleware passes every request straight through."""
+        return self.sample_percent > 0 or self.slow_request_ms > 0
+
+    def configure(self, sample_percent: float | None = None, slow_request_ms: float | None = None) -> Dict[str, Any]:
+        if sample_percent is not None:
+            self.sample_percent = sample_percent
+        if slow_request_ms is not None:
+            self.slow_request_ms = slow_request_ms
+        if self.sample_percent > 0:
+            self._start_sampler()
+        else:
+            self._stop_sampler()
+        return self.status()
+
+    def clear(self) -> None:
+        self._slowest.clear()
+        self.slow_log.clear()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "sample_percent": self.sample_percent,
+            "slow_request_ms": self.slow_request_ms,
+            "sample_interval_ms": settings.PROFILING_SAMPLE_INTERVAL_MS,
+            "sampling": self._sampler is not None,
+            "in_flight": len(self._watched),
+            "profiles": [profile.summary() for profile in self.profiles()],
+            "slow_requests": len(self.slow_log),
+        }
+
+    def profiles(self) -> List[Profile]:
+        """Kept profiles, slowest first."""
+        return [profile for _, _, profile in sorted(self._slowest, reverse=True)]
+
+    def get(self, profile_id: str) -> Profile | None:
+        return next((profile for _, _, profile in self._slowest if profile.id == profile_id), None)
+
+    # --- Per request (called from ProfilingMiddleware on the event loop) ---
+
+    def should_sample(self) -> bool:
+        if self.sample_percent <= 0 or random.random() * 100 >= self.sample_percent:
+            return False
+        # Started here too when PROFILING_SAMPLE_PERCENT is set at boot
+        self._start_sampler()
+        return True
+
+    def watch(self, frame: FrameType, method: str, path: str, query: str) -> Profile:
+        self._loop_thread_id = threading.get_ident()
+        profile = Profile(
+            id=uuid.uuid4().hex[:12], method=method, path=path, query=query,
+            started_at=datetime.now(timezone.utc).isoformat(),
+        )
+        with self._lock:
+            self._watched[frame] = profile
+        return profile
+
+    def unwatch(self, frame: FrameType) -> None:
+        # Under the lock so no sample lands once the profile is being finished
+        with self._lock:
+            self._watched.pop(frame, None)
+
+    def finish(
+        self, profile: Profile | None, method: str, route: str, path: str, query: str,
+        status: int, seconds: float, stats: RequestStats,
+    ) -> None:
+        db_calls = [
+            {"method": call.method, "target": call.target, "status": call.status, "ms": round(call.seconds * 1000, 2)}
+            for call in stats.calls
+        ]
+        if profile is not None:
+            profile.route, profile.status, profile.seconds, profile.db_calls = route, status, seconds, db_calls
+            entry = (seconds, next(self._tiebreak), profile)
+            if len(self._slowest) < settings.PROFILING_KEEP_SLOWEST:
+                heapq.heappush(self._slowest, entry)
+            elif seconds > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+        if self.slow_request_ms > 0 and seconds * 1000 >= self.slow_request_ms:
+            self.slow_log.append({
+                "at": datetime.now(timezone.utc).isoformat(),
+                "method": method,
+                "route": route,
+                "path": path,
+                "params": dict(parse_qsl(query)),
+                "status": status,
+                "duration_ms": round(seconds * 1000, 2),
+                "db_ms": round(stats.db_seconds * 1000, 2),
+                "db_calls": db_calls,
+                "profile_id": profile.id if profile is not None else None,
+            })
+
+    # --- Sampler thread ---
+
+    def _start_sampler(self) -> None:
+        if self._sampler is not None:
+            return
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self._sample_loop, name="request-profiler", daemon=True)
+        self._sampler.start()
+
+    def _stop_sampler(self) -> None:
+        if self._sampler is None:
+            return
+        self._stop.set()
+        self._sampler.join()
+        self._sampler = None
+
+    def _sample_loop(self) -> None:
+        interval = settings.PROFILING_SAMPLE_INTERVAL_MS / 1000
+        while not self._stop.wait(interval):
+            if self._watched and self._loop_thread_id is not None:
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is not None:
+                    with self._lock:
+                        self._sample(frame)
+
+    def _sample(self, frame: FrameType) -> None:
+        # Innermost first; only the innermost PROFILING_MAX_STACK_DEPTH frames are named
+        names: List[str] = []
+        while frame is not None:
+            profile = self._watched.get(frame)
+            if profile is not None:
+                # Everything above the request's own middleware frame is the server and event loop
+                profile.stacks[";".join(reversed(names))] += 1
+                profile.samples += 1
+                return
+            if len(names) < settings.PROFILING_MAX_STACK_DEPTH:
+                names.append(_frame_name(frame))
+            frame = frame.f_back
+
+request_profiler = RequestProfiler()
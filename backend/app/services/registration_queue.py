@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List
+from cachetools import TTLCache
+from fastapi import HTTPException, status
+from app.config import settings
+from app.repositories import repository
+from app.metrics import Collector, Counter, register
+from app.services.auth_service import resolve_guest_users
+from app.services.event_service import invalidate_event
+from app.services.registration_service import REGISTRATION_ERRORS
+
+logger = logging.getLogger(__name__)
+
+# Optional intake mode for flash events: registrations are accepted into an
+# in-process queue (202 + ticket) and a single worker drains it in batches, one
+# register_users_bulk call per event per batch, so capacity and duplicate rules
+# are applied in arrival order while database load stays bounded.
+
+QUEUE_PROCESSED = register(Counter("registration_queue_processed_total", "Queued registrations processed", ("outcome",)))
+
+@dataclass
+class Ticket:
+    id: str
+    event_id: str
+    user_id: str | None = None
+    email: str | None = None
+    name: str | None = None
+    status: str = "queued"  # queued -> registered | rejected
+    registration_id: str | None = None
+    status_code: int | None = None
+    detail: str | None = None
+    created_at: float = field(default_factory=time.time)
+    done: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    def resolve(self, outcome: str, registration_id: str | None = None) -> None:
+        if outcome == "ok":
+            self.status, self.registration_id, self.status_code, self.detail = "registered", registration_id, 201, "Registration successful"
+        else:
+            self.status = "rejected"
+            self.registration_id = registration_id
+            self.status_code, self.detail = REGISTRATION_ERRORS.get(outcome, (500, "Registration failed"))
+        QUEUE_PROCESSED.inc(outcome if outcome in REGISTRATION_ERRORS or outcome == "ok" else "error")
+        self.done.set()
+
+    def to_dict(self) -> dict:
+        return {
+            "ticket_id": self.id,
+            "status": self.status,
+            "event_id": self.event_id,
+            "registration_id": self.registration_id,
+            "status_code": self.status_code,
+            "detail": self.detail,
+        }
+
+class RegistrationQueue:
+    def __init__(self, max_size: int, batch_size: int, ticket_ttl: float):
+        self.batch_size = batch_size
+        self._queue: asyncio.Queue[Ticket] = asyncio.Queue(maxsize=max_size)
+        # Tickets still in the queue are held until resolved (at most max_size of them);
+        # resolved ones stay pollable for ticket_ttl from resolution
+        self._pending: Dict[str, Ticket] = {}
+        self._tickets: TTLCache = TTLCache(maxsize=max(max_size * 4, 1024), ttl=ticket_ttl)
+        self._worker: asyncio.Task | None = None
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run(), name="registration-queue")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Give the worker a chance to drain what was already accepted, then cancel it."""
+        if self._worker is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Registration queue stopped with {self.depth} tickets still queued")
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    def submit(self, event_id: uuid.UUID, user_id: uuid.UUID | None = None, email: str | None = None, name: str | None = None) -> Ticket:
+        ticket = Ticket(
+            id=str(uuid.uuid4()), event_id=str(event_id),
+            user_id=str(user_id) if user_id else None, email=email, name=name,
+        )
+        try:
+            self._queue.put_nowait(ticket)
+        except asyncio.QueueFull:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Registration queue is full, try again shortly",
+                headers={"Retry-After": "1"},
+            )
+        self._pending[ticket.id] = ticket
+        return ticket
+
+    def get(self, ticket_id: str) -> Ticket | None:
+        return self._pending.get(ticket_id) or self._tickets.get(ticket_id)
+
+    async def wait(self, ticket: Ticket, timeout: float) -> Ticket:
+        if timeout > 0 and not ticket.done.is_set():
+            try:
+                await asyncio.wait_for(ticket.done.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return ticket
+
+    async def _next_batch(self) -> List[Ticket]:
+        batch = [await self._queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._process(batch)
+            except Exception as e:
+                logger.error(f"Registration batch failed: {type(e).__name__}: {e}", exc_info=True)
+                for ticket in batch:
+                    if not ticket.done.is_set():
+                        ticket.resolve("error")
+            finally:
+                for ticket in batch:
+                    # The TTL starts now, however long the ticket waited in the queue
+                    self._tickets[ticket.id] = self._pending.pop(ticket.id, ticket)
+                    self._queue.task_done()
+
+    async def _process(self, batch: List[Ticket]) -> None:
+        guests = {t.email: {"email": t.email, "name": t.name} for t in batch if t.user_id is None}
+        if guests:
+            user_ids = await resolve_guest_users(list(guests.values()))
+            for ticket in batch:
+                if ticket.user_id is None:
+                    ticket.user_id = user_ids.get(ticket.email)
+                    if ticket.user_id is None:
+                        ticket.resolve("error")
+
+        # Dicts keep arrival order: events in order of their first ticket, tickets in order within each event
+        by_event: Dict[str, List[Ticket]] = {}
+        for ticket in batch:
+            if not ticket.done.is_set():
+                by_event.setdefault(ticket.event_id, []).append(ticket)
+
+        for event_id, tickets in by_event.items():
+            first: Dict[str, Ticket] = {}
+            for ticket in tickets:
+                first.setdefault(ticket.user_id, ticket)
+            registered = await repository.register_users_bulk(event_id, list(first))
+            outcome = {item["user_id"]: item for item in registered}
+            for ticket in tickets:
+                item = outcome.get(ticket.user_id, {})
+                if first[ticket.user_id] is not ticket and item.get("status") == "ok":
+                    # Same user queued twice in one batch: only the earlier ticket gets the seat
+                    ticket.resolve("already_registered", item.get("registration_id"))
+                else:
+                    ticket.resolve(item.get("status", "error"), item.get("registration_id"))
+            invalidate_event(event_id)
+
+registration_queue = RegistrationQueue(
+    max_size=settings.REGISTRATION_QUEUE_MAX_SIZE,
+    batch_size=settings.REGISTRATION_QUEUE_BATCH_SIZE,
+    ticket_ttl=settings.REGISTRATION_TICKET_TTL_SECONDS,
+)
+
+register(Collector(
+    "registration_queue_depth", "Registrations waiting in the intake queue", (),
+    lambda: [((), registration_queue.depth)],
+))
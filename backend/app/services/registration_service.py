@@ -1,51 +1,39 @@
 import uuid
 from datetime import datetime, timedelta, timezone
 from fastapi import HTTPException
-from app.database import supabase
-from app.services.event_service import get_event_by_id, get_registration_count
+from app.repositories import repository
+from app.services.event_service import get_event_by_id, invalidate_event, set_cached_registration_count
 
-def register_user(user_id: uuid.UUID, event_id: uuid.UUID) -> dict:
-    # Check if event exists and is active
-    event = get_event_by_id(event_id)
-    if not event or not event.get("is_active"):
-        raise HTTPException(status_code=404, detail="Event not found or inactive")
-        
-    # Check if event date has passed
-    # Supabase gives ISO format string, e.g. "2024-03-20T12:00:00+00:00"
-    event_date_str = event.get("event_date")
-    if event_date_str:
-        # replace Z if present depending on how it's stored
-        event_date_str = event_date_str.replace("Z", "+00:00")
-        event_date = datetime.fromisoformat(event_date_str)
-        if event_date <= datetime.now(timezone.utc):
-            raise HTTPException(status_code=400, detail="Cannot register for past events")
-        
-    # Check capacity
-    current_count = get_registration_count(event_id)
-    if current_count >= event.get("capacity", 0):
-        raise HTTPException(status_code=400, detail="Event is full")
-        
-    # Check if already registered
-    existing_res = supabase.table("registrations").select("id").eq("user_id", str(user_id)).eq("event_id", str(event_id)).execute()
-    if existing_res.data:
-        raise HTTPException(status_code=400, detail="Already registered for this event")
-        
-    # Create registration
-    data = {
-        "user_id": str(user_id),
-        "event_id": str(event_id)
-    }
-    response = supabase.table("registrations").insert(data).execute()
-    return response.data[0]
+# Status codes returned by the register_for_event database function
+REGISTRATION_ERRORS = {
+    "event_not_found": (404, "Event not found or inactive"),
+    "event_past": (400, "Cannot register for past events"),
+    "event_full": (400, "Event is full"),
+    "already_registered": (400, "Already registered for this event"),
+}
+
+async def register_user(user_id: uuid.UUID, event_id: uuid.UUID) -> dict:
+    # Active/date/capacity/duplicate checks and the insert happen atomically in
+    # one RPC (see register_for_event in sql/schema.sql)
+    result = await repository.register_for_event(str(user_id), str(event_id))
+    
+    if result.get("status") != "ok":
+        status_code, detail = REGISTRATION_ERRORS.get(result.get("status"), (500, "Registration failed"))
+        raise HTTPException(status_code=status_code, detail=detail)
+    set_cached_registration_count(event_id, result["registration_count"])
+    return result["registration"]
+
+async def get_user_registrations(user_id: uuid.UUID) -> list[dict]:
+    return await repository.list_user_registrations(str(user_id))
 
-def get_user_registrations(user_id: uuid.UUID) -> list[dict]:
-    response = supabase.table("registrations").select("*, events(title, event_date)").eq("user_id", str(user_id)).order("registered_at", desc=True).execute()
-    return response.data if response.data else []
+async def get_registration_status(user_id: uuid.UUID, event_ids: list[str]) -> list[dict]:
+    """One {"event_id", "registration_id"} entry per event asked about; registration_id is None when not registered."""
+    registered = await repository.get_user_registration_ids(str(user_id), event_ids)
+    return [{"event_id": event_id, "registration_id": registered.get(event_id)} for event_id in event_ids]
 
-def cancel_registration(registration_id: uuid.UUID, user_id: uuid.UUID) -> None:
+async def cancel_registration(registration_id: uuid.UUID, user_id: uuid.UUID) -> None:
     # Fetch registration
-    reg_res = supabase.table("registrations").select("*").eq("id", str(registration_id)).maybe_single().execute()
-    registration = reg_res.data
+    registration = await repository.get_registration(str(registration_id))
     
     if not registration:
         raise HTTPException(status_code=404, detail="Registration not found")
@@ -53,7 +41,7 @@ def cancel_registration(registration_id: uuid.UUID, user_id: uuid.UUID) -> None:
     if registration.get("user_id") != str(user_id):
         raise HTTPException(status_code=403, detail="Not authorized to cancel this registration")
         
-    event = get_event_by_id(registration.get("event_id"))
+    event = await get_event_by_id(registration.get("event_id"))
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
         
@@ -64,4 +52,5 @@ def cancel_registration(registration_id: uuid.UUID, user_id: uuid.UUID) -> None:
         if event_date - datetime.now(timezone.utc) < timedelta(hours=24):
             raise HTTPException(status_code=400, detail="Cannot cancel within 24 hours of the event")
         
-    supabase.table("registrations").delete().eq("id", str(registration_id)).execute()
+    await repository.delete_registration(str(registration_id))
+    invalidate_event(registration["event_id"])
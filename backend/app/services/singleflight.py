@@ -0,0 +1,73 @@
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Dict, Hashable
+from app.metrics import Collector, register
+
+# Single-flight request coalescing: concurrent identical lookups share one
+# in-flight query and its result instead of each hitting Supabase. Results are
+# shared between callers, so wrapped functions must return data that callers
+# treat as read-only (or copy before mutating).
+
+_inflight: Dict[Hashable, asyncio.Task] = {}
+_stats: Dict[str, Dict[str, int]] = {}
+
+async def _do(name: str, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+    stats = _stats.setdefault(name, {"calls": 0, "executions": 0, "coalesced": 0})
+    stats["calls"] += 1
+    task = _inflight.get(key)
+    if task is None:
+        stats["executions"] += 1
+        # The query runs as its own task so a disconnecting caller cannot cancel it for the others
+        task = asyncio.ensure_future(fn())
+        _inflight[key] = task
+
+        def finished(done: asyncio.Task) -> None:
+            # A forgotten task must not remove the fresh execution that replaced it
+            if _inflight.get(key) is done:
+                del _inflight[key]
+
+        task.add_done_callback(finished)
+    else:
+        stats["coalesced"] += 1
+    return await asyncio.shield(task)
+
+def coalesce(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """
+    Decorator: concurrent calls with equal (hashable) arguments share one execution.
+    
+    After a write, call `forget(*args)` (or `forget_all()`) on the wrapper so
+    reads issued from then on start a new execution instead of joining one
+    that may have read the old row.
+    """
+    name = fn.__name__
+
+    def key_for(args: tuple, kwargs: dict) -> Hashable:
+        return (name, args, tuple(sorted(kwargs.items())))
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await _do(name, key_for(args, kwargs), lambda: fn(*args, **kwargs))
+
+    def forget(*args, **kwargs) -> None:
+        _inflight.pop(key_for(args, kwargs), None)
+
+    def forget_all() -> None:
+        for key in [key for key in _inflight if key[0] == name]:
+            del _inflight[key]
+
+    wrapper.forget = forget
+    wrapper.forget_all = forget_all
+    return wrapper
+
+def get_coalescing_stats() -> Dict[str, Any]:
+    return {"in_flight": len(_inflight), "functions": {name: dict(stats) for name, stats in _stats.items()}}
+
+register(Collector(
+    "singleflight_calls_total", "Coalesced read calls by outcome", ("function", "outcome"),
+    lambda: [
+        ((name, outcome), stats[key])
+        for name, stats in _stats.items()
+        for outcome, key in (("executed", "executions"), ("coalesced", "coalesced"))
+    ],
+    kind="counter",
+))
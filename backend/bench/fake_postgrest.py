@@ -0,0 +1,588 @@
+"""
+In-process PostgREST stand-in used by the benchmark suite.
+
+Implements the subset of the PostgREST HTTP API that the EventSphere services
+use (table reads with embedded resources and counts, filters, ordering,
+ranges, inserts/upserts, updates, deletes and the RPC functions declared in
+sql/schema.sql) over plain Python lists, so the API can be exercised without
+a Supabase project.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import threading
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+# Relations the services embed: (parent, embedded) -> (kind, local column, remote column)
+RELATIONS = {
+    ("events", "users"): ("one", "created_by", "id"),
+    ("events", "registrations"): ("many", "id", "event_id"),
+    ("registrations", "users"): ("one", "user_id", "id"),
+    ("registrations", "events"): ("one", "event_id", "id"),
+}
+
+UNIQUE = {
+    "users": [("id",), ("email",)],
+    "events": [("id",)],
+    "registrations": [("id",), ("user_id", "event_id")],
+}
+
+TIMESTAMP_COLUMNS = {"created_at", "updated_at", "event_date", "registered_at"}
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+def _normalize_timestamp(value):
+    if not isinstance(value, str):
+        return value
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return value
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat()
+
+def _defaults(table: str) -> dict:
+    now = _now()
+    if table == "users":
+        return {"id": str(uuid.uuid4()), "is_admin": False, "is_active": True, "created_at": now, "updated_at": now}
+    if table == "events":
+        return {"id": str(uuid.uuid4()), "is_active": True, "created_by": None,
+                "description": None, "location": None, "created_at": now, "updated_at": now}
+    if table == "registrations":
+        return {"id": str(uuid.uuid4()), "registered_at": now}
+    return {"id": str(uuid.uuid4())}
+
+class FakeDatabase:
+    """Thread-safe in-memory tables plus the RPC functions from schema.sql."""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.tables: dict[str, list[dict]] = {"users": [], "events": [], "registrations": []}
+        self.rpcs = RPCS
+        # (table, columns) -> {values: row}; keeps conflict checks O(1) when loading large datasets
+        self._indexes: dict[tuple, dict] = {}
+
+    def rows(self, table: str) -> list[dict]:
+        return self.tables.setdefault(table, [])
+
+    def insert(self, table: str, record: dict) -> dict:
+        row = {**_defaults(table), **record}
+        for column in TIMESTAMP_COLUMNS & row.keys():
+            row[column] = _normalize_timestamp(row[column])
+        if self.find_conflict(table, row) is not None:
+            raise Conflict(table)
+        self.rows(table).append(row)
+        for (indexed, columns), index in self._indexes.items():
+            if indexed == table:
+                index[tuple(row.get(c) for c in columns)] = row
+        return row
+
+    def update(self, table: str, row: dict, changes: dict) -> None:
+        row.update(changes)
+        if any(c in columns for indexed, columns in self._indexes if indexed == table for c in changes):
+            self._drop_indexes(table)
+
+    def delete(self, table: str, rows: list[dict]) -> None:
+        doomed = {id(row) for row in rows}
+        self.tables[table] = [row for row in self.rows(table) if id(row) not in doomed]
+        self._drop_indexes(table)
+
+    def _drop_indexes(self, table: str) -> None:
+        for key in [key for key in self._indexes if key[0] == table]:
+            del self._indexes[key]
+
+    def _index(self, table: str, columns: tuple) -> dict:
+        index = self._indexes.get((table, columns))
+        if index is None:
+            index = self._indexes[(table, columns)] = {tuple(r.get(c) for c in columns): r for r in self.rows(table)}
+        return index
+
+    def find_conflict(self, table: str, row: dict, columns: tuple | None = None):
+        for unique in ([columns] if columns else UNIQUE.get(table, [])):
+            existing = self._index(table, tuple(unique)).get(tuple(row.get(c) for c in unique))
+            if existing is not None:
+                return existing
+        return None
+
+class Conflict(Exception):
+    pass
+
+# --- Python mirrors of the functions declared in sql/schema.sql ---
+
+def _find(db: FakeDatabase, table: str, **match) -> dict | None:
+    return next((r for r in db.rows(table) if all(r.get(k) == v for k, v in match.items())), None)
+
+def register_for_event(db: FakeDatabase, p_user_id: str, p_event_id: str) -> dict:
+    event = _find(db, "events", id=p_event_id)
+    if event is None or not event["is_active"]:
+        return {"status": "event_not_found"}
+    if event["event_date"] <= _now():
+        return {"status": "event_past"}
+    count = sum(1 for r in db.rows("registrations") if r["event_id"] == p_event_id)
+    if count >= event["capacity"]:
+        return {"status": "event_full"}
+    if _find(db, "registrations", user_id=p_user_id, event_id=p_event_id):
+        return {"status": "already_registered"}
+    registration = db.insert("registrations", {"user_id": p_user_id, "event_id": p_event_id})
+    return {"status": "ok", "registration": registration, "registration_count": count + 1}
+
+def register_users_bulk(db: FakeDatabase, p_event_id: str, p_user_ids: list[str]) -> list[dict]:
+    event = _find(db, "events", id=p_event_id)
+    if event is None or not event["is_active"] or event["event_date"] <= _now():
+        status = "event_not_found" if event is None or not event["is_active"] else "event_past"
+        return [{"user_id": uid, "status": status, "registration_id": None} for uid in p_user_ids]
+    remaining = event["capacity"] - sum(1 for r in db.rows("registrations") if r["event_id"] == p_event_id)
+    out, seen = [], set()
+    for uid in p_user_ids:
+        if uid in seen:
+            continue
+        seen.add(uid)
+        existing = _find(db, "registrations", user_id=uid, event_id=p_event_id)
+        if existing:
+            out.append({"user_id": uid, "status": "already_registered", "registration_id": existing["id"]})
+        elif remaining > 0:
+            remaining -= 1
+            registration = db.insert("registrations", {"user_id": uid, "event_id": p_event_id})
+            out.append({"user_id": uid, "status": "ok", "registration_id": registration["id"]})
+        else:
+            out.append({"user_id": uid, "status": "event_full", "registration_id": None})
+    return out
+
+def search_events(db: FakeDatabase, p_query: str) -> list[dict]:
+    words = [w for w in re.split(r"[^0-9a-z]+", p_query.lower()) if w]
+    weights = (("title", 1.0), ("location", 0.4), ("description", 0.2))
+
+    def rank(event: dict) -> float | None:
+        score = 0.0
+        for word in words:
+            hits = [weight for column, weight in weights
+                    if any(token.startswith(word) for token in re.split(r"[^0-9a-z]+", (event.get(column) or "").lower()))]
+            if not hits:
+                score = None
+                break
+            score += sum(hits)
+        if p_query.lower() in (event.get("title") or "").lower():
+            score = (score or 0.0) + 1.0
+        return score
+
+    ranked = [(rank(e), e) for e in db.rows("events") if e["is_active"]]
+    ranked = [(r, e) for r, e in ranked if r is not None]
+    ranked.sort(key=lambda pair: (-pair[0], pair[1]["event_date"], pair[1]["id"]))
+    return [e for _, e in ranked]
+
+def _registration_totals(db: FakeDatabase) -> dict:
+    totals: dict = defaultdict(int)
+    for r in db.rows("registrations"):
+        totals[r["event_id"]] += 1
+    return totals
+
+def event_fill_stats(db: FakeDatabase) -> list[dict]:
+    totals = _registration_totals(db)
+    return [
+        {
+            "event_id": e["id"], "title": e["title"], "event_date": e["event_date"],
+            "capacity": e["capacity"], "is_active": e["is_active"],
+            "registration_count": totals.get(e["id"], 0),
+            "fill_ratio": round(totals.get(e["id"], 0) / e["capacity"], 4) if e["capacity"] else None,
+        }
+        for e in db.rows("events")
+    ]
+
+def _truncate(moment: datetime, bucket: str, zone: ZoneInfo) -> datetime:
+    local = moment.astimezone(zone).replace(minute=0, second=0, microsecond=0)
+    if bucket == "day":
+        local = local.replace(hour=0)
+    return local.astimezone(timezone.utc)
+
+def registration_trend(db: FakeDatabase, p_bucket: str, p_from: str, p_to: str,
+                       p_event_id: str | None = None, p_timezone: str = "UTC") -> list[dict]:
+    zone, step = ZoneInfo(p_timezone), timedelta(days=1) if p_bucket == "day" else timedelta(hours=1)
+    start, end = _truncate(datetime.fromisoformat(p_from), p_bucket, zone), datetime.fromisoformat(p_to)
+    counts: dict = defaultdict(int)
+    for r in db.rows("registrations"):
+        if p_event_id is None or r["event_id"] == p_event_id:
+            # Rows are bucketed by their UTC hour first, like registration_stats_hourly
+            hour = _truncate(datetime.fromisoformat(r["registered_at"]), "hour", timezone.utc)
+            counts[_truncate(hour, p_bucket, zone)] += 1
+    out, bucket = [], start
+    while bucket <= end:
+        out.append({"bucket": bucket.isoformat(), "registrations": counts.get(bucket, 0)})
+        # Days step in local time, like the SQL function, so DST changes keep buckets on local midnight
+        bucket = bucket + step if p_bucket == "hour" else _truncate(bucket.astimezone(zone) + step, p_bucket, zone)
+    return out
+
+def analytics_summary(db: FakeDatabase) -> list[dict]:
+    active = [s for s in event_fill_stats(db) if s["is_active"]]
+    ratios = [s["fill_ratio"] for s in active if s["fill_ratio"] is not None]
+    return [{
+        "active_events": len(active),
+        "upcoming_events": sum(1 for s in active if s["event_date"] > _now()),
+        "total_capacity": sum(s["capacity"] for s in active),
+        "total_registrations": sum(s["registration_count"] for s in active),
+        "full_events": sum(1 for s in active if s["registration_count"] >= s["capacity"]),
+        "average_fill_ratio": round(sum(ratios) / len(ratios), 4) if ratios else None,
+    }]
+
+# name -> (function, table whose rows it returns or None for a scalar/json result)
+RPCS = {
+    "register_for_event": (register_for_event, None),
+    "search_events": (search_events, "events"),
+    "register_users_bulk": (register_users_bulk, None),
+    "registration_trend": (registration_trend, None),
+    "analytics_summary": (analytics_summary, None),
+}
+
+# Views, computed from the tables on every read
+VIEWS = {
+    "event_fill_stats": event_fill_stats,
+}
+
+def _split_top_level(text: str, sep: str = ",") -> list[str]:
+    parts, depth, current = [], 0, []
+    for ch in text:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == sep and depth == 0:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(ch)
+    if current:
+        parts.append("".join(current))
+    return [p.strip() for p in parts if p.strip()]
+
+def _parse_select(text: str) -> list:
+    fields = []
+    for part in _split_top_level(text or "*"):
+        match = re.match(r"^(?:(\w+):)?(\w+)(?:!\w+)?\((.*)\)$", part)
+        if match:
+            alias, name, inner = match.groups()
+            fields.append(("embed", alias or name, name, _parse_select(inner)))
+        else:
+            fields.append(("column", part))
+    return fields
+
+def _coerce(value: str):
+    if value == "null":
+        return None
+    if value in ("true", "false"):
+        return value == "true"
+    if re.fullmatch(r"-?\d+", value):
+        return int(value)
+    if re.fullmatch(r"\d{4}-\d{2}-\d{2}[T ].*", value):
+        return _normalize_timestamp(value.replace(" ", "+") if value.count(" ") == 1 and "T" in value else value)
+    return value
+
+def _compare_value(row_value, value):
+    if isinstance(value, bool) or value is None:
+        return row_value, value
+    if isinstance(value, int) and not isinstance(row_value, bool) and isinstance(row_value, (int, float)):
+        return row_value, value
+    return (str(row_value) if row_value is not None else None), str(value)
+
+def _matches(row: dict, column: str, op_value: str) -> bool:
+    negate = False
+    if op_value.startswith("not."):
+        negate = True
+        op_value = op_value[4:]
+    op, _, raw = op_value.partition(".")
+    if len(raw) >= 2 and raw[0] == raw[-1] == '"':
+        raw = raw[1:-1]
+    row_value = row.get(column)
+    if op == "in":
+        values = [_coerce(v.strip().strip('"')) for v in raw.strip("()").split(",") if v.strip()]
+        result = any(_compare_value(row_value, v)[0] == _compare_value(row_value, v)[1] for v in values)
+    elif op == "is":
+        result = row_value is _coerce(raw)
+    elif op in ("ilike", "like"):
+        pattern = re.escape(raw.replace("*", "%")).replace("%", ".*").replace("\\.\\*", ".*")
+        flags = re.IGNORECASE if op == "ilike" else 0
+        result = row_value is not None and re.fullmatch(pattern, str(row_value), flags) is not None
+    else:
+        left, right = _compare_value(row_value, _coerce(raw))
+        if left is None or right is None:
+            result = op == "eq" and left is right if op == "eq" else op == "neq" and left is not right
+        else:
+            result = {
+                "eq": left == right, "neq": left != right,
+                "gt": left > right, "gte": left >= right,
+                "lt": left < right, "lte": left <= right,
+            }[op]
+    return not result if negate else result
+
+def _matches_logic(row: dict, expression: str, conjunction: str) -> bool:
+    results = []
+    for term in _split_top_level(expression.strip()[1:-1]):
+        nested = re.match(r"^(and|or)(\(.*\))$", term)
+        if nested:
+            results.append(_matches_logic(row, nested.group(2), nested.group(1)))
+        else:
+            column, _, op_value = term.partition(".")
+            results.append(_matches(row, column, op_value))
+    return all(results) if conjunction == "and" else any(results)
+
+RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+def _filter_rows(rows: list[dict], params) -> list[dict]:
+    out = []
+    for row in rows:
+        keep = True
+        for key, value in params.multi_items():
+            if key in RESERVED_PARAMS or "." in key:
+                continue
+            if key in ("or", "and"):
+                keep = _matches_logic(row, value, key)
+            else:
+                keep = _matches(row, key, value)
+            if not keep:
+                break
+        if keep:
+            out.append(row)
+    return out
+
+def _order_rows(rows: list[dict], order: str | None) -> list[dict]:
+    if not order:
+        return rows
+    for term in reversed(order.split(",")):
+        column, *modifiers = term.split(".")
+        desc = "desc" in modifiers
+        present = [r for r in rows if r.get(column) is not None]
+        missing = [r for r in rows if r.get(column) is None]
+        present.sort(key=lambda r: r.get(column), reverse=desc)
+        rows = present + missing if not desc else missing + present
+    return rows
+
+class FakePostgrest:
+    """
+    ASGI app serving /rest/v1/<table> and /rest/v1/rpc/<fn>. latency_ms adds a
+    fixed delay per call to model the round trip to a remote Supabase project.
+    """
+
+    def __init__(self, db: FakeDatabase | None = None, latency_ms: float = 0.0):
+        self.db = db or FakeDatabase()
+        self.latency = latency_ms / 1000
+        self.app = Starlette(routes=[
+            Route("/rest/v1/rpc/{fn}", self.rpc, methods=["GET", "POST"]),
+            Route("/rest/v1/{table}", self.table, methods=["GET", "HEAD", "POST", "PATCH", "DELETE"]),
+        ])
+
+    def _related(self, index: dict, name: str, remote: str, value) -> list[dict]:
+        """Rows of `name` whose `remote` column equals value, indexed once per response."""
+        key = (name, remote)
+        if key not in index:
+            grouped = defaultdict(list)
+            for r in self.db.rows(name):
+                grouped[r.get(remote)].append(r)
+            index[key] = grouped
+        return index[key].get(value, [])
+
+    def _project(self, table: str, row: dict, fields: list, index: dict) -> dict:
+        out = {}
+        for field in fields:
+            if field[0] == "column":
+                if field[1] == "*":
+                    out.update(row)
+                else:
+                    out[field[1]] = row.get(field[1])
+                continue
+            _, alias, name, inner = field
+            kind, local, remote = RELATIONS[(table, name)]
+            related = self._related(index, name, remote, row.get(local))
+            if kind == "one":
+                out[alias] = self._project(name, related[0], inner, index) if related else None
+            elif inner == [("column", "count")]:
+                out[alias] = [{"count": len(related)}]
+            else:
+                out[alias] = [self._project(name, r, inner, index) for r in related]
+        return out
+
+    def _respond(self, request: Request, table: str, rows: list[dict], status: int = 200, total: int | None = None):
+        fields = _parse_select(request.query_params.get("select", "*"))
+        index: dict = {}
+        data = [self._project(table, r, fields, index) for r in rows]
+        headers = {}
+        prefer = request.headers.get("prefer", "")
+        if "count=" in prefer:
+            total = len(rows) if total is None else total
+            end = max(len(data) - 1, 0)
+            headers["content-range"] = f"0-{end}/{total}"
+        if "application/vnd.pgrst.object+json" in request.headers.get("accept", ""):
+            if len(data) != 1:
+                return JSONResponse(
+                    {"code": "PGRST116", "message": "JSON object requested, multiple (or no) rows returned",
+                     "details": f"The result contains {len(data)} rows", "hint": None},
+                    status_code=406,
+                )
+            return JSONResponse(data[0], status_code=status, headers=headers)
+        if status != 200 and "return=representation" not in prefer:
+            return Response(status_code=204 if status == 200 else status, headers=headers)
+        return JSONResponse(data, status_code=status, headers=headers)
+
+    def _respond_rows(self, request: Request, table: str, rows: list[dict]):
+        params = request.query_params
+        rows = _order_rows(_filter_rows(rows, params), params.get("order"))
+        total = len(rows)
+        offset = int(params.get("offset", 0))
+        limit = params.get("limit")
+        rows = rows[offset: offset + int(limit)] if limit is not None else rows[offset:]
+        return self._respond(request, table, rows, total=total)
+
+    async def table(self, request: Request):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        table = request.path_params["table"]
+        params = request.query_params
+        with self.db.lock:
+            if request.method in ("GET", "HEAD"):
+                rows = VIEWS[table](self.db) if table in VIEWS else self.db.rows(table)
+                return self._respond_rows(request, table, rows)
+
+            body = json.loads(await request.body() or b"null")
+            prefer = request.headers.get("prefer", "")
+            if request.method == "POST":
+                records = body if isinstance(body, list) else [body]
+                conflict_columns = tuple(params["on_conflict"].split(",")) if "on_conflict" in params else None
+                created = []
+                try:
+                    for record in records:
+                        existing = self.db.find_conflict(table, record, conflict_columns) if "resolution=" in prefer else None
+                        if existing is not None:
+                            if "resolution=merge-duplicates" in prefer:
+                                self.db.update(table, existing, record)
+                                created.append(existing)
+                            continue
+                        created.append(self.db.insert(table, record))
+                except Conflict:
+                    return JSONResponse(
+                        {"code": "23505", "message": "duplicate key value violates unique constraint",
+                         "details": None, "hint": None},
+                        status_code=409,
+                    )
+                return self._respond(request, table, created, status=201)
+
+            matched = _filter_rows(self.db.rows(table), params)
+            if request.method == "PATCH":
+                for row in matched:
+                    if "updated_at" in row:
+                        # Mirrors the set_updated_at trigger
+                        row["updated_at"] = _now()
+                    self.db.update(table, row, {k: _normalize_timestamp(v) if k in TIMESTAMP_COLUMNS else v for k, v in body.items()})
+                return self._respond(request, table, matched)
+
+            self.db.delete(table, matched)
+            return self._respond(request, table, matched)
+
+    async def rpc(self, request: Request):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        name = request.path_params["fn"]
+        fn, returns = self.db.rpcs.get(name, (None, None))
+        if fn is None:
+            return JSONResponse({"code": "PGRST202", "message": f"Could not find the function public.{name}",
+                                 "details": None, "hint": None}, status_code=404)
+        params = json.loads(await request.body() or b"{}") if request.method == "POST" else dict(request.query_params)
+        with self.db.lock:
+            result = fn(self.db, **params)
+            if returns is None:
+                return JSONResponse(result)
+            return self._respond_rows(request, returns, result)
+
+# --- Deterministic benchmark dataset ---
+
+BENCH_ADMIN_EMAIL = "admin@bench.example.com"
+BENCH_ADMIN_PASSWORD = "bench-admin-password"
+WORDS = [
+    "hackathon", "workshop", "seminar", "machine", "learning", "cloud", "robotics", "design",
+    "startup", "music", "quiz", "debate", "python", "security", "data", "science", "career",
+    "orientation", "convocation", "sports", "photography", "blockchain", "web", "mobile",
+]
+PLACES = ["Seminar Hall A", "Innovation Center", "CS Lab 1", "CS Lab 3", "Auditorium", "Conference Room", "Open Air Theatre"]
+
+def seed_dataset(db: FakeDatabase, users: int, events: int, registrations: int, seed: int = 42) -> dict:
+    """
+    Fill the fake with a reproducible dataset. Event 0 ("flash") has a small
+    capacity for the flash-crowd scenario; event 1 ("export") gets a large
+    share of the registrations for the export scenario.
+    """
+    rng = random.Random(seed)
+    make_id = lambda: str(uuid.UUID(int=rng.getrandbits(128), version=4))
+    start = datetime.now(timezone.utc)
+
+    admin = db.insert("users", {"id": make_id(), "email": BENCH_ADMIN_EMAIL, "full_name": "Bench Admin",
+                                "hashed_password": BENCH_ADMIN_PASSWORD, "is_admin": True})
+    user_ids = [admin["id"]]
+    for i in range(users):
+        user = db.insert("users", {"id": make_id(), "email": f"student{i}@bench.example.com",
+                                   "full_name": f"Student {i}", "hashed_password": "guest_no_login",
+                                   "created_at": (start - timedelta(minutes=i)).isoformat()})
+        user_ids.append(user["id"])
+
+    event_ids = []
+    for i in range(events):
+        title_words = rng.sample(WORDS, 3)
+        event = db.insert("events", {
+            "id": make_id(),
+            "title": " ".join(w.capitalize() for w in title_words),
+            "description": " ".join(rng.choices(WORDS, k=25)),
+            "location": rng.choice(PLACES),
+            "event_date": (start + timedelta(days=rng.randint(1, 365), hours=rng.randint(8, 18))).isoformat(),
+            "capacity": 200 if i == 0 else rng.choice([30, 60, 100, 150, 300, 1000, 100000]),
+            "created_by": admin["id"],
+        })
+        event_ids.append(event["id"])
+
+    taken = set()
+    registered_at = start - timedelta(days=30)
+    for i in range(registrations):
+        # Half of the registrations go to the export event, the rest are spread out
+        event_id = event_ids[1] if len(event_ids) > 1 and i % 2 == 0 else rng.choice(event_ids[2:] or event_ids)
+        user_id = rng.choice(user_ids)
+        if (user_id, event_id) in taken:
+            continue
+        taken.add((user_id, event_id))
+        registered_at += timedelta(seconds=rng.randint(0, 30))
+        db.insert("registrations", {"id": make_id(), "user_id": user_id, "event_id": event_id,
+                                    "registered_at": registered_at.isoformat()})
+
+    return {"admin_email": BENCH_ADMIN_EMAIL, "admin_password": BENCH_ADMIN_PASSWORD,
+            "event_ids": event_ids, "flash_event_id": event_ids[0] if event_ids else None,
+            "export_event_id": event_ids[1] if len(event_ids) > 1 else None}
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the in-process PostgREST stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay added to every call")
+    parser.add_argument("--users", type=int, default=0)
+    parser.add_argument("--events", type=int, default=0)
+    parser.add_argument("--registrations", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--manifest", help="write the seeded ids/credentials to this JSON file")
+    args = parser.parse_args()
+
+    fake = FakePostgrest(latency_ms=args.latency_ms)
+    if args.users or args.events or args.registrations:
+        manifest = seed_dataset(fake.db, args.users, args.events, args.registrations, args.seed)
+        if args.manifest:
+            with open(args.manifest, "w") as f:
+                json.dump(manifest, f)
+    uvicorn.run(fake.app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Load-test benchmark for the EventSphere API.
+
+Boots a PostgREST stand-in (bench.fake_postgrest) and `app.main:app` under
+uvicorn as subprocesses, runs scripted scenarios against the API and reports
+requests/second, p50/p95/p99 latency and Supabase calls per request (read
+from the app's /metrics). Results are written as JSON so runs from different
+commits can be compared with --compare.
+
+Run from the backend directory:
+    python -m bench --requests 500 --concurrency 25 --output bench-results.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEARCH_TERMS = ["hack", "work", "machine lear", "cloud", "rob", "data sci", "orient", "music"]
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _wait_for(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+def _db_totals(metrics_text: str) -> tuple[float, float]:
+    """(sum of Supabase calls, number of requests) over all routes except /metrics itself."""
+    calls = requests = 0.0
+    for line in metrics_text.splitlines():
+        match = re.match(r'http_request_db_calls_(sum|count)\{method="[A-Z]+",route="([^"]*)"\} (\S+)', line)
+        if match and match.group(2) != "/metrics":
+            if match.group(1) == "sum":
+                calls += float(match.group(3))
+            else:
+                requests += float(match.group(3))
+    return calls, requests
+
+class Scenario:
+    def __init__(self, name: str, make_request: Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]):
+        self.name = name
+        self.make_request = make_request
+
+async def _run_scenario(client: httpx.AsyncClient, scenario: Scenario, requests: int, concurrency: int) -> Dict:
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    counter = iter(range(requests))
+
+    async def worker():
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                response = await scenario.make_request(client, i)
+                statuses[str(response.status_code)] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - start)
+
+    before = _db_totals((await client.get("/metrics")).text)
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    after = _db_totals((await client.get("/metrics")).text)
+
+    handled = after[1] - before[1]
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "seconds": round(wall, 3),
+        "rps": round(requests / wall, 1) if wall else None,
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50) * 1000, 2),
+            "p95": round(_percentile(latencies, 95) * 1000, 2),
+            "p99": round(_percentile(latencies, 99) * 1000, 2),
+            "max": round(max(latencies) * 1000, 2) if latencies else 0.0,
+        },
+        "db_calls_per_request": round((after[0] - before[0]) / handled, 2) if handled else None,
+        "statuses": dict(statuses),
+    }
+
+def build_scenarios(manifest: Dict, admin_token: str, rng: random.Random) -> List[Scenario]:
+    event_ids = manifest["event_ids"]
+    auth = {"Authorization": f"Bearer {admin_token}"}
+
+    async def browse(client, i):
+        return await client.get("/api/events/", params={"page": rng.randint(1, 5), "size": 10})
+
+    async def search(client, i):
+        return await client.get("/api/events/", params={"search": rng.choice(SEARCH_TERMS)})
+
+    async def detail(client, i):
+        return await client.get(f"/api/events/{rng.choice(event_ids[:20])}")
+
+    async def flash_crowd(client, i):
+        return await client.post("/api/registrations/public", json={
+            "event_id": manifest["flash_event_id"], "name": f"Flash {i}", "email": f"flash{i}-{rng.random():.8f}@bench.example.com",
+        })
+
+    async def admin_export(client, i):
+        async with client.stream("GET", f"/api/admin/events/{manifest['export_event_id']}/registrations/export",
+                                 params={"format": "csv"}, headers=auth) as response:
+            async for _ in response.aiter_bytes():
+                pass
+            return response
+
+    return [
+        Scenario("browse", browse),
+        Scenario("search", search),
+        Scenario("detail", detail),
+        Scenario("flash_crowd", flash_crowd),
+        Scenario("admin_export", admin_export),
+    ]
+
+async def _run_all(base_url: str, manifest: Dict, args) -> Dict:
+    rng = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        login = await client.post("/api/auth/login", data={
+            "username": manifest["admin_email"], "password": manifest["admin_password"],
+        })
+        login.raise_for_status()
+        scenarios = build_scenarios(manifest, login.json()["access_token"], rng)
+        selected = [s for s in scenarios if args.scenarios == "all" or s.name in args.scenarios.split(",")]
+
+        results = {}
+        for scenario in selected:
+            requests = args.export_requests if scenario.name == "admin_export" else args.requests
+            concurrency = min(args.concurrency, requests)
+            results[scenario.name] = await _run_scenario(client, scenario, requests, concurrency)
+            print(f"{scenario.name:>13}: {results[scenario.name]['rps']:>8} req/s  "
+                  f"p50 {results[scenario.name]['latency_ms']['p50']:>7} ms  "
+                  f"p99 {results[scenario.name]['latency_ms']['p99']:>7} ms  "
+                  f"db/req {results[scenario.name]['db_calls_per_request']}  "
+                  f"{results[scenario.name]['statuses']}")
+        return results
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _compare(previous_path: str, current: Dict) -> None:
+    with open(previous_path) as f:
+        previous = json.load(f)
+    print(f"\nvs {previous['meta'].get('git_revision')} ({previous_path}):")
+    for name, result in current["scenarios"].items():
+        old = previous.get("scenarios", {}).get(name)
+        if not old or not old.get("rps"):
+            continue
+        rps_change = (result["rps"] - old["rps"]) / old["rps"] * 100
+        p99_change = (result["latency_ms"]["p99"] - old["latency_ms"]["p99"]) / max(old["latency_ms"]["p99"], 1e-9) * 100
+        print(f"{name:>13}: rps {rps_change:+.1f}%  p99 {p99_change:+.1f}%  "
+              f"db/req {old.get('db_calls_per_request')} -> {result.get('db_calls_per_request')}")
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default="all", help="comma-separated: browse,search,detail,flash_crowd,admin_export")
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--export-requests", type=int, default=10, help="requests for admin_export")
+    parser.add_argument("--concurrency", type=int, default=25)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--events", type=int, default=300)
+    parser.add_argument("--registrations", type=int, default=20000)
+    parser.add_argument("--db-latency-ms", type=float, default=5.0, help="simulated Supabase round-trip time")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--compare", help="previous results JSON to diff against")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="extra app settings")
+    args = parser.parse_args(argv)
+
+    db_port, app_port = _free_port(), _free_port()
+    processes = []
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest_path = os.path.join(tmp, "manifest.json")
+        try:
+            processes.append(subprocess.Popen([
+                sys.executable, "-m", "bench.fake_postgrest", "--port", str(db_port),
+                "--latency-ms", str(args.db_latency_ms), "--users", str(args.users),
+                "--events", str(args.events), "--registrations", str(args.registrations),
+                "--seed", str(args.seed), "--manifest", manifest_path,
+            ], cwd=BACKEND_DIR))
+            _wait_for(f"http://127.0.0.1:{db_port}/rest/v1/events?limit=1")
+
+            env = {
+                **os.environ,
+                "SUPABASE_URL": f"http://127.0.0.1:{db_port}",
+                "SUPABASE_KEY": "bench",
+                "SECRET_KEY": "bench-secret",
+                "ALLOWED_ORIGINS": "http://localhost",
+                "APP_ENV": "bench",
+                "METRICS_ENABLED": "true",
+                # Every scenario comes from one client IP; keep the per-IP/email buckets out of the numbers
+                "ADMISSION_RATE_LIMITS": "{}",
+                **dict(item.split("=", 1) for item in args.env),
+            }
+            processes.append(subprocess.Popen([
+                sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+                "--port", str(app_port), "--log-level", "warning", "--no-access-log",
+            ], cwd=BACKEND_DIR, env=env))
+            _wait_for(f"http://127.0.0.1:{app_port}/health")
+
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            scenarios = asyncio.run(_run_all(f"http://127.0.0.1:{app_port}", manifest, args))
+        finally:
+            for process in reversed(processes):
+                process.terminate()
+                process.wait(timeout=10)
+
+    results = {
+        "meta": {
+            "git_revision": _git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "parameters": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        },
+        "scenarios": scenarios,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    if args.compare:
+        _compare(args.compare, results)
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,33 @@
 """
 Seed script: Creates an admin user and demo events in Supabase.
 Run from the backend directory: python seed.py
+
+Scale mode generates a large synthetic campus dataset for performance work:
+    python seed.py --scale --users 100000 --events 20000 --registrations 2000000
+        [--target postgres|postgrest] [--workers 4] [--batch-size 5000] [--seed 42]
+Rows are derived from the seed and --as-of day alone, so the same arguments always
+produce the same dataset (whatever the worker count) and re-running skips rows
+already loaded.
 """
+import argparse
+import csv
+import io
+import random
 import sys
 import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
 sys.path.insert(0, os.path.dirname(__file__))
 
-from passlib.context import CryptContext
-from app.database import supabase
+from postgrest.types import ReturnMethod
+from supabase import create_client
+from app.config import settings
+from app.services.auth_service import hash_password_sync
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# The app runs on the async client; a one-off script is simpler with the sync one
+supabase = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
 
 ADMIN_EMAIL = "admin@sahyadri.edu.in"
 ADMIN_PASSWORD = "admin123"
@@ -21,11 +39,11 @@ def seed():
     # --- 1. Create admin user ---
     existing = supabase.table("users").select("id").eq("email", ADMIN_EMAIL).maybe_single().execute()
 
-    if existing.data:
+    if existing and existing.data:
         admin_id = existing.data["id"]
         print(f"[OK] Admin user already exists (id={admin_id})")
     else:
-        hashed = pwd_context.hash(ADMIN_PASSWORD)
+        hashed = hash_password_sync(ADMIN_PASSWORD)
         res = supabase.table("users").insert({
             "email": ADMIN_EMAIL,
             "full_name": ADMIN_NAME,
@@ -110,5 +128,291 @@ def seed():
     print(f"\n[DONE] Seed complete! Inserted {inserted} new events.")
     print(f"   Admin login: {ADMIN_EMAIL} / {ADMIN_PASSWORD}")
 
+# --- Scale mode ---
+
+# Every generated account shares this password (hashed once), so load tests can log in as anyone
+SCALE_PASSWORD = "seed-password"
+SCALE_EMAIL_DOMAIN = "students.example.com"
+IST = timezone(timedelta(hours=5, minutes=30))
+
+FIRST_NAMES = ["Aarav", "Aditi", "Akash", "Ananya", "Arjun", "Bhavana", "Chetan", "Deepa", "Dhruv", "Divya",
+               "Gautam", "Harsha", "Isha", "Karthik", "Kavya", "Manoj", "Meghana", "Nikhil", "Pooja", "Prajwal",
+               "Rahul", "Rakshitha", "Rohan", "Sahana", "Shreya", "Sneha", "Suhas", "Tejas", "Varun", "Vidya"]
+LAST_NAMES = ["Acharya", "Bhat", "Hegde", "Kamath", "Kini", "Kulkarni", "Mallya", "Nayak", "Pai", "Prabhu",
+              "Rai", "Rao", "Shenoy", "Shetty", "Suvarna"]
+EVENT_KINDS = ["Workshop", "Seminar", "Hackathon", "Bootcamp", "Guest Lecture", "Meetup", "Symposium", "Quiz",
+               "Hands-on Lab", "Panel Discussion", "Coding Contest", "Career Talk"]
+TOPICS = ["AI & Machine Learning", "Cloud Computing", "Cyber Security", "Data Science", "Web Development",
+          "Open Source", "IoT", "Robotics", "Blockchain", "DevOps", "Competitive Programming", "UI/UX Design",
+          "Embedded Systems", "Mobile Apps", "Quantum Computing", "Startups", "Placements", "Research Writing"]
+VENUES = [("Sahyadri Seminar Hall A", 150), ("Sahyadri Innovation Center", 200), ("CS Lab 1, Block A", 60),
+          ("CS Lab 3, Block B", 80), ("Sahyadri Auditorium", 1000), ("Conference Room, Admin Block", 40),
+          ("Open Air Theatre", 2000), ("Library Discussion Room", 30), ("EC Seminar Hall", 120)]
+# Most events are lab/classroom sized; a few fill the auditorium or the open air theatre
+VENUE_WEIGHTS = [18, 8, 20, 16, 5, 14, 1, 10, 8]
+# Relative number of events per month (Jan..Dec); exam and vacation months are quiet
+MONTH_WEIGHTS = [1.0, 1.2, 1.2, 0.8, 0.3, 0.4, 0.9, 1.1, 1.2, 1.0, 0.5, 0.3]
+
+def _scale_id(seed: int, kind: str, index: int) -> str:
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"eventsphere-seed:{seed}:{kind}:{index}"))
+
+def _rng(seed: int, kind: str, index: int) -> random.Random:
+    return random.Random(f"{seed}:{kind}:{index}")
+
+class ScalePlan:
+    """The shape of a dataset; every row is rebuilt from (seed, index), so workers need no shared state."""
+
+    def __init__(self, users: int, events: int, registrations: int, seed: int, as_of: datetime, years: float = 4.0):
+        self.users, self.events, self.registrations, self.seed = users, events, registrations, seed
+        # "Now" for the generated history; events after it are upcoming
+        self.now = as_of
+        self.start = self.now - timedelta(days=365 * years)
+        # Roughly one organiser (admin) per 2000 students
+        self.staff = max(1, users // 2000)
+        self.per_event = self._registrations_per_event() if users and events else [0] * events
+
+    def user(self, i: int) -> dict:
+        rng = _rng(self.seed, "user", i)
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        joined = self.start + timedelta(seconds=rng.random() * (self.now - self.start).total_seconds())
+        return {
+            "id": _scale_id(self.seed, "user", i),
+            "email": f"{first}.{last}.{i}@{SCALE_EMAIL_DOMAIN}".lower(),
+            "full_name": f"{first} {last}",
+            "is_admin": i < self.staff,
+            "is_active": rng.random() > 0.01,
+            "created_at": joined.isoformat(),
+        }
+
+    def event(self, i: int) -> dict:
+        rng = _rng(self.seed, "event", i)
+        while True:
+            # Weekdays during term time; a quarter of the year ahead is already scheduled
+            day = self.start + timedelta(days=rng.random() * ((self.now - self.start).days + 90))
+            weight = MONTH_WEIGHTS[day.month - 1] * (0.25 if day.weekday() >= 5 else 1.0)
+            if rng.random() < weight / max(MONTH_WEIGHTS):
+                break
+        event_date = day.astimezone(IST).replace(hour=rng.randint(9, 17), minute=rng.choice((0, 30)), second=0, microsecond=0)
+        venue, capacity = rng.choices(VENUES, weights=VENUE_WEIGHTS)[0]
+        kind, topic = rng.choice(EVENT_KINDS), rng.choice(TOPICS)
+        created_at = event_date - timedelta(days=rng.uniform(7, 60))
+        return {
+            "id": _scale_id(self.seed, "event", i),
+            "title": f"{topic} {kind}",
+            "description": f"A {kind.lower()} on {topic} at {venue}. " + " ".join(rng.sample(TOPICS, 3)) + " welcome.",
+            "location": venue,
+            "event_date": event_date.isoformat(),
+            "capacity": capacity,
+            # A few events get cancelled (soft-deleted)
+            "is_active": rng.random() > 0.03,
+            "created_by": _scale_id(self.seed, "user", rng.randrange(self.staff)),
+            "created_at": min(created_at, self.now).isoformat(),
+            "updated_at": min(created_at, self.now).isoformat(),
+        }
+
+    def _demand(self, i: int) -> tuple[float, int]:
+        """(relative demand, hard cap) for event i: skewed popularity, only registrations up to now."""
+        event = self.event(i)
+        rng = _rng(self.seed, "demand", i)
+        fill = 1.0 if rng.random() < 0.08 else rng.betavariate(2, 3)
+        opened = datetime.fromisoformat(event["created_at"])
+        closes = datetime.fromisoformat(event["event_date"])
+        elapsed = min(1.0, max(0.0, (self.now - opened) / (closes - opened)))
+        cap = min(event["capacity"], self.users)
+        return cap * fill * elapsed, cap
+
+    def _registrations_per_event(self) -> list[int]:
+        demand = [self._demand(i) for i in range(self.events)]
+        wanted = min(self.registrations, sum(cap for _, cap in demand))
+        # Scale demand to hit the requested total; events that would overflow stop at capacity
+        low, high = 0.0, 1.0
+        while sum(min(cap, d * high) for d, cap in demand) < wanted and high < 1e9:
+            high *= 2
+        for _ in range(50):
+            mid = (low + high) / 2
+            low, high = (mid, high) if sum(min(cap, d * mid) for d, cap in demand) < wanted else (low, mid)
+        counts = [int(min(cap, d * high)) for d, cap in demand]
+        # Hand out what rounding left over, most popular events first
+        short = wanted - sum(counts)
+        for i in sorted(range(self.events), key=lambda i: -demand[i][0]):
+            if short <= 0:
+                break
+            extra = min(short, demand[i][1] - counts[i])
+            counts[i] += extra
+            short -= extra
+        return counts
+
+    def _user_ids(self) -> list[str]:
+        # Built lazily in each worker process, not pickled along with the plan
+        if getattr(self, "_user_id_cache", None) is None:
+            self._user_id_cache = [_scale_id(self.seed, "user", i) for i in range(self.users)]
+        return self._user_id_cache
+
+    def event_registrations(self, i: int) -> list[dict]:
+        count = self.per_event[i]
+        if not count:
+            return []
+        event = self.event(i)
+        rng = _rng(self.seed, "registrations", i)
+        opened = datetime.fromisoformat(event["created_at"])
+        closes = min(datetime.fromisoformat(event["event_date"]), self.now)
+        window = max((closes - opened).total_seconds(), 1.0)
+        user_ids = self._user_ids()
+        rows = []
+        for n, user in enumerate(rng.sample(range(self.users), count)):
+            # Sign-ups bunch up right after the announcement and just before the event
+            registered_at = opened + timedelta(seconds=window * rng.betavariate(0.6, 0.6))
+            rows.append({
+                "id": _scale_id(self.seed, f"registration:{i}", n),
+                "user_id": user_ids[user],
+                "event_id": event["id"],
+                "registered_at": registered_at.isoformat(),
+            })
+        return rows
+
+COLUMNS = {
+    "users": ["id", "email", "full_name", "hashed_password", "is_admin", "is_active", "created_at"],
+    "events": ["id", "title", "description", "location", "event_date", "capacity", "is_active",
+               "created_by", "created_at", "updated_at"],
+    "registrations": ["id", "user_id", "event_id", "registered_at"],
+}
+
+class PostgresWriter:
+    """COPY each batch into a temp table, then INSERT ... ON CONFLICT DO NOTHING, one transaction per batch."""
+
+    def __init__(self, dsn: str):
+        import psycopg2
+        self.conn = psycopg2.connect(dsn)
+        self._staged: set[str] = set()
+
+    def write(self, table: str, rows: list[dict]) -> None:
+        columns = COLUMNS[table]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(["" if row[c] is None else row[c] for c in columns])
+        buffer.seek(0)
+        column_list = ", ".join(columns)
+        with self.conn, self.conn.cursor() as cur:
+            if table not in self._staged:
+                cur.execute(f"CREATE TEMP TABLE seed_{table} (LIKE public.{table} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS")
+                self._staged.add(table)
+            cur.copy_expert(f"COPY seed_{table} ({column_list}) FROM STDIN WITH (FORMAT csv)", buffer)
+            cur.execute(
+                f"INSERT INTO public.{table} ({column_list}) SELECT {column_list} FROM seed_{table} ON CONFLICT DO NOTHING"
+            )
+
+class PostgrestWriter:
+    """One bulk upsert request per batch; rows that already exist are skipped."""
+
+    def __init__(self, url: str, key: str):
+        self.client = create_client(url, key)
+
+    def write(self, table: str, rows: list[dict]) -> None:
+        self.client.table(table).upsert(rows, ignore_duplicates=True, returning=ReturnMethod.minimal).execute()
+
+_worker: dict = {}
+
+def _init_worker(plan: ScalePlan, target: str, target_args: tuple, password_hash: str) -> None:
+    _worker["plan"], _worker["hash"] = plan, password_hash
+    _worker["writer"] = PostgresWriter(*target_args) if target == "postgres" else PostgrestWriter(*target_args)
+
+def _load_batch(table: str, indexes: range | list[int]) -> int:
+    plan = _worker["plan"]
+    if table == "users":
+        rows = [{**plan.user(i), "hashed_password": _worker["hash"]} for i in indexes]
+    elif table == "events":
+        rows = [plan.event(i) for i in indexes]
+    else:
+        rows = [row for i in indexes for row in plan.event_registrations(i)]
+    if rows:
+        _worker["writer"].write(table, rows)
+    return len(rows)
+
+def _registration_batches(plan: ScalePlan, batch_size: int) -> list[list[int]]:
+    """Group whole events into batches of about batch_size registrations."""
+    batches, current, size = [], [], 0
+    for i, count in enumerate(plan.per_event):
+        if not count:
+            continue
+        current.append(i)
+        size += count
+        if size >= batch_size:
+            batches.append(current)
+            current, size = [], 0
+    if current:
+        batches.append(current)
+    return batches
+
+def seed_scale(args: argparse.Namespace) -> None:
+    print(f"[SCALE] Planning {args.users} users, {args.events} events, {args.registrations} registrations (seed={args.seed})...")
+    as_of = datetime.fromisoformat(args.as_of).replace(tzinfo=timezone.utc)
+    plan = ScalePlan(args.users, args.events, args.registrations, args.seed, as_of)
+    if args.target == "postgres":
+        dsn = args.database_url or settings.DATABASE_URL
+        if not dsn:
+            sys.exit("--target postgres needs --database-url or DATABASE_URL")
+        target_args: tuple = (dsn,)
+    else:
+        url, key = args.supabase_url or settings.SUPABASE_URL, args.supabase_key or settings.SUPABASE_KEY
+        if not url or not key:
+            sys.exit("--target postgrest needs --supabase-url/--supabase-key or SUPABASE_URL/SUPABASE_KEY")
+        target_args = (url, key)
+
+    step = args.batch_size
+    phases = [
+        ("users", [range(i, min(i + step, plan.users)) for i in range(0, plan.users, step)]),
+        ("events", [range(i, min(i + step, plan.events)) for i in range(0, plan.events, step)]),
+        # Registrations reference both, so they go last
+        ("registrations", _registration_batches(plan, step)),
+    ]
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        initializer=_init_worker,
+        initargs=(plan, args.target, target_args, hash_password_sync(SCALE_PASSWORD)),
+    ) as pool:
+        for table, batches in phases:
+            started, loaded = time.perf_counter(), 0
+            for n, count in enumerate(pool.map(_load_batch, [table] * len(batches), batches), 1):
+                loaded += count
+                if n % max(1, len(batches) // 10) == 0 or n == len(batches):
+                    print(f"  [{table}] {loaded} rows ({n}/{len(batches)} batches)")
+            elapsed = time.perf_counter() - started
+            print(f"[OK] {table}: {loaded} rows in {elapsed:.1f}s ({loaded / max(elapsed, 1e-9):.0f} rows/s)")
+
+    if args.target == "postgres":
+        import psycopg2
+        conn = psycopg2.connect(target_args[0])
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute("ANALYZE public.users, public.events, public.registrations")
+        conn.close()
+
+    print(f"\n[DONE] Scale seed complete. {plan.staff} staff (admin) accounts, e.g. {plan.user(0)['email']}; "
+          f"every generated account uses the password {SCALE_PASSWORD!r}")
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Seed EventSphere with demo data, or a large synthetic dataset with --scale")
+    parser.add_argument("--scale", action="store_true", help="generate a synthetic dataset instead of the demo events")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--registrations", type=int, default=2_000_000)
+    parser.add_argument("--seed", type=int, default=42, help="same seed, same dataset")
+    parser.add_argument("--as-of", default=datetime.now(timezone.utc).date().isoformat(),
+                        help="date (YYYY-MM-DD) the history runs up to; later events are upcoming (default: today)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per bulk insert")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--target", choices=["postgres", "postgrest"], default="postgres",
+                        help="postgres: COPY over DATABASE_URL; postgrest: bulk inserts through SUPABASE_URL "
+                             "(a Supabase project or python -m bench.fake_postgrest, which keeps everything in memory)")
+    parser.add_argument("--database-url", help="defaults to DATABASE_URL")
+    parser.add_argument("--supabase-url", help="defaults to SUPABASE_URL")
+    parser.add_argument("--supabase-key", help="defaults to SUPABASE_KEY")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    seed()
+    args = parse_args()
+    if args.scale:
+        seed_scale(args)
+    else:
+        seed()
@@ -33,3 +33,344 @@ CREATE TABLE public.registrations (
     registered_at TIMESTAMPTZ NOT NULL DEFAULT now(),
     UNIQUE(user_id, event_id)
 );
+
+-- Registrations are counted per event on every read and capacity check
+CREATE INDEX IF NOT EXISTS idx_registrations_event_id ON public.registrations(event_id);
+
+-- Atomic registration: the active/date/capacity/duplicate checks and the insert
+-- run in one transaction and one round trip (called via supabase.rpc).
+-- Locking the event row serializes concurrent registrations for the same event,
+-- so capacity cannot be oversold. Returns {"status": ...} with one of:
+-- ok, event_not_found, event_past, event_full, already_registered
+CREATE OR REPLACE FUNCTION public.register_for_event(p_user_id UUID, p_event_id UUID)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_event public.events%ROWTYPE;
+    v_count INTEGER;
+    v_registration public.registrations%ROWTYPE;
+BEGIN
+    SELECT * INTO v_event FROM public.events WHERE id = p_event_id FOR UPDATE;
+    IF NOT FOUND OR NOT v_event.is_active THEN
+        RETURN jsonb_build_object('status', 'event_not_found');
+    END IF;
+
+    IF v_event.event_date <= now() THEN
+        RETURN jsonb_build_object('status', 'event_past');
+    END IF;
+
+    SELECT count(*) INTO v_count FROM public.registrations WHERE event_id = p_event_id;
+    IF v_count >= v_event.capacity THEN
+        RETURN jsonb_build_object('status', 'event_full');
+    END IF;
+
+    IF EXISTS (SELECT 1 FROM public.registrations WHERE user_id = p_user_id AND event_id = p_event_id) THEN
+        RETURN jsonb_build_object('status', 'already_registered');
+    END IF;
+
+    INSERT INTO public.registrations (user_id, event_id)
+    VALUES (p_user_id, p_event_id)
+    RETURNING * INTO v_registration;
+
+    RETURN jsonb_build_object(
+        'status', 'ok',
+        'registration', to_jsonb(v_registration),
+        'registration_count', v_count + 1
+    );
+END;
+$$;
+
+-- Keyset pagination: active events seek on (event_date, id), admin users on (created_at, id)
+CREATE INDEX IF NOT EXISTS idx_events_active_date_id ON public.events(event_date, id) WHERE is_active;
+CREATE INDEX IF NOT EXISTS idx_users_created_at_id ON public.users(created_at DESC, id DESC);
+
+-- Full-text event search over title, location and description.
+-- A generated, weighted tsvector backs ranked matching; a trigram index on the
+-- title keeps substring matches (e.g. "thon" -> "ProtoThon") index-assisted.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE public.events ADD COLUMN IF NOT EXISTS search_vector TSVECTOR
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(location, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_events_search_vector ON public.events USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_events_title_trgm ON public.events USING GIN (title gin_trgm_ops);
+
+-- Every word of the query is matched as a prefix ("mach lear" -> 'mach':* & 'lear':*)
+-- so the same function serves typeahead. Results come back best match first;
+-- PostgREST applies select/embedding, filters, range and count on top.
+CREATE OR REPLACE FUNCTION public.search_events(p_query TEXT)
+RETURNS SETOF public.events
+LANGUAGE sql
+STABLE
+AS $$
+    WITH q AS (
+        SELECT to_tsquery('english', string_agg(word || ':*', ' & ')) AS query
+        FROM regexp_split_to_table(lower(p_query), '[^[:alnum:]]+') AS word
+        WHERE word <> ''
+    )
+    SELECT e.*
+    FROM public.events e, q
+    WHERE e.is_active
+      -- Substring fallback; LIKE wildcards in the query are matched literally
+      AND (e.search_vector @@ q.query
+           OR e.title ILIKE '%' || replace(replace(replace(p_query, '\', '\\'), '%', '\%'), '_', '\_') || '%')
+    ORDER BY ts_rank_cd(e.search_vector, q.query) + similarity(e.title, p_query) DESC,
+             e.event_date,
+             e.id
+$$;
+
+-- Streaming registration exports page through an event on (registered_at, id)
+CREATE INDEX IF NOT EXISTS idx_registrations_event_registered ON public.registrations(event_id, registered_at, id);
+
+-- Bulk registration for admin roster imports: one call registers a whole batch.
+-- The event row is locked once, then seats are handed out in input order until
+-- capacity runs out. Returns one row per distinct input user with status
+-- ok, already_registered, event_full, event_past or event_not_found.
+CREATE OR REPLACE FUNCTION public.register_users_bulk(p_event_id UUID, p_user_ids UUID[])
+RETURNS TABLE (user_id UUID, status TEXT, registration_id UUID)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+DECLARE
+    v_event public.events%ROWTYPE;
+    v_count INTEGER;
+BEGIN
+    SELECT * INTO v_event FROM public.events e WHERE e.id = p_event_id FOR UPDATE;
+    IF NOT FOUND OR NOT v_event.is_active OR v_event.event_date <= now() THEN
+        RETURN QUERY
+        SELECT t.uid,
+               CASE WHEN v_event.id IS NULL OR NOT v_event.is_active THEN 'event_not_found' ELSE 'event_past' END,
+               NULL::UUID
+        FROM unnest(p_user_ids) WITH ORDINALITY AS t(uid, ord)
+        ORDER BY t.ord;
+        RETURN;
+    END IF;
+
+    SELECT count(*) INTO v_count FROM public.registrations r WHERE r.event_id = p_event_id;
+
+    RETURN QUERY
+    WITH input AS (
+        SELECT DISTINCT ON (t.uid) t.uid, t.ord
+        FROM unnest(p_user_ids) WITH ORDINALITY AS t(uid, ord)
+        ORDER BY t.uid, t.ord
+    ), classified AS (
+        SELECT i.uid, i.ord, r.id AS existing_id
+        FROM input i
+        LEFT JOIN public.registrations r ON r.event_id = p_event_id AND r.user_id = i.uid
+    ), candidates AS (
+        SELECT c.uid, c.ord, row_number() OVER (ORDER BY c.ord) AS seat
+        FROM classified c
+        WHERE c.existing_id IS NULL
+    ), inserted AS (
+        INSERT INTO public.registrations (user_id, event_id)
+        SELECT c.uid, p_event_id
+        FROM candidates c
+        WHERE c.seat <= v_event.capacity - v_count
+        ORDER BY c.ord
+        RETURNING registrations.user_id AS uid, registrations.id AS rid
+    )
+    SELECT c.uid,
+           CASE WHEN c.existing_id IS NOT NULL THEN 'already_registered'
+                WHEN ins.rid IS NOT NULL THEN 'ok'
+                ELSE 'event_full' END,
+           COALESCE(ins.rid, c.existing_id)
+    FROM classified c
+    LEFT JOIN inserted ins ON ins.uid = c.uid
+    ORDER BY c.ord;
+END;
+$$;
+
+-- Keep updated_at current on every write. On events it versions the ETags of
+-- the public event endpoints
+CREATE OR REPLACE FUNCTION public.set_updated_at()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.updated_at = now();
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS events_set_updated_at ON public.events;
+CREATE TRIGGER events_set_updated_at
+    BEFORE UPDATE ON public.events
+    FOR EACH ROW EXECUTE FUNCTION public.set_updated_at();
+
+-- users.updated_at records when an account last changed (admin or active
+-- status, name, password). Signed token claims issued before it are not
+-- trusted, also after a restart (see load_user_changes in auth_service.py).
+ALTER TABLE public.users ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
+CREATE INDEX IF NOT EXISTS idx_users_updated_at ON public.users(updated_at);
+
+DROP TRIGGER IF EXISTS users_set_updated_at ON public.users;
+CREATE TRIGGER users_set_updated_at
+    BEFORE UPDATE ON public.users
+    FOR EACH ROW EXECUTE FUNCTION public.set_updated_at();
+
+-- Admin analytics. Registrations are rolled up per (event, UTC hour) and per
+-- event by statement-level triggers, so dashboards aggregate a few small
+-- tables instead of scanning registrations. A bulk insert from
+-- register_users_bulk touches each rollup row once per statement.
+CREATE TABLE IF NOT EXISTS public.registration_stats_hourly (
+    event_id UUID NOT NULL REFERENCES public.events(id),
+    hour TIMESTAMPTZ NOT NULL,
+    registrations INTEGER NOT NULL,
+    PRIMARY KEY (event_id, hour)
+);
+CREATE INDEX IF NOT EXISTS idx_registration_stats_hourly_hour ON public.registration_stats_hourly(hour);
+
+CREATE TABLE IF NOT EXISTS public.event_registration_totals (
+    event_id UUID PRIMARY KEY REFERENCES public.events(id),
+    registrations INTEGER NOT NULL
+);
+
+CREATE OR REPLACE FUNCTION public.rollup_registrations()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO public.registration_stats_hourly AS s (event_id, hour, registrations)
+        SELECT n.event_id, date_trunc('hour', n.registered_at, 'UTC'), count(*)
+        FROM new_rows n
+        GROUP BY 1, 2
+        ON CONFLICT (event_id, hour) DO UPDATE SET registrations = s.registrations + EXCLUDED.registrations;
+
+        INSERT INTO public.event_registration_totals AS t (event_id, registrations)
+        SELECT n.event_id, count(*)
+        FROM new_rows n
+        GROUP BY 1
+        ON CONFLICT (event_id) DO UPDATE SET registrations = t.registrations + EXCLUDED.registrations;
+    ELSE
+        UPDATE public.registration_stats_hourly s
+        SET registrations = s.registrations - o.n
+        FROM (
+            SELECT event_id, date_trunc('hour', registered_at, 'UTC') AS hour, count(*) AS n
+            FROM old_rows
+            GROUP BY 1, 2
+        ) o
+        WHERE s.event_id = o.event_id AND s.hour = o.hour;
+
+        UPDATE public.event_registration_totals t
+        SET registrations = t.registrations - o.n
+        FROM (SELECT event_id, count(*) AS n FROM old_rows GROUP BY 1) o
+        WHERE t.event_id = o.event_id;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS registrations_rollup_insert ON public.registrations;
+CREATE TRIGGER registrations_rollup_insert
+    AFTER INSERT ON public.registrations
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.rollup_registrations();
+
+DROP TRIGGER IF EXISTS registrations_rollup_delete ON public.registrations;
+CREATE TRIGGER registrations_rollup_delete
+    AFTER DELETE ON public.registrations
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.rollup_registrations();
+
+-- Recomputes both rollups from scratch: backfills them on first run and
+-- repairs drift after writes the triggers cannot see (e.g. TRUNCATE)
+CREATE OR REPLACE FUNCTION public.rebuild_registration_rollups()
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    TRUNCATE public.registration_stats_hourly, public.event_registration_totals;
+    INSERT INTO public.registration_stats_hourly (event_id, hour, registrations)
+    SELECT event_id, date_trunc('hour', registered_at, 'UTC'), count(*)
+    FROM public.registrations
+    GROUP BY 1, 2;
+    INSERT INTO public.event_registration_totals (event_id, registrations)
+    SELECT event_id, count(*)
+    FROM public.registrations
+    GROUP BY 1;
+$$;
+
+SELECT public.rebuild_registration_rollups();
+
+CREATE OR REPLACE VIEW public.event_fill_stats AS
+SELECT e.id AS event_id,
+       e.title,
+       e.event_date,
+       e.capacity,
+       e.is_active,
+       COALESCE(t.registrations, 0) AS registration_count,
+       round(COALESCE(t.registrations, 0)::NUMERIC / NULLIF(e.capacity, 0), 4) AS fill_ratio
+FROM public.events e
+LEFT JOIN public.event_registration_totals t ON t.event_id = e.id;
+
+-- Registrations per hour or day between p_from and p_to (zero-filled), for
+-- one event or all. Day buckets follow p_timezone; hourly rollup rows are
+-- assigned to the day their UTC hour starts in.
+CREATE OR REPLACE FUNCTION public.registration_trend(
+    p_bucket TEXT,
+    p_from TIMESTAMPTZ,
+    p_to TIMESTAMPTZ,
+    p_event_id UUID DEFAULT NULL,
+    p_timezone TEXT DEFAULT 'UTC'
+)
+RETURNS TABLE (bucket TIMESTAMPTZ, registrations BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH counts AS (
+        SELECT date_trunc(p_bucket, s.hour, p_timezone) AS bucket, sum(s.registrations) AS registrations
+        FROM public.registration_stats_hourly s
+        WHERE s.hour >= date_trunc(p_bucket, p_from, p_timezone)
+          AND s.hour <= p_to
+          AND (p_event_id IS NULL OR s.event_id = p_event_id)
+        GROUP BY 1
+    ),
+    buckets AS (
+        -- Hours step in absolute time, so a local hour repeated by a DST change
+        -- keeps its own bucket
+        SELECT b AS bucket
+        FROM generate_series(date_trunc('hour', p_from, p_timezone), p_to, INTERVAL '1 hour') AS b
+        WHERE p_bucket = 'hour'
+        UNION ALL
+        -- Days step in local time (23 or 25 hours across a DST change) and are
+        -- converted back to the instant each local day starts
+        SELECT b AT TIME ZONE p_timezone
+        FROM generate_series(
+            date_trunc(p_bucket, p_from AT TIME ZONE p_timezone),
+            p_to AT TIME ZONE p_timezone,
+            ('1 ' || p_bucket)::INTERVAL
+        ) AS b
+        WHERE p_bucket <> 'hour'
+    )
+    SELECT b.bucket, COALESCE(c.registrations, 0)::BIGINT
+    FROM buckets b
+    LEFT JOIN counts c ON c.bucket = b.bucket
+    ORDER BY b.bucket
+$$;
+
+CREATE OR REPLACE FUNCTION public.analytics_summary()
+RETURNS TABLE (
+    active_events BIGINT,
+    upcoming_events BIGINT,
+    total_capacity BIGINT,
+    total_registrations BIGINT,
+    full_events BIGINT,
+    average_fill_ratio NUMERIC
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT count(*),
+           count(*) FILTER (WHERE event_date > now()),
+           COALESCE(sum(capacity), 0),
+           COALESCE(sum(registration_count), 0),
+           count(*) FILTER (WHERE registration_count >= capacity),
+           round(avg(fill_ratio), 4)
+    FROM public.event_fill_stats
+    WHERE is_active
+$$;
@@ -0,0 +1,53 @@
+import os
+import socket
+import threading
+import time
+import pytest
+import uvicorn
+from bench.fake_postgrest import FakePostgrest, seed_dataset
+
+# The API runs in process against the in-memory PostgREST stand-in from the
+# benchmark suite. Settings are read when app.config is first imported, so the
+# environment has to be in place before any test module imports the app.
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+FAKE_PORT = _free_port()
+os.environ.update(
+    SUPABASE_URL=f"http://127.0.0.1:{FAKE_PORT}",
+    SUPABASE_KEY="test-key",
+    SECRET_KEY="test-secret",
+    ALLOWED_ORIGINS="*",
+    APP_ENV="test",
+)
+
+@pytest.fixture(scope="session")
+def fake_postgrest():
+    fake = FakePostgrest()
+    server = uvicorn.Server(uvicorn.Config(fake.app, host="127.0.0.1", port=FAKE_PORT, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    yield fake
+    server.should_exit = True
+    thread.join()
+
+@pytest.fixture(scope="session")
+def dataset(fake_postgrest):
+    return seed_dataset(fake_postgrest.db, users=50, events=30, registrations=200, seed=7)
+
+@pytest.fixture(scope="session")
+def client(dataset):
+    from fastapi.testclient import TestClient
+    from app.main import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+@pytest.fixture(scope="session")
+def admin_headers(dataset):
+    from app.services.auth_service import create_access_token
+    return {"Authorization": "Bearer " + create_access_token({"sub": dataset["admin_email"]})}
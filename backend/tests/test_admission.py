@@ -0,0 +1,60 @@
+import asyncio
+import pytest
+from app.config import settings
+from app.middleware.admission import AdmissionControlMiddleware, exempt_pattern
+
+@pytest.mark.parametrize("template, path, matches", [
+    ("/health", "/health", True),
+    ("/health", "/health/", True),
+    ("/health", "/healthz", False),
+    ("/api/registrations/tickets/{ticket_id}", "/api/registrations/tickets/3f0c", True),
+    ("/api/registrations/tickets/{ticket_id}", "/api/registrations/tickets", False),
+    ("/api/registrations/tickets/{ticket_id}", "/api/registrations/tickets/3f0c/extra", False),
+])
+def test_exempt_patterns(template, path, matches):
+    assert bool(exempt_pattern(template).fullmatch(path.rstrip("/") or "/")) is matches
+
+@pytest.fixture
+def one_slot(monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_MAX_IN_FLIGHT", 1)
+    monkeypatch.setattr(settings, "ADMISSION_MAX_WAITING", 0)
+    monkeypatch.setattr(settings, "ADMISSION_ROUTE_LIMITS", {})
+    monkeypatch.setattr(settings, "ADMISSION_RATE_LIMITS", {})
+
+def scenario(held_path: str):
+    """Hold one request open on `held_path`, then issue a read; returns the read's status."""
+    release = asyncio.Event()
+
+    async def app(scope, receive, send):
+        if scope["path"] == held_path:
+            await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    middleware = AdmissionControlMiddleware(app)
+
+    async def request(path: str) -> int:
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "method": "GET", "path": path, "headers": [], "client": ("127.0.0.1", 1)}
+        await middleware(scope, lambda: None, send)
+        return sent[0]["status"]
+
+    async def run() -> int:
+        held = asyncio.create_task(request(held_path))
+        await asyncio.sleep(0.01)
+        status = await request("/api/events/")
+        release.set()
+        assert await held == 200
+        return status
+
+    return run
+
+def test_long_polls_do_not_hold_read_slots(client, one_slot):
+    assert client.portal.call(scenario("/api/registrations/tickets/5b1f8e2a-0000-4000-8000-000000000000")) == 200
+
+def test_held_reads_do_hold_slots(client, one_slot):
+    assert client.portal.call(scenario("/api/events/00000000-0000-4000-8000-000000000000")) == 503
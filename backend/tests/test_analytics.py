@@ -0,0 +1,24 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from app.repositories import repository
+
+def test_timezone_query_parameter(client, admin_headers):
+    response = client.get("/api/admin/analytics", params={"timezone": "Asia/Kolkata", "days": 3}, headers=admin_headers)
+    assert response.status_code == 200
+    registrations = response.json()["registrations"]
+    assert registrations["timezone"] == "Asia/Kolkata"
+    for point in registrations["series"]:
+        local = datetime.fromisoformat(point["bucket"]).astimezone(ZoneInfo("Asia/Kolkata"))
+        assert (local.hour, local.minute) == (0, 0)
+
+def test_unknown_timezone_is_rejected(client, admin_headers):
+    response = client.get("/api/admin/analytics", params={"timezone": "Mars/Olympus"}, headers=admin_headers)
+    assert response.status_code == 422
+
+def test_day_buckets_follow_local_midnight_across_dst(client):
+    zone = ZoneInfo("America/New_York")
+    series = client.portal.call(
+        repository.registration_trend, "day", "2026-10-30T12:00:00+00:00", "2026-11-03T12:00:00+00:00", None, "America/New_York",
+    )
+    days = [datetime.fromisoformat(point["bucket"]).astimezone(zone) for point in series]
+    assert [(d.month, d.day, d.hour) for d in days] == [(10, 30, 0), (10, 31, 0), (11, 1, 0), (11, 2, 0), (11, 3, 0)]
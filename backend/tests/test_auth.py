@@ -0,0 +1,87 @@
+import pytest
+from app.config import settings
+from app.main import check_worker_settings
+from app.services import auth_service
+
+def login(client, email: str, password: str) -> dict:
+    response = client.post("/api/auth/login", data={"username": email, "password": password})
+    assert response.status_code == 200
+    return {"Authorization": "Bearer " + response.json()["access_token"]}
+
+@pytest.fixture
+def trusted_claims(monkeypatch):
+    monkeypatch.setattr(settings, "TRUST_TOKEN_CLAIMS", True)
+    monkeypatch.setattr(auth_service, "_user_changes_loaded", True)
+
+def restart(monkeypatch):
+    """What a fresh worker knows: nothing in process, only what load_user_changes reads back."""
+    monkeypatch.setattr(auth_service, "_user_changed_at", {})
+    monkeypatch.setattr(auth_service, "_user_changes_loaded", False)
+    auth_service._user_cache.clear()
+    auth_service._token_cache.clear()
+
+def test_claims_are_not_trusted_before_changes_load(client, dataset, monkeypatch, trusted_claims):
+    headers = login(client, dataset["admin_email"], dataset["admin_password"])
+    monkeypatch.setattr(auth_service, "_user_changes_loaded", False)
+    payload = auth_service.decode_token(headers["Authorization"].split()[1])
+    assert auth_service.user_from_claims(payload) is None
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+
+def test_deactivation_survives_restart(client, fake_postgrest, admin_headers, monkeypatch, trusted_claims):
+    student = fake_postgrest.db.insert("users", {
+        "email": "deactivate.me@bench.example.com", "full_name": "Deactivate Me",
+        "hashed_password": "correct horse",
+    })
+    headers = login(client, student["email"], "correct horse")
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+
+    response = client.patch(f"/api/admin/users/{student['id']}/toggle-active", headers=admin_headers)
+    assert response.status_code == 200 and response.json()["is_active"] is False
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
+
+    restart(monkeypatch)
+    client.portal.call(auth_service.load_user_changes)
+    payload = auth_service.decode_token(headers["Authorization"].split()[1])
+    assert auth_service.user_from_claims(payload) is None
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
+
+def test_cannot_deactivate_yourself(client, dataset, admin_headers):
+    me = client.get("/api/auth/me", headers=admin_headers).json()
+    response = client.patch(f"/api/admin/users/{me['id']}/toggle-active", headers=admin_headers)
+    assert response.status_code == 400
+
+def test_inactive_user_cannot_log_in(client, fake_postgrest):
+    fake_postgrest.db.insert("users", {
+        "email": "inactive.login@bench.example.com", "full_name": "Inactive Login",
+        "hashed_password": "correct horse", "is_active": False,
+    })
+    response = client.post("/api/auth/login", data={"username": "inactive.login@bench.example.com", "password": "correct horse"})
+    assert response.status_code == 403
+    assert "access_token" not in response.json()
+
+def test_trusted_claims_need_a_bus_with_several_workers(monkeypatch):
+    monkeypatch.setattr(settings, "TRUST_TOKEN_CLAIMS", True)
+    monkeypatch.setattr(settings, "INVALIDATION_BUS", "none")
+    check_worker_settings()
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 4)
+    with pytest.raises(RuntimeError, match="INVALIDATION_BUS"):
+        check_worker_settings()
+    monkeypatch.setattr(settings, "INVALIDATION_BUS", "unix")
+    check_worker_settings()
+
+def test_guest_login_costs_a_full_hash_check(client, fake_postgrest, monkeypatch):
+    fake_postgrest.db.insert("users", {
+        "email": "guest.login@bench.example.com", "full_name": "Guest Login",
+        "hashed_password": auth_service.GUEST_PASSWORD,
+    })
+    in_hash_pool, checked = auth_service._in_hash_pool, []
+
+    async def recording(fn, *args):
+        checked.append((fn, args[-1]))
+        return await in_hash_pool(fn, *args)
+
+    monkeypatch.setattr(auth_service, "_in_hash_pool", recording)
+    response = client.post("/api/auth/login", data={"username": "guest.login@bench.example.com", "password": "guest_no_login"})
+    assert response.status_code == 401
+    # Same work as an unknown email: bcrypt against the dummy hash
+    assert (auth_service._verify_sync, auth_service._dummy_hash) in checked
@@ -0,0 +1,97 @@
+import gzip
+import re
+from pathlib import Path
+import pytest
+import zstandard
+from app.config import settings
+from app.middleware.compression import parse_accept_encoding
+
+NGINX_CONF = Path(__file__).resolve().parents[2] / "nginx" / "nginx.conf"
+
+def nginx_cache_encoding(accept_encoding: str) -> str:
+    """Evaluate the $cache_encoding map from nginx.conf: first matching regex wins."""
+    block = re.search(r"map \$http_accept_encoding \$cache_encoding \{(.*?)\n\}", NGINX_CONF.read_text(), re.S).group(1)
+    for pattern, value in re.findall(r'"~\*(.+?)"\s+(\w+);', block):
+        if re.search(pattern, accept_encoding, re.I):
+            return value
+    return ""
+
+def fetch(client, path, accept_encoding, **kwargs):
+    headers = {"Accept-Encoding": accept_encoding, **kwargs.pop("headers", {})}
+    with client.stream("GET", path, headers=headers, **kwargs) as response:
+        return response, b"".join(response.iter_raw())
+
+@pytest.mark.skipif(not NGINX_CONF.exists(), reason="nginx config not in this checkout")
+@pytest.mark.parametrize("accept_encoding", [
+    "gzip, deflate, br, zstd", "gzip, deflate", "br;q=1, gzip;q=0.5", "zstd;q=0, gzip",
+    "zstd;q=0.000, br;q=0, gzip;q=0.001", "x-zstd, gzip", "identity", "", "*",
+])
+def test_nginx_forwards_the_coding_it_keys_on(client, accept_encoding):
+    coding = nginx_cache_encoding(accept_encoding)
+    if coding:
+        assert parse_accept_encoding(accept_encoding).get(coding, 0) > 0
+    # Upstream sees only the coding in the key, so the cached body is in that coding
+    response, _ = fetch(client, "/api/events/", coding, params={"size": 50})
+    assert response.headers.get("content-encoding", "") == coding
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("gzip, zstd", "zstd"),
+    ("gzip;q=1, zstd;q=0.5", "gzip"),
+    ("zstd;q=0, gzip", "gzip"),
+    ("*", "zstd"),
+    ("identity", None),
+])
+def test_negotiates_by_q_value(client, accept_encoding, expected):
+    response, _ = fetch(client, "/api/events/", accept_encoding, params={"size": 50})
+    assert response.headers.get("content-encoding") == expected
+    # Identity responses vary too, or a shared cache could hand them to every client
+    assert "Accept-Encoding" in response.headers["vary"]
+
+def test_compressed_body_round_trips(client):
+    plain = client.get("/api/events/", params={"size": 50}, headers={"Accept-Encoding": "identity"}).content
+    _, zstd_body = fetch(client, "/api/events/", "zstd", params={"size": 50})
+    _, gzip_body = fetch(client, "/api/events/", "gzip", params={"size": 50})
+    assert zstandard.ZstdDecompressor().decompress(zstd_body) == plain
+    assert gzip.decompress(gzip_body) == plain
+
+def test_small_bodies_are_not_compressed(client):
+    response, _ = fetch(client, "/health", "gzip")
+    assert "content-encoding" not in response.headers
+
+def test_compressed_responses_revalidate_with_a_weak_etag(client):
+    identity, _ = fetch(client, "/api/events/", "identity", params={"size": 50})
+    compressed, _ = fetch(client, "/api/events/", "gzip", params={"size": 50})
+    assert not identity.headers["etag"].startswith("W/")
+    assert compressed.headers["etag"] == "W/" + identity.headers["etag"]
+
+    revalidated, body = fetch(
+        client, "/api/events/", "gzip", params={"size": 50}, headers={"If-None-Match": compressed.headers["etag"]},
+    )
+    assert revalidated.status_code == 304 and body == b""
+    assert revalidated.headers["etag"] == compressed.headers["etag"]
+    assert "Accept-Encoding" in revalidated.headers["vary"]
+
+def test_uncompressed_small_bodies_revalidate_with_the_same_etag(client, monkeypatch):
+    monkeypatch.setattr(settings, "COMPRESSION_MIN_SIZE", 10_000_000)
+    small, _ = fetch(client, "/api/events/", "gzip", params={"size": 50})
+    assert "content-encoding" not in small.headers
+    revalidated, _ = fetch(
+        client, "/api/events/", "gzip", params={"size": 50}, headers={"If-None-Match": small.headers["etag"]},
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == small.headers["etag"]
+
+def test_identity_responses_keep_a_strong_etag(client):
+    identity, _ = fetch(client, "/api/events/", "identity", params={"size": 50})
+    revalidated, _ = fetch(
+        client, "/api/events/", "identity", params={"size": 50}, headers={"If-None-Match": identity.headers["etag"]},
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == identity.headers["etag"]
+
+def test_large_error_responses_vary_too(client):
+    # The validation error echoes the oversized input back
+    response, body = fetch(client, "/api/events/", "gzip", params={"size": "x" * 2000})
+    assert response.status_code == 422
+    assert response.headers["content-encoding"] == "gzip" and len(gzip.decompress(body)) >= settings.COMPRESSION_MIN_SIZE
+    assert "Accept-Encoding" in response.headers["vary"]
@@ -0,0 +1,88 @@
+import io
+import threading
+import pytest
+from app.config import settings
+from app.services import import_service
+
+class TrackingFile(io.BytesIO):
+    """An upload that remembers which threads read it."""
+
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.threads = set()
+
+    def read(self, *args):
+        self.threads.add(threading.current_thread())
+        return super().read(*args)
+
+    def read1(self, *args):
+        self.threads.add(threading.current_thread())
+        return super().read1(*args)
+
+    def readline(self, *args):
+        self.threads.add(threading.current_thread())
+        return super().readline(*args)
+
+@pytest.fixture
+def event_id(fake_postgrest, dataset):
+    event = fake_postgrest.db.insert("events", {
+        "title": "Roster Import", "event_date": "2030-01-01T10:00:00+00:00", "capacity": 100,
+        "created_by": None,
+    })
+    return event["id"]
+
+def roster(count: int, offset: int = 0) -> bytes:
+    lines = ["name,email"] + [f"Guest {i},import.guest{i}@example.com" for i in range(offset, offset + count)]
+    return "\n".join(lines).encode()
+
+def test_import_registers_roster(client, admin_headers, event_id):
+    response = client.post(
+        f"/api/admin/events/{event_id}/registrations/import",
+        files={"file": ("roster.csv", roster(3) + b"\nNo Email,\n", "text/csv")},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["summary"] == {"registered": 3, "invalid": 1}
+    assert client.get(f"/api/events/{event_id}").json()["registration_count"] == 3
+
+def test_unreadable_row_keeps_the_report(client, admin_headers, event_id, monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_BATCH_SIZE", 2)
+    upload = roster(3, offset=300) + b"\nBad \xff Bytes,import.bad@example.com\nGuest 399,import.guest399@example.com\n"
+    response = client.post(
+        f"/api/admin/events/{event_id}/registrations/import",
+        files={"file": ("roster.csv", upload, "text/csv")},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert report["summary"] == {"registered": 3, "invalid": 1}
+    assert report["results"][3]["row"] == 4 and report["results"][3]["detail"].startswith("Could not parse roster")
+    assert client.get(f"/api/events/{event_id}").json()["registration_count"] == 3
+
+def test_roster_is_read_off_the_event_loop(client, event_id):
+    upload = TrackingFile(roster(5, offset=100))
+    rows = import_service.parse_roster(upload, "csv")
+    summary = client.portal.call(import_service.import_registrations, event_id, rows)
+    assert summary["summary"] == {"registered": 5}
+    assert upload.threads and threading.main_thread() not in upload.threads
+    assert client.portal.call(threading.current_thread) not in upload.threads
+
+def test_failed_batch_still_invalidates(client, event_id, monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_BATCH_SIZE", 2)
+    invalidated = []
+    monkeypatch.setattr(import_service, "invalidate_event", invalidated.append)
+    real_register = import_service.repository.register_users_bulk
+    calls = 0
+
+    async def fail_second_batch(*args):
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            raise RuntimeError("connection reset")
+        return await real_register(*args)
+
+    monkeypatch.setattr(import_service.repository, "register_users_bulk", fail_second_batch)
+    rows = import_service.parse_roster(io.BytesIO(roster(4, offset=200)), "csv")
+    with pytest.raises(RuntimeError):
+        client.portal.call(import_service.import_registrations, event_id, rows)
+    assert invalidated == [event_id]
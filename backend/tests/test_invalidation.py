@@ -0,0 +1,51 @@
+import asyncio
+import socket
+import uuid
+import pytest
+from app.config import settings
+from app.services.invalidation import InvalidationBus
+
+def test_unknown_bus_is_rejected(client):
+    bus = InvalidationBus()
+    with pytest.raises(RuntimeError, match="Unknown INVALIDATION_BUS: redis"):
+        client.portal.call(bus.start, "redis")
+
+def test_none_runs_without_a_backend(client):
+    bus = InvalidationBus()
+    client.portal.call(bus.start, "none")
+    # Publishing is a no-op rather than an error
+    bus.publish("event", "x")
+    client.portal.call(bus.stop)
+
+def test_unix_bus_reaches_other_workers(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "INVALIDATION_SOCKET_DIR", str(tmp_path))
+    # Left behind by a worker that died without unlinking its socket
+    stale = tmp_path / "1-deadbeef.sock"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as dead:
+        dead.bind(str(stale))
+    sender, receiver = InvalidationBus(worker_id=uuid.uuid4().hex), InvalidationBus(worker_id=uuid.uuid4().hex)
+    sent, received, messages = [], [], []
+    for bus, seen in ((sender, sent), (receiver, received)):
+        bus.subscribe("event", lambda *key, seen=seen: seen.append(("event", *key)))
+        bus.subscribe("user", lambda *key, seen=seen: seen.append(("user", *key)))
+    deliver = receiver._deliver
+    receiver._deliver = lambda message: (messages.append(message), deliver(message))
+
+    async def scenario():
+        await sender.start("unix")
+        await receiver.start("unix")
+        try:
+            sender.publish("event", "e1")
+            sender.publish("event", "e2")
+            sender.publish("user", "u1")
+            await asyncio.sleep(0.05)
+        finally:
+            await sender.stop()
+            await receiver.stop()
+
+    client.portal.call(scenario)
+    assert sorted(received) == [("event", "e1"), ("event", "e2"), ("user", "u1")]
+    # One message per kind for everything published in the same tick
+    assert sorted(m["kind"] for m in messages) == ["event", "user"]
+    assert sent == []
+    assert not stale.exists()
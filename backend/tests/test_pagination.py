@@ -0,0 +1,108 @@
+import asyncio
+import base64
+import json
+import uuid
+import pytest
+from fastapi import HTTPException
+from app.config import settings
+from app.repositories.supabase_repository import keyset_filter
+from app.services import event_service, registration_service
+from app.services.pagination import decode_cursor, encode_cursor
+
+EVENT_ID = "0b7f3c1e-5d2a-4c8e-9f10-2a3b4c5d6e7f"
+
+def raw_cursor(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+def test_round_trip_is_canonical():
+    cursor = encode_cursor("2026-03-01T09:30:00Z", EVENT_ID.upper())
+    assert decode_cursor(cursor) == ["2026-03-01T09:30:00+00:00", EVENT_ID]
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    raw_cursor({"event_date": "2026-03-01T09:30:00+00:00"}),
+    raw_cursor(["2026-03-01T09:30:00+00:00"]),
+    raw_cursor(["not-a-date", "x"]),
+    raw_cursor(["2026-03-01T09:30:00", EVENT_ID]),
+    raw_cursor(["2026-03-01T09:30:00+00:00", "x"]),
+    raw_cursor(["2026-03-01T09:30:00+00:00", f"{EVENT_ID}),id.gt.0"]),
+])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor)
+    assert exc.value.status_code == 400
+
+def test_keyset_filter_quotes_values():
+    expression = keyset_filter(("created_at", "id"), ['a",is_admin.eq.true', "b\\"], descending=True)
+    assert expression == (
+        'created_at.lt."a\\",is_admin.eq.true",'
+        'and(created_at.eq."a\\",is_admin.eq.true",id.lt."b\\\\")'
+    )
+
+@pytest.mark.parametrize("snapshot", [True, False])
+@pytest.mark.parametrize("values", [["not-a-date", "x"], ["2026-03-01T09:30:00", EVENT_ID]])
+def test_events_reject_bad_cursor(client, monkeypatch, snapshot, values):
+    monkeypatch.setattr(settings, "EVENT_SNAPSHOT_ENABLED", snapshot)
+    response = client.get("/api/events/", params={"cursor": raw_cursor(values)})
+    assert response.status_code == 400
+
+@pytest.mark.parametrize("snapshot", [True, False])
+def test_events_cursor_pages_follow_on(client, monkeypatch, snapshot):
+    monkeypatch.setattr(settings, "EVENT_SNAPSHOT_ENABLED", snapshot)
+    first = client.get("/api/events/", params={"size": 5}).json()
+    second = client.get("/api/events/", params={"size": 5, "cursor": first["next_cursor"]}).json()
+    by_offset = client.get("/api/events/", params={"size": 10}).json()
+    assert [e["id"] for e in first["items"] + second["items"]] == [e["id"] for e in by_offset["items"]]
+
+def test_admin_users_reject_bad_cursor(client, admin_headers):
+    response = client.get("/api/admin/users", params={"cursor": raw_cursor(["yesterday", "x"])}, headers=admin_headers)
+    assert response.status_code == 400
+
+def test_total_is_the_same_on_every_page_and_path(client, monkeypatch):
+    # Other tests insert rows behind the snapshot's back
+    client.portal.call(event_service.refresh_event_snapshot)
+    totals = []
+    for snapshot in (True, False):
+        monkeypatch.setattr(settings, "EVENT_SNAPSHOT_ENABLED", snapshot)
+        first = client.get("/api/events/", params={"size": 5, "count": "exact"}).json()
+        second = client.get("/api/events/", params={"size": 5, "count": "exact", "cursor": first["next_cursor"]}).json()
+        totals += [first["total"], second["total"]]
+    assert len(set(totals)) == 1 and totals[0] >= 10
+
+@pytest.mark.parametrize("query", ["the", "workshops", "data science", "hack"])
+def test_search_is_the_same_with_and_without_snapshot(client, monkeypatch, query):
+    client.portal.call(event_service.refresh_event_snapshot)
+    responses = []
+    for snapshot in (True, False):
+        monkeypatch.setattr(settings, "EVENT_SNAPSHOT_ENABLED", snapshot)
+        responses.append(client.get("/api/events/", params={"search": query, "size": 50}).json())
+    assert responses[0]["total"] == responses[1]["total"]
+    assert [e["id"] for e in responses[0]["items"]] == [e["id"] for e in responses[1]["items"]]
+
+def test_registration_during_a_reload_survives_it(client, fake_postgrest, monkeypatch):
+    event = fake_postgrest.db.insert("events", {
+        "title": "Reloading", "event_date": "2030-04-01T10:00:00+00:00", "capacity": 50, "created_by": None,
+    })
+    client.portal.call(event_service.refresh_event_snapshot)
+    repository = event_service.repository
+    real_list_events = repository.list_events
+    gate = asyncio.Event()
+
+    async def slow_list_events(*args, **kwargs):
+        rows = await real_list_events(*args, **kwargs)
+        await gate.wait()
+        return rows
+
+    monkeypatch.setattr(repository, "list_events", slow_list_events)
+
+    async def scenario():
+        # The reload reads a count of 0, then stalls while the registration lands
+        reload = asyncio.create_task(event_service.refresh_event_snapshot())
+        await asyncio.sleep(0.05)
+        await registration_service.register_user(uuid.uuid4(), event["id"])
+        gate.set()
+        await reload
+        return await event_service.get_events_by_ids([event["id"]])
+
+    [found] = client.portal.call(scenario)
+    assert found["registration_count"] == 1
@@ -0,0 +1,36 @@
+import asyncio
+import pytest
+from app.config import settings
+from app.main import check_worker_settings
+from app.services.registration_queue import RegistrationQueue
+
+def test_ticket_ttl_starts_when_resolved(client, fake_postgrest, dataset):
+    event = fake_postgrest.db.insert("events", {
+        "title": "Queued Intake", "event_date": "2030-03-01T10:00:00+00:00", "capacity": 10, "created_by": None,
+    })
+    queue = RegistrationQueue(max_size=10, batch_size=10, ticket_ttl=0.2)
+
+    async def scenario():
+        ticket = queue.submit(event["id"], email="queued.guest@example.com", name="Queued Guest")
+        # Queued for longer than the TTL: still pollable
+        await asyncio.sleep(0.3)
+        assert queue.get(ticket.id) is ticket
+        queue.start()
+        try:
+            await queue.wait(ticket, 5)
+            await asyncio.sleep(0.05)
+            assert ticket.status == "registered"
+            assert queue.get(ticket.id) is ticket
+            await asyncio.sleep(0.3)
+            return queue.get(ticket.id)
+        finally:
+            await queue.stop()
+
+    assert client.portal.call(scenario) is None
+
+def test_queue_refuses_several_workers(monkeypatch):
+    monkeypatch.setattr(settings, "REGISTRATION_QUEUE_ENABLED", True)
+    check_worker_settings()
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 2)
+    with pytest.raises(RuntimeError, match="single worker"):
+        check_worker_settings()
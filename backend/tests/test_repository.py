@@ -0,0 +1,78 @@
+import pytest
+from app.metrics import RequestStats, SQL_QUERIES, DB_CALLS, record_sql_query, request_stats
+from app.repositories.base import Repository
+from app.repositories.supabase_repository import SupabaseRepository
+
+def test_repository_is_abstract():
+    with pytest.raises(TypeError):
+        Repository()
+
+    class Partial(Repository):
+        async def get_event(self, event_id):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
+
+def test_backends_implement_every_method():
+    assert not SupabaseRepository.__abstractmethods__
+    pytest.importorskip("sqlalchemy")
+    from app.repositories.postgres_repository import PostgresRepository
+    assert not PostgresRepository.__abstractmethods__
+
+def test_sql_queries_have_their_own_metric():
+    supabase_calls = dict(DB_CALLS._values)
+    stats = RequestStats()
+    token = request_stats.set(stats)
+    try:
+        record_sql_query("events", 200, 0.002)
+    finally:
+        request_stats.reset(token)
+    assert SQL_QUERIES._values[("events", "200")] >= 1
+    assert DB_CALLS._values == supabase_calls
+    # Still one of the request's database round trips
+    assert [(call.method, call.target) for call in stats.calls] == [("SQL", "events")]
+
+class StubConnection:
+    def __init__(self, rollback_error: Exception | None = None):
+        self.info, self.calls, self.rollback_error = {}, [], rollback_error
+
+    def commit(self):
+        self.calls.append("commit")
+
+    def rollback(self):
+        self.calls.append("rollback")
+        if self.rollback_error:
+            raise self.rollback_error
+
+    def invalidate(self):
+        self.calls.append("invalidate")
+
+    def close(self):
+        self.calls.append("close")
+
+def stub_repository(connection):
+    pytest.importorskip("sqlalchemy")
+    from app.repositories.postgres_repository import PostgresRepository
+    repository = PostgresRepository.__new__(PostgresRepository)
+    repository._engine = type("Engine", (), {"raw_connection": lambda self: connection})()
+    return repository
+
+def fail(error):
+    def work(session):
+        raise error
+    return work
+
+def test_lost_connection_is_not_returned_to_the_pool():
+    psycopg2 = pytest.importorskip("psycopg2")
+    connection = StubConnection()
+    with pytest.raises(psycopg2.OperationalError):
+        stub_repository(connection)._transaction(fail(psycopg2.OperationalError("server closed the connection")))
+    assert connection.calls == ["invalidate", "close"]
+
+def test_failed_rollback_keeps_the_original_error():
+    psycopg2 = pytest.importorskip("psycopg2")
+    connection = StubConnection(rollback_error=psycopg2.InterfaceError("connection already closed"))
+    with pytest.raises(ValueError, match="bad row"):
+        stub_repository(connection)._transaction(fail(ValueError("bad row")))
+    assert connection.calls == ["rollback", "invalidate", "close"]
@@ -0,0 +1,108 @@
+import asyncio
+import uuid
+from app.schemas.event import EventUpdate
+from app.services import event_service, registration_service
+from app.services.singleflight import coalesce
+
+def test_concurrent_calls_share_one_execution(client):
+    executions = 0
+
+    @coalesce
+    async def lookup(key):
+        nonlocal executions
+        executions += 1
+        execution = executions
+        await asyncio.sleep(0.01)
+        return key, execution
+
+    async def scenario():
+        return await asyncio.gather(lookup("a"), lookup("a"), lookup("b"))
+
+    assert client.portal.call(scenario) == [("a", 1), ("a", 1), ("b", 2)]
+
+def test_forget_starts_a_fresh_execution(client):
+    gates, executions = [], 0
+
+    @coalesce
+    async def lookup(key):
+        nonlocal executions
+        executions += 1
+        execution = executions
+        gate = asyncio.Event()
+        gates.append(gate)
+        await gate.wait()
+        return execution
+
+    async def scenario():
+        before = asyncio.create_task(lookup("a"))
+        await asyncio.sleep(0)
+        lookup.forget("a")
+        after = asyncio.create_task(lookup("a"))
+        await asyncio.sleep(0)
+        gates[0].set()
+        await before
+        # The first execution finishing must not drop the second one's entry
+        joined = asyncio.create_task(lookup("a"))
+        await asyncio.sleep(0)
+        gates[1].set()
+        return await before, await after, await joined
+
+    first, second, joined = client.portal.call(scenario)
+    assert first != second and joined == second and executions == 2
+
+def test_read_after_write_sees_the_write(client, fake_postgrest, dataset, monkeypatch):
+    event = fake_postgrest.db.insert("events", {
+        "title": "Before", "event_date": "2030-02-01T10:00:00+00:00", "capacity": 50, "created_by": None,
+    })
+    repository = event_service.repository
+    real_get_event = repository.get_event
+    gate = asyncio.Event()
+
+    async def slow_get_event(event_id):
+        row = await real_get_event(event_id)
+        await gate.wait()
+        return row
+
+    monkeypatch.setattr(repository, "get_event", slow_get_event)
+
+    async def scenario():
+        # Started before the write: reads the old row, then stalls
+        before = asyncio.create_task(event_service.get_event_by_id(event["id"]))
+        await asyncio.sleep(0.05)
+        await event_service.update_event(event["id"], EventUpdate(title="After"))
+        after = asyncio.create_task(event_service.get_event_by_id(event["id"]))
+        await asyncio.sleep(0.05)
+        gate.set()
+        return await before, await after, await event_service.get_event_by_id(event["id"])
+
+    before, after, cached = client.portal.call(scenario)
+    assert before["title"] == "Before"
+    assert after["title"] == "After"
+    assert cached["title"] == "After"
+
+def test_read_racing_a_registration_does_not_cache_the_old_count(client, fake_postgrest, dataset, monkeypatch):
+    event = fake_postgrest.db.insert("events", {
+        "title": "Racing", "event_date": "2030-03-01T10:00:00+00:00", "capacity": 50, "created_by": None,
+    })
+    repository = event_service.repository
+    real_get_event = repository.get_event
+    gate = asyncio.Event()
+
+    async def slow_get_event(event_id):
+        row = await real_get_event(event_id)
+        await gate.wait()
+        return row
+
+    monkeypatch.setattr(repository, "get_event", slow_get_event)
+
+    async def scenario():
+        # Started before the registration: reads a count of 0, then stalls
+        before = asyncio.create_task(event_service.get_event_by_id(event["id"]))
+        await asyncio.sleep(0.05)
+        await registration_service.register_user(uuid.uuid4(), event["id"])
+        gate.set()
+        return await before, await event_service.get_event_by_id(event["id"])
+
+    before, cached = client.portal.call(scenario)
+    assert before["registration_count"] == 0
+    assert cached["registration_count"] == 1